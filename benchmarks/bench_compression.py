@@ -0,0 +1,66 @@
+"""
+Compression cost vs bytes saved for sink output.
+
+    python benchmarks/bench_compression.py --lines 100000 --repeat 3
+
+For every available codec (gzip always; zstd and lz4 when installed) and a few
+levels, compresses a JSONL batch shaped like listener traffic and reports
+throughput (uncompressed MB/s) and the compression ratio.
+"""
+import argparse
+import json
+import random
+import time
+
+from logflow.compression import available_codecs, get_codec
+from logflow.sink import _encode_lines
+
+LEVELS = {"gzip": (1, 6, 9), "zstd": (1, 3, 9), "lz4": (0, 4, 9)}
+
+
+def make_batch(lines, seed=0):
+    rng = random.Random(seed)
+    levels = ["DEBUG", "INFO", "WARNING", "ERROR"]
+    return [json.dumps({
+        "timestamp": 1700000000 + i * 0.001,
+        "level": rng.choice(levels),
+        "logger": f"app.module{rng.randrange(20)}",
+        "message": f"request {rng.randrange(10**6)} handled in {rng.random() * 100:.2f}ms",
+        "host": f"web-{rng.randrange(8)}",
+    }) for i in range(lines)]
+
+
+def bench_codec(name, level, data, repeat):
+    codec = get_codec(name, level)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = codec.compress(data)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "codec": name,
+        "level": level,
+        "input_bytes": len(data),
+        "output_bytes": len(out),
+        "ratio": round(len(data) / len(out), 2),
+        "mb_per_sec": round(len(data) / best / 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sink compression codecs.")
+    parser.add_argument("--lines", type=int, default=100000, help="Log lines per batch")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per codec/level (best is reported)")
+    args = parser.parse_args()
+    data = _encode_lines(make_batch(args.lines))
+    results = []
+    for name in available_codecs():
+        if name == "none":
+            continue
+        for level in LEVELS[name]:
+            results.append(bench_codec(name, level, data, args.repeat))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
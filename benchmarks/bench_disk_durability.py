@@ -0,0 +1,59 @@
+"""
+DiskSink throughput under each durability mode.
+
+    python benchmarks/bench_disk_durability.py --batches 2000 --batch-lines 50
+    python benchmarks/bench_disk_durability.py --dir /var/lib/logflow   # measure the real disk
+
+Writes the same batches with durability none, batch (fsync per batch) and group
+commit at several fsync intervals, and reports batches/s, MB/s, the number of
+fsyncs and the durability window (how much recent data a crash can lose).
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from logflow.sink import DiskSink
+
+
+def bench_mode(directory, batch, batches, durability, interval_ms=None):
+    sink = DiskSink(directory, durability=durability, fsync_interval_ms=interval_ms)
+    size = sum(len(line) + 1 for line in batch)
+    start = time.perf_counter()
+    for _ in range(batches):
+        sink.write_batch(batch)
+    elapsed = time.perf_counter() - start
+    sink.close()
+    if durability == "group":
+        window = f"{interval_ms:g} ms"
+    else:
+        window = "0 ms" if durability == "batch" else "os writeback"
+    return {
+        "durability": durability,
+        "fsync_interval_ms": interval_ms,
+        "durability_window": window,
+        "batches_per_sec": round(batches / elapsed, 1),
+        "mb_per_sec": round(batches * size / elapsed / 1e6, 2),
+        "fsyncs": sink.stats()["fsyncs"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DiskSink durability modes.")
+    parser.add_argument("--batches", type=int, default=2000, help="Batches per mode")
+    parser.add_argument("--batch-lines", type=int, default=50, help="Log lines per batch")
+    parser.add_argument("--dir", default=None, help="Directory to write to (default: a temp dir)")
+    parser.add_argument("--intervals", default="5,50,200", help="Group-commit intervals in ms")
+    args = parser.parse_args()
+    batch = [json.dumps({"msg": "bench", "n": i, "pad": "x" * 100}) for i in range(args.batch_lines)]
+    modes = [("none", None), ("batch", None)]
+    modes += [("group", float(ms)) for ms in args.intervals.split(",")]
+    results = []
+    for durability, interval_ms in modes:
+        with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+            results.append(bench_mode(directory, batch, args.batches, durability, interval_ms))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Flush timing of the listener batcher under steady traffic.
+
+    python benchmarks/bench_flush_latency.py --interval 0.05 --rate 2000 --duration 5
+
+With a batch size too large to be reached, every flush is time-triggered, so the
+gap between consecutive flushes should equal --interval. Reports percentiles of
+flush lateness (gap - interval) and of per-message ingest-to-sink latency.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import threading
+import time
+
+from logflow.listener import run_logflow_server
+
+
+class TimingSink:
+    def __init__(self):
+        self.flush_times = []
+        self.latencies = []
+
+    def write_batch(self, batch):
+        now = time.time()
+        self.flush_times.append(now)
+        for line in batch:
+            self.latencies.append(now - json.loads(line)["t"])
+
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return {}
+    values = sorted(values)
+    result = {f"p{p}": round(values[min(len(values) - 1, int(len(values) * p / 100))] * 1000, 3) for p in points}
+    result["max"] = round(values[-1] * 1000, 3)
+    return result
+
+
+def _free_port():
+    with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_DGRAM)) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench(interval, rate, duration, engine):
+    port = _free_port()
+    sink = TimingSink()
+    stop_event = threading.Event()
+    ready_event = threading.Event()
+
+    def server():
+        asyncio.run(run_logflow_server(
+            ip="127.0.0.1", port=port, sinks=[sink],
+            batch_size_bytes=1 << 40, batch_interval=interval,
+            stop_event=stop_event, ready_event=ready_event, receive_engine=engine,
+        ))
+
+    thread = threading.Thread(target=server, daemon=True)
+    thread.start()
+    ready_event.wait(timeout=5)
+    time.sleep(0.2)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    period = 1.0 / rate
+    end = time.time() + duration
+    next_send = time.time()
+    while time.time() < end:
+        sock.sendto(json.dumps({"t": time.time()}).encode(), ("127.0.0.1", port))
+        next_send += period
+        delay = next_send - time.time()
+        if delay > 0:
+            time.sleep(delay)
+    time.sleep(interval * 2 + 0.2)
+    stop_event.set()
+    thread.join(timeout=5)
+    # Skip the first flush: it is due immediately after the idle startup period
+    gaps = [b - a - interval for a, b in zip(sink.flush_times[1:], sink.flush_times[2:])]
+    return {
+        "engine": engine,
+        "interval_ms": interval * 1000,
+        "rate": rate,
+        "flushes": len(sink.flush_times),
+        "messages": len(sink.latencies),
+        "flush_lateness_ms": percentiles(gaps),
+        "ingest_to_sink_ms": percentiles(sink.latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batcher flush latency.")
+    parser.add_argument("--interval", type=float, default=0.05, help="Batch interval in seconds")
+    parser.add_argument("--rate", type=int, default=2000, help="Datagrams per second")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds of traffic")
+    parser.add_argument("--engine", default="protocol", help="Receive engine to use")
+    args = parser.parse_args()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result = bench(args.interval, args.rate, args.duration, args.engine)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Ingest throughput with hot-path diagnostics disabled (the default) vs enabled.
+
+    python benchmarks/bench_ingest.py --count 200000
+
+"enabled" sets the logflow.hot logger to DEBUG with an unthrottled filter and a
+handler writing to /dev/null, so the difference is the cost of formatting and
+emitting per-message diagnostics, not of the terminal.
+"""
+import argparse
+import json
+import logging
+import os
+
+from logflow.diagnostics import HOT_LOGGER, RateLimitFilter
+from bench_receive import bench_engine
+
+
+def set_hot_path_diagnostics(enabled, devnull):
+    hot = logging.getLogger(HOT_LOGGER)
+    for f in hot.filters:
+        if isinstance(f, RateLimitFilter):
+            f.rate = f.tokens = float("inf") if enabled else 10
+    hot.handlers = [logging.StreamHandler(devnull)] if enabled else []
+    hot.propagate = not enabled
+    hot.setLevel(logging.DEBUG if enabled else logging.WARNING)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingest throughput with and without hot-path diagnostics.")
+    parser.add_argument("--count", type=int, default=100000, help="Total datagrams per run")
+    parser.add_argument("--size", type=int, default=200, help="Datagram payload size in bytes")
+    parser.add_argument("--senders", type=int, default=2, help="Sender processes")
+    parser.add_argument("--engine", default="protocol", help="Receive engine to use")
+    args = parser.parse_args()
+    results = []
+    with open(os.devnull, "w") as devnull:
+        for enabled in (False, True):
+            set_hot_path_diagnostics(enabled, devnull)
+            result = bench_engine(args.engine, args.count, args.size, args.senders)
+            result["diagnostics"] = "enabled" if enabled else "disabled"
+            results.append(result)
+        set_hot_path_diagnostics(False, devnull)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Compare ingest packets/second of the UDP receive engines.
+
+    python benchmarks/bench_receive.py --count 200000 --size 200 --senders 2
+
+Each engine gets a fresh listener on 127.0.0.1 with a counting sink; senders
+blast datagrams as fast as they can and the received rate is measured from the
+first send until the sink stops seeing new messages.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from logflow.listener import run_logflow_server
+
+
+class CountingSink:
+    def __init__(self):
+        self.count = 0
+        self.last_write = None
+
+    def write_batch(self, batch):
+        self.count += len(batch)
+        self.last_write = time.perf_counter()
+
+
+def _send(port, count, size):
+    payload = b'{"msg": "' + b"x" * max(size - 11, 0) + b'"}'
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    addr = ("127.0.0.1", port)
+    for _ in range(count):
+        sock.sendto(payload, addr)
+    sock.close()
+
+
+def _free_port():
+    with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_DGRAM)) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_engine(engine, count, size, senders):
+    port = _free_port()
+    sink = CountingSink()
+    stop_event = threading.Event()
+    ready_event = threading.Event()
+
+    def server():
+        asyncio.run(run_logflow_server(
+            ip="127.0.0.1", port=port, sinks=[sink],
+            batch_size_bytes=1024 * 1024, batch_interval=0.05,
+            stop_event=stop_event, ready_event=ready_event, receive_engine=engine,
+        ))
+
+    thread = threading.Thread(target=server, daemon=True)
+    thread.start()
+    ready_event.wait(timeout=5)
+    time.sleep(0.2)
+    per_sender = count // senders
+    procs = [multiprocessing.Process(target=_send, args=(port, per_sender, size)) for _ in range(senders)]
+    start = time.perf_counter()
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+    # Wait until the sink has been idle for a while (or give up after 30s)
+    seen, idle_since = -1, time.perf_counter()
+    while time.perf_counter() - idle_since < 1.0 and time.perf_counter() - start < 30:
+        if sink.count != seen:
+            seen, idle_since = sink.count, time.perf_counter()
+        time.sleep(0.05)
+    stop_event.set()
+    thread.join(timeout=5)
+    sent = per_sender * senders
+    elapsed = (sink.last_write or time.perf_counter()) - start
+    return {
+        "engine": engine,
+        "sent": sent,
+        "received": sink.count,
+        "loss_pct": round(100.0 * (sent - sink.count) / sent, 2) if sent else 0.0,
+        "seconds": round(elapsed, 3),
+        "pps": round(sink.count / elapsed) if elapsed > 0 else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark logflow UDP receive engines.")
+    parser.add_argument("--count", type=int, default=100000, help="Total datagrams per engine")
+    parser.add_argument("--size", type=int, default=200, help="Datagram payload size in bytes")
+    parser.add_argument("--senders", type=int, default=2, help="Sender processes")
+    parser.add_argument("--engines", default="protocol,batch", help="Comma-separated engines to compare")
+    args = parser.parse_args()
+    results = []
+    for engine in args.engines.split(","):
+        # Keep listener diagnostics out of the measurement output
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results.append(bench_engine(engine, args.count, args.size, args.senders))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+S3 upload path: a fresh boto3 client per batch (the old upload_batch behaviour)
+vs the sink the listener runs for ENABLE_S3_SINK, RetryingSink(S3Sink), whose
+long-lived client pools connections.
+
+    python benchmarks/bench_s3_upload.py --batches 200 --batch-lines 500
+    python benchmarks/bench_s3_upload.py --endpoint http://localhost:9000   # local MinIO
+
+Without --endpoint a moto server is started on localhost (pip install "moto[server]").
+"""
+import argparse
+import json
+import os
+import time
+
+import boto3
+
+from logflow import listener
+from logflow.sink import s3_client_kwargs
+
+
+def percentiles(values, points=(50, 99)):
+    values = sorted(values)
+    return {f"p{p}_ms": round(values[min(len(values) - 1, int(len(values) * p / 100))] * 1000, 3) for p in points}
+
+
+def start_moto():
+    from moto.server import ThreadedMotoServer
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    return server, f"http://{host}:{port}"
+
+
+def bench_fresh(batch, batches):
+    cfg = listener.get_s3_config()
+    timings = []
+    for i in range(batches):
+        start = time.perf_counter()
+        s3 = boto3.client(
+            "s3",
+            endpoint_url=cfg["endpoint_url"],
+            aws_access_key_id=cfg["aws_access_key_id"],
+            aws_secret_access_key=cfg["aws_secret_access_key"],
+            region_name=cfg["region_name"],
+        )
+        s3.put_object(Bucket=cfg["bucket"], Key=f"bench/fresh-{i}.jsonl", Body="\n".join(batch).encode())
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_pooled(batch, batches):
+    sink = listener._build_s3_sink()
+    timings = []
+    try:
+        for _ in range(batches):
+            start = time.perf_counter()
+            sink.write_batch(batch)
+            timings.append(time.perf_counter() - start)
+    finally:
+        sink.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the listener's S3 upload path.")
+    parser.add_argument("--batches", type=int, default=100, help="Uploads per mode")
+    parser.add_argument("--batch-lines", type=int, default=500, help="Log lines per batch")
+    parser.add_argument("--endpoint", default=None, help="S3 endpoint (default: start a moto server)")
+    parser.add_argument("--bucket", default="logflow-bench")
+    args = parser.parse_args()
+    server = None
+    if args.endpoint is None:
+        server, args.endpoint = start_moto()
+    os.environ["S3_ENDPOINT"] = args.endpoint
+    os.environ["S3_BUCKET"] = args.bucket
+    os.environ.setdefault("S3_ACCESS_KEY", "minioadmin")
+    os.environ.setdefault("S3_SECRET_KEY", "minioadmin")
+    cfg = listener.get_s3_config()
+    try:
+        boto3.client("s3", **s3_client_kwargs(cfg)).create_bucket(Bucket=args.bucket)
+    except Exception:
+        pass  # already exists
+    batch = [json.dumps({"msg": "bench", "n": i}) for i in range(args.batch_lines)]
+    results = []
+    try:
+        for mode, fn in (("fresh-client", bench_fresh), ("pooled-s3-sink", bench_pooled)):
+            timings = fn(batch, args.batches)
+            total = sum(timings)
+            results.append({
+                "mode": mode,
+                "batches": args.batches,
+                "batches_per_sec": round(args.batches / total, 1),
+                **percentiles(timings),
+            })
+    finally:
+        if server is not None:
+            server.stop()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
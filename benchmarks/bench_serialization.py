@@ -0,0 +1,65 @@
+"""
+Per-record encoding cost of UDPJsonLogHandler.
+
+    python benchmarks/bench_serialization.py --records 200000 --repeat 3
+
+Builds the handler's log dict and serializes it for a stream of LogRecords,
+once per available serializer (orjson and ujson when installed, stdlib json
+always), and once the way the handler used to (datetime.utcnow().isoformat()
+plus json.dumps) as a baseline. Reports records/second; nothing is sent.
+"""
+import argparse
+import json
+import logging
+import time
+from datetime import datetime
+
+from logflow.handler import UDPJsonLogHandler
+from logflow.serialization import available_serializers
+
+
+def make_records(count):
+    return [logging.LogRecord("app.module", logging.INFO, "/srv/app/module.py", 42,
+                              "request %d handled in %.2fms", (i, i % 100 / 3), None, func="handle")
+            for i in range(count)]
+
+
+def legacy_encode(record):
+    return json.dumps({
+        "timestamp": datetime.utcnow().isoformat(),
+        "level": record.levelname,
+        "name": record.name,
+        "message": record.getMessage(),
+        "pathname": record.pathname,
+        "lineno": record.lineno,
+        "funcName": record.funcName,
+    }).encode()
+
+
+def bench(name, encode, records, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for record in records:
+            encode(record)
+        best = min(best, time.perf_counter() - start)
+    return {"serializer": name, "records_per_sec": round(len(records) / best)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark UDPJsonLogHandler record encoding.")
+    parser.add_argument("--records", type=int, default=200000, help="Records per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per serializer (best is reported)")
+    args = parser.parse_args()
+    records = make_records(args.records)
+    results = [bench("legacy (utcnow + json.dumps)", legacy_encode, records, args.repeat)]
+    for name in available_serializers():
+        handler = UDPJsonLogHandler(serializer=name)
+        log_obj, dumps = handler._log_obj, handler.serializer.dumps
+        results.append(bench(name, lambda record: dumps(log_obj(record)), records, args.repeat))
+        handler.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
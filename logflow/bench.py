@@ -0,0 +1,281 @@
+"""
+logflow-bench: load generator and end-to-end throughput benchmark.
+
+    logflow-bench --sinks stdout,disk,s3 --senders 4 --rate 20000 --duration 10 --size 256
+    logflow-bench --sinks disk --rate 0 --output results.json     # rate 0 = as fast as possible
+
+For each sink type a fresh listener process runs run_logflow_server with that
+sink (Stdout to /dev/null, Disk to a temp dir, S3 against a local moto server
+or --s3-endpoint). Sender processes blast timestamped datagrams at the
+configured rate and size. The report lists, per sink, the sustained
+throughput, loss rate, p50/p99 ingest-to-sink latency (datagram send to sink
+write) and the listener's peak RSS, as one JSON document so runs can be diffed
+and tracked for regressions.
+"""
+import argparse
+import array
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SINK_TYPES = ("stdout", "disk", "s3")
+
+def _free_port(kind=socket.SOCK_DGRAM):
+    with contextlib.closing(socket.socket(socket.AF_INET, kind)) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _percentiles(values, points=(50, 99)):
+    if not values:
+        return {}
+    values = sorted(values)
+    result = {f"p{p}": round(values[min(len(values) - 1, int(len(values) * p / 100))] * 1000, 3) for p in points}
+    result["max"] = round(values[-1] * 1000, 3)
+    return result
+
+class MeasuredSink:
+    """Wraps a sink, counting lines and sampling each line's send-to-write latency."""
+    def __init__(self, sink, sample_every):
+        self.sink = sink
+        self.sink_name = type(sink).__name__
+        self.sample_every = sample_every
+        self.received = 0
+        self.bytes = 0
+        self.first_write = None
+        self.last_write = None
+        self.latencies = array.array("d")
+
+    def write_batch(self, batch):
+        self.sink.write_batch(batch)
+        now = time.time()
+        if self.first_write is None:
+            self.first_write = now
+        self.last_write = now
+        latencies = self.latencies
+        for line in batch[::self.sample_every]:
+            # Lines look like {"t":<send time>,"s":<seq>,"p":"..."}; slice instead of parsing JSON
+            latencies.append(now - float(line[5:line.index(",", 5)]))
+        self.received += len(batch)
+        self.bytes += sum(map(len, batch))
+
+    def close(self):
+        close = getattr(self.sink, "close", None)
+        if callable(close):
+            close()
+
+def _build_sink(kind, workdir):
+    from .sink import DiskSink, StdoutSink, S3Sink
+    if kind == "stdout":
+        return StdoutSink()
+    if kind == "disk":
+        return DiskSink(os.path.join(workdir, "disk"))
+    if kind == "s3":
+        return S3Sink()
+    raise ValueError(f"Unknown sink type: {kind!r} (expected one of {SINK_TYPES})")
+
+def _serve(kind, port, config, workdir, ready, stop, results):
+    """Listener process: run one sink until stop is set, then report what it saw."""
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)  # StdoutSink output and listener chatter go nowhere
+    from .diagnostics import configure_logging
+    from .listener import run_logflow_server
+    configure_logging(level="WARNING")
+    sink = MeasuredSink(_build_sink(kind, workdir), config["latency_sample"])
+    asyncio.run(run_logflow_server(
+        ip="127.0.0.1", port=port, sinks=[sink],
+        batch_size_bytes=config["batch_bytes"], batch_interval=config["batch_interval"],
+        stop_event=stop, ready_event=ready, receive_engine=config["engine"],
+    ))
+    results.put({
+        "received": sink.received,
+        "bytes": sink.bytes,
+        "first_write": sink.first_write,
+        "last_write": sink.last_write,
+        "latency_ms": _percentiles(sink.latencies),
+        "rss_peak_mb": _peak_rss_mb(),
+    })
+
+def _send(port, rate, duration, size, sender_id, results):
+    """Sender process: paced (rate > 0) or unthrottled datagrams for duration seconds."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    addr = ("127.0.0.1", port)
+    sent = 0
+    start = time.time()
+    end = start + duration
+    period = 1.0 / rate if rate > 0 else 0.0
+    next_send = start
+    while True:
+        now = time.time()
+        if now >= end:
+            break
+        head = '{"t":%.6f,"s":%d,"p":"' % (now, sender_id * 10 ** 9 + sent)
+        payload = (head + "x" * max(size - len(head) - 2, 0) + '"}').encode()
+        try:
+            sock.sendto(payload, addr)
+            sent += 1
+        except OSError:
+            pass  # ENOBUFS under overload; counts as not sent
+        if period:
+            next_send += period
+            delay = next_send - time.time()
+            if delay > 0:
+                time.sleep(delay)
+    sock.close()
+    results.put({"sent": sent, "start": start, "end": time.time()})
+
+@contextlib.contextmanager
+def local_s3(endpoint=None, bucket="logflow-bench"):
+    """Point the S3 env vars at endpoint, or at a moto server subprocess, with bucket created."""
+    import boto3
+    proc = None
+    if endpoint is None:
+        port = _free_port(socket.SOCK_STREAM)
+        proc = subprocess.Popen([sys.executable, "-m", "moto.server", "-H", "127.0.0.1", "-p", str(port)],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        endpoint = f"http://127.0.0.1:{port}"
+        deadline = time.time() + 15
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.time() > deadline or proc.poll() is not None:
+                    proc.kill()
+                    raise RuntimeError("moto server did not start (pip install \"moto[server]\")")
+                time.sleep(0.1)
+    saved = {k: os.environ.get(k) for k in ("S3_ENDPOINT", "S3_BUCKET", "S3_ACCESS_KEY", "S3_SECRET_KEY")}
+    os.environ.update({"S3_ENDPOINT": endpoint, "S3_BUCKET": bucket})
+    os.environ.setdefault("S3_ACCESS_KEY", "minioadmin")
+    os.environ.setdefault("S3_SECRET_KEY", "minioadmin")
+    try:
+        from .sink import _s3_config, s3_client_kwargs
+        with contextlib.suppress(Exception):  # already exists
+            boto3.client("s3", **s3_client_kwargs(_s3_config())).create_bucket(Bucket=bucket)
+        yield endpoint
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=5)
+
+def bench_sink(kind, config):
+    """Run one listener process with sink kind under the configured load; returns its result dict."""
+    ctx = multiprocessing.get_context("spawn")
+    port = _free_port()
+    ready, stop = ctx.Event(), ctx.Event()
+    server_results, sender_results = ctx.Queue(), ctx.Queue()
+    with tempfile.TemporaryDirectory(prefix="logflow-bench-") as workdir:
+        server = ctx.Process(target=_serve, args=(kind, port, config, workdir, ready, stop, server_results),
+                             name=f"logflow-bench-{kind}")
+        server.start()
+        if not ready.wait(timeout=30):
+            server.terminate()
+            raise RuntimeError(f"{kind} listener did not start")
+        time.sleep(0.2)
+        senders = [
+            ctx.Process(target=_send, args=(port, config["rate"], config["duration"], config["size"], i, sender_results))
+            for i in range(config["senders"])
+        ]
+        for proc in senders:
+            proc.start()
+        sent = [sender_results.get() for _ in senders]
+        for proc in senders:
+            proc.join()
+        time.sleep(config["settle"])
+        stop.set()
+        served = server_results.get(timeout=60)
+        server.join(timeout=10)
+    total_sent = sum(s["sent"] for s in sent)
+    start = min(s["start"] for s in sent)
+    elapsed = max((served["last_write"] or start) - start, max(s["end"] for s in sent) - start)
+    received = served["received"]
+    return {
+        "sink": kind,
+        "sent": total_sent,
+        "received": received,
+        "loss_pct": round(100.0 * max(total_sent - received, 0) / total_sent, 3) if total_sent else 0.0,
+        "seconds": round(elapsed, 3),
+        "throughput_msgs_per_sec": round(received / elapsed, 1) if elapsed > 0 else 0.0,
+        "throughput_mb_per_sec": round(served["bytes"] / elapsed / 1e6, 3) if elapsed > 0 else 0.0,
+        "offered_msgs_per_sec": round(total_sent / elapsed, 1) if elapsed > 0 else 0.0,
+        "ingest_to_sink_latency_ms": served["latency_ms"],
+        "rss_peak_mb": served["rss_peak_mb"],
+    }
+
+def run(sinks, config, s3_endpoint=None):
+    results = []
+    for kind in sinks:
+        if kind == "s3":
+            try:
+                with local_s3(s3_endpoint):
+                    results.append(bench_sink(kind, config))
+            except (ImportError, RuntimeError) as e:
+                results.append({"sink": kind, "skipped": str(e)})
+        else:
+            results.append(bench_sink(kind, config))
+    return {
+        "benchmark": "logflow-bench",
+        "version": 1,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": config,
+        "results": results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="logflow-bench", description="Load-test the logflow listener per sink type.")
+    parser.add_argument("--sinks", default=",".join(SINK_TYPES), help="Comma-separated sink types: stdout, disk, s3")
+    parser.add_argument("--senders", type=int, default=2, help="Sender processes")
+    parser.add_argument("--rate", type=float, default=10000, help="Datagrams/second per sender (0 = unthrottled)")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds of traffic per sink")
+    parser.add_argument("--size", type=int, default=256, help="Datagram size in bytes")
+    parser.add_argument("--engine", default="batch", help="Receive engine (protocol or batch)")
+    parser.add_argument("--batch-bytes", type=int, default=1024 * 1024, help="Listener batch size in bytes")
+    parser.add_argument("--batch-interval", type=float, default=0.1, help="Listener batch interval in seconds")
+    parser.add_argument("--latency-sample", type=int, default=10, help="Measure latency of every Nth line")
+    parser.add_argument("--settle", type=float, default=1.0, help="Seconds to wait after sending before stopping")
+    parser.add_argument("--s3-endpoint", default=None, help="S3 endpoint (default: start a local moto server)")
+    parser.add_argument("--output", default="-", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+    sinks = [s.strip() for s in args.sinks.split(",") if s.strip()]
+    for kind in sinks:
+        if kind not in SINK_TYPES:
+            parser.error(f"unknown sink type {kind!r} (expected one of {', '.join(SINK_TYPES)})")
+    config = {
+        "senders": args.senders,
+        "rate": args.rate,
+        "duration": args.duration,
+        "size": args.size,
+        "engine": args.engine,
+        "batch_bytes": args.batch_bytes,
+        "batch_interval": args.batch_interval,
+        "latency_sample": max(args.latency_sample, 1),
+        "settle": args.settle,
+    }
+    report = json.dumps(run(sinks, config, args.s3_endpoint), indent=2)
+    if args.output == "-":
+        print(report)
+    else:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+
+if __name__ == "__main__":
+    main()
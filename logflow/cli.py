@@ -10,11 +10,16 @@ def main():
     parser = argparse.ArgumentParser(description="Forward stdin logs to a UDP listener as JSON logs.")
     parser.add_argument("--ip", type=str, default=None, help="Destination IP (default: env or 127.0.0.1)")
     parser.add_argument("--port", type=int, default=None, help="Destination port (default: env or 9999)")
+    parser.add_argument("--queued", action="store_true", default=None,
+                        help="Send from a background thread, packing several lines per datagram")
+    parser.add_argument("--batch-time", type=float, default=None,
+                        help="Wait up to this many seconds to fill a datagram with lines (default: env or 0 = off)")
     args = parser.parse_args()
 
     logger = logging.getLogger("udp_forward")
     logger.setLevel(logging.INFO)
-    logger.addHandler(UDPJsonLogHandler(ip=args.ip, port=args.port))
+    handler = UDPJsonLogHandler(ip=args.ip, port=args.port, queued=args.queued, batch_time=args.batch_time)
+    logger.addHandler(handler)
 
     def send_ping():
         while True:
@@ -26,8 +31,11 @@ def main():
     ping_thread = threading.Thread(target=send_ping, daemon=True)
     ping_thread.start()
 
-    for line in sys.stdin:
-        logger.info(line.rstrip())
+    try:
+        for line in sys.stdin:
+            logger.info(line.rstrip())
+    finally:
+        handler.close()
 
 if __name__ == "__main__":
     main()
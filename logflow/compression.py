@@ -0,0 +1,121 @@
+"""
+Pluggable compression for sink output.
+
+get_codec(name) returns a Codec for "none", "gzip" (stdlib), "zstd" (needs the
+zstandard package) or "lz4" (needs lz4). Each codec knows its file extension and
+HTTP Content-Encoding, and offers both one-shot compress() and an incremental
+compressor for streaming writers.
+"""
+import gzip
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+COMPRESSION = os.getenv("LOGFLOW_COMPRESSION", "none")
+COMPRESSION_LEVEL = os.getenv("LOGFLOW_COMPRESSION_LEVEL")  # codec default when unset
+
+class Codec:
+    """No-op codec; subclasses override compress() and compressor()."""
+    name = "none"
+    extension = ""
+    content_encoding = None
+    default_level = None
+
+    def __init__(self, level=None):
+        self.level = self.default_level if level is None else int(level)
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def compressor(self):
+        """Return an object with compress(bytes) -> bytes and flush() -> bytes for streaming."""
+        return _IdentityCompressor()
+
+class _IdentityCompressor:
+    def compress(self, data):
+        return data
+
+    def flush(self):
+        return b""
+
+class GzipCodec(Codec):
+    name = "gzip"
+    extension = ".gz"
+    content_encoding = "gzip"
+    default_level = 6
+
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def compressor(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+
+class ZstdCodec(Codec):
+    name = "zstd"
+    extension = ".zst"
+    content_encoding = "zstd"
+    default_level = 3
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compressor(self):
+        return zstandard.ZstdCompressor(level=self.level).compressobj()
+
+class _LZ4StreamCompressor:
+    def __init__(self, level):
+        self._compressor = lz4_frame.LZ4FrameCompressor(compression_level=level)
+        self._header = self._compressor.begin()
+
+    def compress(self, data):
+        out = self._compressor.compress(data)
+        if self._header:
+            out, self._header = self._header + out, b""
+        return out
+
+    def flush(self):
+        out, self._header = self._header + self._compressor.flush(), b""
+        return out
+
+class LZ4Codec(Codec):
+    name = "lz4"
+    extension = ".lz4"
+    content_encoding = "x-lz4"
+    default_level = 0
+
+    def compress(self, data):
+        return lz4_frame.compress(data, compression_level=self.level)
+
+    def compressor(self):
+        return _LZ4StreamCompressor(self.level)
+
+CODECS = {
+    "none": (Codec, True),
+    "gzip": (GzipCodec, True),
+    "zstd": (ZstdCodec, zstandard is not None),
+    "lz4": (LZ4Codec, lz4_frame is not None),
+}
+
+def available_codecs():
+    return [name for name, (_, available) in CODECS.items() if available]
+
+def get_codec(name=None, level=None):
+    """Return a Codec instance; name/level default to LOGFLOW_COMPRESSION / LOGFLOW_COMPRESSION_LEVEL."""
+    if isinstance(name, Codec):
+        return name
+    name = (name or COMPRESSION or "none").lower()
+    if name not in CODECS:
+        raise ValueError(f"Unknown compression: {name!r} (expected one of {list(CODECS)})")
+    cls, available = CODECS[name]
+    if not available:
+        raise ImportError(f"Compression {name!r} requires the {'zstandard' if name == 'zstd' else name} package")
+    return cls(COMPRESSION_LEVEL if level is None else level)
@@ -0,0 +1,83 @@
+"""
+Internal diagnostics for the collector itself (not the logs it forwards).
+
+Everything logs through the standard logging hierarchy under "logflow.*" with
+levels, so nothing is formatted unless enabled. Per-message/per-batch traces go
+to the "logflow.hot" logger, which is rate limited and only emits DEBUG records
+when LOGFLOW_HOT_PATH_DEBUG is set; warnings on the hot path (e.g. decode
+failures) are still reported, but at most LOGFLOW_HOT_PATH_RATE per second.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+
+LOG_LEVEL = os.getenv("LOGFLOW_LOG_LEVEL", "INFO").upper()
+HOT_PATH_DEBUG = os.getenv("LOGFLOW_HOT_PATH_DEBUG", "").lower() in ("1", "true", "yes")
+HOT_PATH_RATE = float(os.getenv("LOGFLOW_HOT_PATH_RATE", 10))  # records/second
+
+HOT_LOGGER = "logflow.hot"
+
+def get_logger(name):
+    """Return the logger for a logflow component, e.g. get_logger("listener")."""
+    return logging.getLogger(f"logflow.{name}")
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token-bucket filter: lets through at most `rate` records per second (with a
+    burst of the same size) and reports how many were suppressed in between.
+    """
+    def __init__(self, rate=None):
+        super().__init__()
+        self.rate = HOT_PATH_RATE if rate is None else rate
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self.suppressed = 0
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                return False
+            self.tokens -= 1
+            suppressed, self.suppressed = self.suppressed, 0
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+class KeyValueFormatter(logging.Formatter):
+    """Formats records as `time level logger message key=value ...` using extra={"fields": {...}}."""
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+def _init_hot_logger():
+    hot = logging.getLogger(HOT_LOGGER)
+    if not any(isinstance(f, RateLimitFilter) for f in hot.filters):
+        hot.addFilter(RateLimitFilter())
+    hot.setLevel(logging.DEBUG if HOT_PATH_DEBUG else logging.WARNING)
+    return hot
+
+hot_log = _init_hot_logger()
+
+def configure_logging(level=None, stream=None):
+    """Attach a stderr handler to the "logflow" logger. Called by the CLI entry points; idempotent."""
+    root = logging.getLogger("logflow")
+    root.setLevel(level or LOG_LEVEL)
+    if not any(getattr(h, "_logflow", False) for h in root.handlers):
+        handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(KeyValueFormatter())
+        handler._logflow = True
+        root.addHandler(handler)
+    return root
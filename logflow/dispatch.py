@@ -0,0 +1,150 @@
+import asyncio
+import inspect
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .diagnostics import get_logger, hot_log
+from .metrics import Histogram
+
+log = get_logger("dispatch")
+
+SINK_THREADS = int(os.getenv("LOGFLOW_SINK_THREADS", 4))  # shared pool for blocking sinks
+SINK_MAX_INFLIGHT = int(os.getenv("LOGFLOW_SINK_MAX_INFLIGHT", 1))  # concurrent writes per sink
+SINK_MAX_PENDING = int(os.getenv("LOGFLOW_SINK_MAX_PENDING", 16))  # queued batches per sink before dropping
+
+class _SinkLane:
+    """Per-sink state: in-flight limit, backlog size and outcome counters."""
+    def __init__(self, sink, max_inflight, max_pending):
+        self.sink = sink
+        self.name = getattr(sink, "sink_name", type(sink).__name__)
+        self.is_async = inspect.iscoroutinefunction(getattr(sink, "write_batch", None))
+        self.semaphore = asyncio.Semaphore(max_inflight)
+        self.max_pending = max_pending
+        self.pending = 0  # dispatched but not yet finished (includes in-flight)
+        self.written = 0
+        self.errors = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.write_seconds = Histogram()
+
+    def stats(self):
+        stats = {
+            "sink": self.name,
+            "pending": self.pending,
+            "written": self.written,
+            "errors": self.errors,
+            "dropped": self.dropped,
+        }
+        sink_stats = getattr(self.sink, "stats", None)
+        if callable(sink_stats):
+            # Sink-specific state, e.g. RetryingSink's circuit or DiskSink's fsyncs
+            stats["detail"] = sink_stats()
+        return stats
+
+class SinkDispatcher:
+    """
+    Fans each flushed batch out to all sinks in parallel without blocking the caller.
+    Blocking sinks (DiskSink, S3Sink, ...) run on a bounded thread pool; sinks whose
+    write_batch is a coroutine function (AsyncBaseSink) are awaited on the event
+    loop. Each sink has its own in-flight limit (1 keeps batches in order) and a
+    bounded backlog: when a slow sink has max_pending batches outstanding, further
+    batches for that sink only are dropped and counted, so it never holds up ingest
+    or the other sinks.
+    Must be created inside the running event loop.
+    """
+    def __init__(self, sinks, max_workers=None, max_inflight=None, max_pending=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or SINK_THREADS, thread_name_prefix="logflow-sink")
+        max_inflight = max_inflight or SINK_MAX_INFLIGHT
+        max_pending = max_pending or SINK_MAX_PENDING
+        self.lanes = [_SinkLane(sink, max_inflight, max_pending) for sink in (sinks or [])]
+        self._tasks = set()
+
+    @property
+    def sinks(self):
+        return [lane.sink for lane in self.lanes]
+
+    def _lane(self, sink):
+        for lane in self.lanes:
+            if lane.sink is sink:
+                return lane
+        raise KeyError(f"{sink!r} is not registered with this dispatcher")
+
+    def dispatch(self, batch):
+        """Schedule batch for every sink and return immediately. batch must not be mutated afterwards."""
+        for lane in self.lanes:
+            if lane.pending >= lane.max_pending:
+                lane.dropped += 1
+                hot_log.warning("%s is backlogged (%d batches pending), dropping batch of %d messages",
+                                lane.name, lane.pending, len(batch))
+                continue
+            lane.pending += 1
+            task = asyncio.ensure_future(self._run(lane, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, lane, batch):
+        try:
+            await self._write(lane, batch)
+        except Exception as e:
+            hot_log.warning("Exception in %s.write_batch: %s", lane.name, e)
+            # Do not raise; let health check reflect failure
+        finally:
+            lane.pending -= 1
+
+    async def _write(self, lane, batch):
+        async with lane.semaphore:
+            start = time.perf_counter()
+            try:
+                if lane.is_async:
+                    await lane.sink.write_batch(batch)
+                else:
+                    loop = asyncio.get_running_loop()
+                    await loop.run_in_executor(self.executor, lane.sink.write_batch, batch)
+            except Exception:
+                lane.errors += 1
+                raise
+            finally:
+                lane.write_seconds.observe(time.perf_counter() - start)
+            lane.written += 1
+            lane.bytes += sum(map(len, batch)) + len(batch)  # one newline per line
+
+    async def write(self, sink, batch):
+        """Write batch to one sink, honouring its in-flight limit; raises the sink's exception."""
+        lane = self._lane(sink)
+        lane.pending += 1
+        try:
+            await self._write(lane, batch)
+        finally:
+            lane.pending -= 1
+
+    async def drain(self, timeout=None):
+        """Wait for dispatched writes to finish; returns False if some were still running after timeout."""
+        if not self._tasks:
+            return True
+        done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if pending:
+            log.warning("%d sink writes still running at shutdown", len(pending))
+        return not pending
+
+    async def close_sinks(self):
+        """Flush and close every sink: await aclose() on async sinks, call close() (if any) on blocking ones."""
+        loop = asyncio.get_running_loop()
+        for lane in self.lanes:
+            try:
+                if lane.is_async:
+                    aclose = getattr(lane.sink, "aclose", None)
+                    if aclose is not None:
+                        await aclose()
+                else:
+                    close = getattr(lane.sink, "close", None)
+                    if callable(close):
+                        await loop.run_in_executor(self.executor, close)
+            except Exception as e:
+                log.warning("Error closing %s: %s", lane.name, e)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    def stats(self):
+        return [lane.stats() for lane in self.lanes]
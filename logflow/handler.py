@@ -1,21 +1,72 @@
 import logging
+import queue
 import socket
-import json
 import os
+import threading
+import time
 from datetime import datetime
 
+from .serialization import TimestampCache, get_serializer
+
+UDP_LOG_QUEUED = os.getenv("UDP_LOG_QUEUED", "0").lower() in ("1", "true", "yes")  # send from a background thread
+UDP_LOG_MAX_PAYLOAD = int(os.getenv("UDP_LOG_MAX_PAYLOAD", 1400))  # bytes per packed datagram; fits a 1500 MTU
+UDP_LOG_QUEUE_SIZE = int(os.getenv("UDP_LOG_QUEUE_SIZE", 10000))  # records buffered before new ones are dropped
+UDP_LOG_BATCH_TIME = float(os.getenv("UDP_LOG_BATCH_TIME", 0))  # max seconds a record waits to fill a datagram; 0 = off
+UDP_LOG_BATCH_SIZE = int(os.getenv("UDP_LOG_BATCH_SIZE", 100))  # records per datagram when batching
+
 class UDPJsonLogHandler(logging.Handler):
-    def __init__(self, ip=None, port=None):
+    """
+    Sends each log record as a JSON datagram.
+
+    With queued=True (or UDP_LOG_QUEUED=1), emit() only builds the record dict
+    and puts it on a bounded queue. A background thread serializes the queued
+    records and packs as many as fit into one newline-delimited datagram of at
+    most max_payload bytes; the listener splits them again. Records are
+    dropped (and counted in .dropped) when the queue is full rather than
+    blocking the application, or when they cannot be serialized. close()
+    sends whatever is still queued.
+
+    With batch_time > 0 (or UDP_LOG_BATCH_TIME), records are collected in a
+    LogBatcher and sent as one packed datagram once batch_size records or
+    max_payload bytes are buffered, or the oldest has waited batch_time
+    seconds: fewer packets in exchange for a bounded delay. This works with
+    and without queued; flush() sends the partial batch.
+
+    Records are encoded with the fastest installed serializer (orjson, ujson,
+    then stdlib json) unless serializer or UDP_LOG_SERIALIZER names one.
+    """
+    def __init__(self, ip=None, port=None, queued=None, max_payload=None, queue_size=None, serializer=None,
+                 batch_time=None, batch_size=None):
         super().__init__()
         self.addr = (
             ip or os.getenv("UDP_LOG_FORWARD_IP", "127.0.0.1"),
             int(port or os.getenv("UDP_LOG_FORWARD_PORT", 9999))
         )
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.queued = UDP_LOG_QUEUED if queued is None else queued
+        self.serializer = get_serializer(serializer)
+        self._dumps = self.serializer.dumps
+        self._timestamps = TimestampCache()
+        self.max_payload = max_payload or UDP_LOG_MAX_PAYLOAD
+        self.dropped = 0
+        self.datagrams = 0
+        self._queue = None
+        self._thread = None
+        self._batcher = None
+        batch_time = UDP_LOG_BATCH_TIME if batch_time is None else batch_time
+        if batch_time > 0:
+            # Each record costs its length plus a newline separator, hence the +1 on both sides
+            self._batcher = LogBatcher(batch_size=batch_size or UDP_LOG_BATCH_SIZE, batch_time=batch_time,
+                                       max_bytes=self.max_payload + 1, on_flush=self._send_packed).start()
+        if self.queued:
+            self._queue = queue.Queue(maxsize=queue_size or UDP_LOG_QUEUE_SIZE)
+            self._thread = threading.Thread(target=self._send_loop, name="logflow-udp-handler", daemon=True)
+            self._thread.start()
 
-    def emit(self, record):
-        log_obj = {
-            "timestamp": datetime.utcnow().isoformat(),
+    def _log_obj(self, record):
+        # record.created is already taken by logging; no second clock read or datetime object
+        return {
+            "timestamp": self._timestamps.format(record.created),
             "level": record.levelname,
             "name": record.name,
             "message": record.getMessage(),
@@ -23,26 +74,190 @@ class UDPJsonLogHandler(logging.Handler):
             "lineno": record.lineno,
             "funcName": record.funcName,
         }
+
+    def emit(self, record):
         try:
-            self.sock.sendto(json.dumps(log_obj).encode(), self.addr)
+            log_obj = self._log_obj(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(log_obj)
+            except queue.Full:
+                self.dropped += 1
+            return
+        if self._batcher is not None:
+            try:
+                data = self._dumps(log_obj)
+            except Exception:
+                self.handleError(record)
+                return
+            self._batcher.add_log(data, len(data) + 1)
+            return
+        try:
+            self.sock.sendto(self._dumps(log_obj), self.addr)
         except Exception:
             pass
 
+    def _send(self, payload):
+        try:
+            self.sock.sendto(payload, self.addr)
+            self.datagrams += 1
+        except Exception:
+            pass
+
+    def _send_packed(self, batch):
+        self._send(b"\n".join(batch))
+
+    def _send_loop(self):
+        q = self._queue
+        batcher = self._batcher
+        packed = []
+        size = 0
+        stopping = False
+        dumps = self._dumps
+        while not stopping:
+            items = [q.get()]
+            # Take everything already queued; under load this fills whole datagrams
+            try:
+                while True:
+                    items.append(q.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                for log_obj in items:
+                    if log_obj is None:
+                        stopping = True
+                        continue
+                    try:
+                        data = dumps(log_obj)
+                    except Exception:
+                        # e.g. orjson rejects lone surrogates; lose this record, not the sender thread
+                        self.dropped += 1
+                        continue
+                    if batcher is not None:
+                        batcher.add_log(data, len(data) + 1)
+                        continue
+                    if packed and size + 1 + len(data) > self.max_payload:
+                        self._send(b"\n".join(packed))
+                        packed, size = [], 0
+                    packed.append(data)
+                    size += len(data) + (1 if size else 0)
+                if packed:
+                    self._send(b"\n".join(packed))
+                    packed, size = [], 0
+            finally:
+                for _ in items:
+                    q.task_done()
+
+    def flush(self):
+        """Block until every queued record has been sent, including a partial batch."""
+        if self._queue is not None and self._thread.is_alive():
+            self._queue.join()
+        if self._batcher is not None:
+            self._batcher.flush(force=True)
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=5)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=5)
+        if self._batcher is not None:
+            self._batcher.close()
+        self.sock.close()
+        super().close()
+
 class LogBatcher:
-    """Batch logs by size or count, and flush as needed."""
-    def __init__(self, batch_size=10, batch_time=10):
+    """
+    Thread-safe client-side batcher. A batch is due once it holds batch_size
+    logs, once adding a log would take it past max_bytes, or once its oldest
+    log is batch_time seconds old.
+
+    Without on_flush, callers poll flush(), which returns the buffered logs if
+    the batch is due and [] otherwise (flush(force=True) always drains). With
+    on_flush, add_log() hands due batches to on_flush(batch) itself, and
+    start() runs a background timer that flushes batches that are due by age,
+    so records never wait more than about batch_time. on_flush is called with
+    the lock held, so batches are delivered in order; keep it short.
+    """
+    def __init__(self, batch_size=10, batch_time=10, max_bytes=None, on_flush=None):
         self.batch_size = batch_size
         self.batch_time = batch_time
+        self.max_bytes = max_bytes
+        self.on_flush = on_flush
         self.buffer = []
+        self.bytes = 0
         self.last_flush = datetime.utcnow()
+        self._first_added = None  # monotonic time the oldest buffered log arrived
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._timer = None
 
-    def add_log(self, log):
-        self.buffer.append(log)
+    def add_log(self, log, size=None):
+        """Buffer log; size is its byte cost (default len(log) for str/bytes, else 0)."""
+        if size is None:
+            size = len(log) if isinstance(log, (str, bytes)) else 0
+        with self._lock:
+            if self.on_flush is not None and self.max_bytes and self.buffer and self.bytes + size > self.max_bytes:
+                self._deliver()  # keep each batch within the byte budget
+            if not self.buffer:
+                self._first_added = time.monotonic()
+            self.buffer.append(log)
+            self.bytes += size
+            if self.on_flush is not None and len(self.buffer) >= self.batch_size:
+                self._deliver()
 
-    def flush(self):
-        if len(self.buffer) >= self.batch_size:
-            flushed = self.buffer[:]
-            self.buffer.clear()
-            self.last_flush = datetime.utcnow()
-            return flushed
-        return []
+    def _due(self):
+        if not self.buffer:
+            return False
+        if len(self.buffer) >= self.batch_size or (self.max_bytes and self.bytes >= self.max_bytes):
+            return True
+        return time.monotonic() - self._first_added >= self.batch_time
+
+    def _take(self):
+        flushed = self.buffer
+        self.buffer = []
+        self.bytes = 0
+        self._first_added = None
+        self.last_flush = datetime.utcnow()
+        return flushed
+
+    def _deliver(self):
+        batch = self._take()
+        if self.on_flush is not None:
+            self.on_flush(batch)
+        return batch
+
+    def flush(self, force=False):
+        """Return (and pass to on_flush, if set) the buffered logs if due or forced, else []."""
+        with self._lock:
+            if self.buffer and (force or self._due()):
+                return self._deliver()
+            return []
+
+    def start(self):
+        """Start the background timer that flushes batches once they reach batch_time."""
+        if self._timer is None:
+            self._timer = threading.Thread(target=self._timer_loop, name="logflow-log-batcher", daemon=True)
+            self._timer.start()
+        return self
+
+    def _timer_loop(self):
+        wait = self.batch_time
+        while not self._stop.wait(wait):
+            with self._lock:
+                if self.buffer and time.monotonic() - self._first_added >= self.batch_time:
+                    self._deliver()
+                first = self._first_added
+            # Sleep until the current oldest log is due, or a full period if empty
+            wait = self.batch_time if first is None else max(first + self.batch_time - time.monotonic(), 0.001)
+
+    def close(self):
+        """Stop the timer and flush whatever is buffered."""
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join(timeout=5)
+        return self.flush(force=True)
@@ -0,0 +1,79 @@
+"""
+Cached sink health.
+
+A CachedHealthCheck answers is_healthy() from memory. The answer comes from
+the most recent evidence: a write outcome reported by the sink, or a
+background probe. Once that evidence is older than the TTL, the next status()
+call starts a single probe (a thread for blocking probes, a task for
+coroutines) and meanwhile keeps returning the last known state. So /health
+never waits on the network, however often it is polled.
+"""
+import asyncio
+import inspect
+import os
+import threading
+import time
+
+from .diagnostics import get_logger
+
+log = get_logger("health")
+
+HEALTH_TTL = float(os.getenv("LOGFLOW_HEALTH_TTL", 10))  # seconds a probe result or write outcome stays fresh
+
+class CachedHealthCheck:
+    def __init__(self, probe, ttl=None, name="sink"):
+        self.probe = probe
+        self.ttl = ttl or HEALTH_TTL
+        self.name = name
+        self.healthy = True  # optimistic until the first probe or write says otherwise
+        self.error = None
+        self.checked_at = None  # time.monotonic() of the latest evidence
+        self.probes = 0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def record(self, healthy, error=None):
+        """Record an outcome, e.g. of a write; it counts as fresh evidence for ttl seconds."""
+        self.healthy = healthy
+        self.error = None if healthy else str(error)
+        self.checked_at = time.monotonic()
+
+    def refresh(self):
+        """Start a background probe unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        if inspect.iscoroutinefunction(self.probe):
+            asyncio.get_running_loop().create_task(self._run_async())
+        else:
+            threading.Thread(target=self._run, name=f"logflow-health-{self.name}", daemon=True).start()
+
+    def _run(self):
+        try:
+            self.probe()
+            self.record(True)
+        except Exception as e:
+            log.warning("%s health probe failed: %s", self.name, e)
+            self.record(False, e)
+        finally:
+            self.probes += 1
+            self._refreshing = False
+
+    async def _run_async(self):
+        try:
+            await self.probe()
+            self.record(True)
+        except Exception as e:
+            log.warning("%s health probe failed: %s", self.name, e)
+            self.record(False, e)
+        finally:
+            self.probes += 1
+            self._refreshing = False
+
+    def status(self):
+        """Last known health; never blocks. Schedules a probe if the evidence has gone stale."""
+        checked_at = self.checked_at
+        if checked_at is None or time.monotonic() - checked_at >= self.ttl:
+            self.refresh()
+        return self.healthy
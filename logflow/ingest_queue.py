@@ -0,0 +1,166 @@
+import asyncio
+import os
+
+OVERFLOW_POLICIES = ("drop-newest", "drop-oldest", "sample")
+
+QUEUE_MAX_MESSAGES = int(os.getenv("LOGFLOW_QUEUE_MAX_MESSAGES", 0))  # 0 = unlimited
+QUEUE_MAX_BYTES = int(os.getenv("LOGFLOW_QUEUE_MAX_BYTES", 0))  # 0 = unlimited
+QUEUE_POLICY = os.getenv("LOGFLOW_QUEUE_POLICY", "drop-newest")
+QUEUE_SAMPLE_RATE = int(os.getenv("LOGFLOW_QUEUE_SAMPLE_RATE", 10))  # "sample" keeps 1 in N while full
+
+def _size(msg):
+    """UTF-8 length of msg; ASCII (the common case) needs no encoding."""
+    return len(msg) if msg.isascii() else len(msg.encode("utf-8", "surrogatepass"))
+
+def _measure(item):
+    """Return (messages, bytes) for a queued str or a chunk (list of str) from the batch receiver."""
+    if isinstance(item, list):
+        return len(item), sum(map(_size, item))
+    return 1, _size(item)
+
+class IngestQueue(asyncio.Queue):
+    """
+    Ingest queue between the UDP receiver and the batcher, bounded by message count
+    and/or bytes (UTF-8 encoded size). When full, put_nowait() applies the overflow policy instead of
+    growing without limit:
+      - drop-newest: discard the incoming message(s)
+      - drop-oldest: evict queued messages until the new ones fit
+      - sample: keep one in every sample_rate arrivals (evicting the oldest), drop the rest
+    Dropped messages are counted per policy in self.drops.
+    """
+    def __init__(self, max_messages=None, max_bytes=None, policy=None, sample_rate=None):
+        super().__init__()  # limits are enforced here, not by asyncio.Queue's maxsize
+        self.max_messages = QUEUE_MAX_MESSAGES if max_messages is None else max_messages
+        self.max_bytes = QUEUE_MAX_BYTES if max_bytes is None else max_bytes
+        self.policy = policy or QUEUE_POLICY
+        if self.policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {self.policy!r} (expected one of {OVERFLOW_POLICIES})")
+        self.sample_rate = max(sample_rate or QUEUE_SAMPLE_RATE, 1)
+        self.messages = 0
+        self.bytes = 0
+        self.drops = {p: 0 for p in OVERFLOW_POLICIES}
+        self._arrivals_while_full = 0
+
+    def _put(self, item):
+        n, size = _measure(item)
+        self.messages += n
+        self.bytes += size
+        super()._put(item)
+
+    def _get(self):
+        item = super()._get()
+        n, size = _measure(item)
+        self.messages -= n
+        self.bytes -= size
+        return item
+
+    def _overflows(self, n, size):
+        return ((self.max_messages and self.messages + n > self.max_messages) or
+                (self.max_bytes and self.bytes + size > self.max_bytes))
+
+    def _could_fit(self, n, size):
+        """Whether n messages of size bytes fit in an empty queue."""
+        return (not self.max_messages or n <= self.max_messages) and (not self.max_bytes or size <= self.max_bytes)
+
+    def _evict_for(self, n, size):
+        """Drop the oldest queued messages until n messages of size bytes fit; chunks are trimmed, not dropped whole."""
+        queue = self._queue
+        while queue and self._overflows(n, size):
+            head = queue[0]
+            if isinstance(head, list):
+                excess_n = self.messages + n - self.max_messages if self.max_messages else 0
+                excess_bytes = self.bytes + size - self.max_bytes if self.max_bytes else 0
+                k = freed = 0
+                while k < len(head) and (k < excess_n or freed < excess_bytes):
+                    freed += _size(head[k])
+                    k += 1
+                if k < len(head):
+                    queue[0] = head[k:]  # a new list: the receiver callback may still hold the old one
+                    self.messages -= k
+                    self.bytes -= freed
+                    self.drops[self.policy] += k
+                    continue
+            self.drops[self.policy] += _measure(super().get_nowait())[0]
+        return not self._overflows(n, size)
+
+    def put_nowait(self, item):
+        """
+        Enqueue item, applying the overflow policy if it does not fit. A chunk is
+        enqueued in part when only part of it fits. Returns False if nothing was
+        enqueued.
+        """
+        n, size = _measure(item)
+        if not self._overflows(n, size):
+            self._arrivals_while_full = 0
+            super().put_nowait(item)
+            return True
+        if isinstance(item, list):
+            return self._put_chunk(item)
+        if self.policy == "sample":
+            self._arrivals_while_full += 1
+            keep = self._arrivals_while_full % self.sample_rate == 0
+        else:
+            keep = self.policy == "drop-oldest"
+        # Never evict for a message that could not fit even in an empty queue
+        if not (keep and self._could_fit(n, size) and self._evict_for(n, size)):
+            self.drops[self.policy] += n
+            return False
+        super().put_nowait(item)
+        return True
+
+    def _put_chunk(self, chunk):
+        """Overflow handling for a receiver chunk, message by message."""
+        sizes = [_size(m) for m in chunk]
+        if self.policy == "drop-newest":
+            # Keep the prefix that fits in the room left
+            room = self.max_messages - self.messages if self.max_messages else len(chunk)
+            room_bytes = self.max_bytes - self.bytes if self.max_bytes else None
+            keep = total = 0
+            for s in sizes:
+                if keep >= room or (room_bytes is not None and total + s > room_bytes):
+                    break
+                keep += 1
+                total += s
+            kept = chunk[:keep]
+        elif self.policy == "drop-oldest":
+            # Keep the newest suffix that fits in an empty queue, evicting older messages for it
+            keep = total = 0
+            for s in reversed(sizes):
+                if not self._could_fit(keep + 1, total + s):
+                    break
+                keep += 1
+                total += s
+            kept = chunk[len(chunk) - keep:]
+            if kept:
+                self._evict_for(keep, total)
+        else:
+            kept = []
+            kept_bytes = 0
+            for msg, s in zip(chunk, sizes):
+                if not self._overflows(len(kept) + 1, kept_bytes + s):
+                    self._arrivals_while_full = 0
+                else:
+                    self._arrivals_while_full += 1
+                    if self._arrivals_while_full % self.sample_rate or not self._could_fit(1, s):
+                        continue
+                    # Make room by evicting queued messages first, then the oldest ones kept from this chunk
+                    self._evict_for(len(kept) + 1, kept_bytes + s)
+                    while kept and self._overflows(len(kept) + 1, kept_bytes + s):
+                        kept_bytes -= _size(kept.pop(0))
+                kept.append(msg)
+                kept_bytes += s
+        self.drops[self.policy] += len(chunk) - len(kept)
+        if not kept:
+            return False
+        super().put_nowait(kept)
+        return True
+
+    def stats(self):
+        return {
+            "depth": self.messages,
+            "bytes": self.bytes,
+            "max_messages": self.max_messages,
+            "max_bytes": self.max_bytes,
+            "policy": self.policy,
+            "drops": dict(self.drops),
+        }
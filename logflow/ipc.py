@@ -1,27 +1,258 @@
+"""
+Fan-out of the primary listener's output to `logflow` tail clients.
+
+IPCServer runs an asyncio unix-socket server on its own event loop thread.
+broadcast_batch() encodes a batch once and hands it to that loop, so the sink
+thread that calls it never waits for a client. Each client has a bounded send buffer
+(LOGFLOW_TAIL_BUFFER_BYTES). When a client falls behind, it is either lagged
+(lines are skipped and it is told how many) or disconnected, according to
+LOGFLOW_TAIL_SLOW_POLICY. The other clients and the producer never wait for it.
+
+On connect, a client sends one JSON line {"subscribe": {...}} that narrows
+what it receives (see TailFilter); {} or nothing means every line. Filters run
+on the server, once per batch per distinct subscription. Clients with identical
+subscriptions share one compiled filter and one encoded buffer. With a replay
+history configured (LOGFLOW_REPLAY_MAX_LINES / LOGFLOW_REPLAY_MAX_BYTES), the
+same line may also ask for {"replay": {"lines": K, "seconds": T}} to receive
+recent lines from memory before the live stream.
+"""
+import asyncio
+import json
+import logging
 import os
+import re
 import socket
 import sys
 import threading
 import time
+from collections import deque
 from contextlib import closing
+from typing import List
+
+from .diagnostics import get_logger
+from .metrics import Histogram
+
+log = get_logger("ipc")
 
 # Default UNIX socket path for IPC between primary and tail listeners
 LOGFLOW_IPC_SOCKET = os.getenv("LOGFLOW_IPC_SOCKET", "/tmp/logflow-listener.sock")
+MAX_TAIL_CLIENTS = int(os.getenv("LOGFLOW_MAX_TAIL_CLIENTS", 64))
+TAIL_BUFFER_BYTES = int(os.getenv("LOGFLOW_TAIL_BUFFER_BYTES", 1024 * 1024))  # unsent bytes allowed per client
+SLOW_POLICIES = ("lag", "disconnect")
+TAIL_SLOW_POLICY = os.getenv("LOGFLOW_TAIL_SLOW_POLICY", "lag")  # lag (skip lines) | disconnect
+
+SUBSCRIBE_TIMEOUT = 0.5  # seconds to wait for a client's subscription line before sending it everything
+SUBSCRIPTION_KEYS = ("level", "logger", "contains", "regex", "fields")
+TAIL_FILTER = os.getenv("LOGFLOW_TAIL_FILTER")  # JSON subscription used by `logflow-listener` in tail mode
+REPLAY_MAX_LINES = int(os.getenv("LOGFLOW_REPLAY_MAX_LINES", 10000))  # lines kept for new tails; 0 = no limit
+REPLAY_MAX_BYTES = int(os.getenv("LOGFLOW_REPLAY_MAX_BYTES", 4 * 1024 * 1024))  # bytes kept; both 0 = off
+TAIL_REPLAY_LINES = int(os.getenv("LOGFLOW_TAIL_REPLAY_LINES", 0))  # tail mode: ask for this many recent lines
+TAIL_REPLAY_SECONDS = float(os.getenv("LOGFLOW_TAIL_REPLAY_SECONDS", 0))  # tail mode: or the last T seconds
+TAIL_READ_BYTES = int(os.getenv("LOGFLOW_TAIL_READ_BYTES", 256 * 1024))  # tail client receive buffer
+_UNPARSED = object()
+
+def _level_number(level):
+    if isinstance(level, int):
+        return level
+    number = logging.getLevelName(str(level).upper())
+    if not isinstance(number, int):
+        raise ValueError(f"unknown level {level!r}")
+    return number
+
+class TailFilter:
+    """
+    Compiled tail subscription; a line must pass every condition given:
+
+      level     minimum level, by the record's "level" field (e.g. "WARNING")
+      logger    logger name prefix, by the "name" (or "logger") field, matching
+                "app.db" and "app.db.pool" but not "app.dbx"
+      contains  substring of the raw line
+      regex     re.search() on the raw line
+      fields    {"field": value, ...} equality on top-level JSON fields
+
+    level, logger and fields need the line to be a JSON object; other lines
+    never match them. A batch's lines are parsed at most once, however many
+    filters look at them.
+    """
+    def __init__(self, subscription):
+        unknown = set(subscription) - set(SUBSCRIPTION_KEYS)
+        if unknown:
+            raise ValueError(f"unknown subscription keys {sorted(unknown)} (expected {list(SUBSCRIPTION_KEYS)})")
+        self.subscription = subscription
+        self.level = _level_number(subscription["level"]) if subscription.get("level") is not None else None
+        self.logger = subscription.get("logger") or None
+        self.contains = subscription.get("contains") or None
+        try:
+            self.regex = re.compile(subscription["regex"]) if subscription.get("regex") else None
+        except re.error as e:
+            raise ValueError(f"bad regex: {e}")
+        self.fields = subscription.get("fields") or None
+        if self.fields is not None and not isinstance(self.fields, dict):
+            raise ValueError("fields must be an object")
+        self.needs_json = self.level is not None or self.logger is not None or self.fields is not None
+        self.clients = 0  # subscribers sharing this filter
+
+    def match(self, line, record):
+        if self.contains is not None and self.contains not in line:
+            return False
+        if self.regex is not None and not self.regex.search(line):
+            return False
+        if not self.needs_json:
+            return True
+        if not isinstance(record, dict):
+            return False
+        if self.level is not None:
+            level = record.get("level")
+            try:
+                if level is None or _level_number(level) < self.level:
+                    return False
+            except ValueError:
+                return False
+        if self.logger is not None:
+            name = record.get("name", record.get("logger"))
+            if not isinstance(name, str) or not (name == self.logger or name.startswith(self.logger + ".")):
+                return False
+        if self.fields is not None:
+            for key, value in self.fields.items():
+                if record.get(key) != value:
+                    return False
+        return True
+
+    def apply(self, lines, records):
+        """Return (encoded matching lines, count); records is the batch's shared parse cache."""
+        matched = []
+        for i, line in enumerate(lines):
+            record = None
+            if self.needs_json:
+                record = records.get(i, _UNPARSED)
+                if record is _UNPARSED:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    records[i] = record
+            if self.match(line, record):
+                matched.append(line)
+        if not matched:
+            return b"", 0
+        return ("\n".join(matched) + "\n").encode(errors="replace"), len(matched)
+
+def _last_lines(data, count):
+    """The last count newline-terminated lines of data."""
+    cut = len(data)
+    for _ in range(count):
+        cut = data.rfind(b"\n", 0, cut - 1) + 1
+        if cut == 0:
+            return data
+    return data[cut:]
+
+class ReplayBuffer:
+    """
+    Recent broadcast history for new tail clients, bounded by max_lines and
+    max_bytes (0 = no limit on that axis; both 0 disables it). Batches are kept
+    as the encoded bytes objects already built for broadcasting, with their
+    arrival time and line count. Nothing is copied per line, and the oldest
+    batch is trimmed by whole lines once a limit is exceeded. Only used from
+    the server's loop thread.
+    """
+    def __init__(self, max_lines=None, max_bytes=None):
+        self.max_lines = REPLAY_MAX_LINES if max_lines is None else max_lines
+        self.max_bytes = REPLAY_MAX_BYTES if max_bytes is None else max_bytes
+        self.enabled = bool(self.max_lines or self.max_bytes)
+        self.entries = deque()  # (timestamp, data, lines), oldest first
+        self.lines = 0
+        self.bytes = 0
+
+    def append(self, data, lines, timestamp):
+        if not self.enabled:
+            return
+        self.entries.append((timestamp, data, lines))
+        self.lines += lines
+        self.bytes += len(data)
+        self._trim()
+
+    def _trim(self):
+        while self.entries:
+            excess_lines = self.lines - self.max_lines if self.max_lines else 0
+            excess_bytes = self.bytes - self.max_bytes if self.max_bytes else 0
+            if excess_lines <= 0 and excess_bytes <= 0:
+                return
+            timestamp, data, lines = self.entries[0]
+            if excess_lines >= lines or excess_bytes >= len(data):
+                self.entries.popleft()
+                self.lines -= lines
+                self.bytes -= len(data)
+                continue
+            # Drop just enough whole lines from the front of the oldest batch
+            cut = dropped = 0
+            while dropped < excess_lines or cut < excess_bytes:
+                cut = data.index(b"\n", cut) + 1
+                dropped += 1
+            self.entries[0] = (timestamp, data[cut:], lines - dropped)
+            self.lines -= dropped
+            self.bytes -= cut
+
+    def snapshot(self, lines=None, seconds=None, tail_filter=None, now=None, max_bytes=None):
+        """
+        Return (data, count) for the most recent history: at most `lines` lines
+        and/or only batches from the last `seconds`, after applying tail_filter,
+        trimmed to the newest whole lines that fit in max_bytes.
+        """
+        if seconds:
+            since = (time.time() if now is None else now) - seconds
+            chunks = [data for timestamp, data, _ in self.entries if timestamp >= since]
+        else:
+            chunks = [data for _, data, _ in self.entries]
+        if not chunks:
+            return b"", 0
+        data = b"".join(chunks)
+        if tail_filter is not None:
+            data, _ = tail_filter.apply(_split_lines(data), {})
+        if lines:
+            data = _last_lines(data, lines)
+        if max_bytes is not None and len(data) > max_bytes:
+            data = data[data.find(b"\n", len(data) - max_bytes - 1) + 1:]
+        return data, data.count(b"\n")
+
+class _TailClient:
+    __slots__ = ("writer", "transport", "skipped", "filter")
+
+    def __init__(self, writer, tail_filter=None):
+        self.writer = writer
+        self.transport = writer.transport
+        self.skipped = 0  # lines not sent since the client fell behind
+        self.filter = tail_filter
 
 class IPCServer:
-    def __init__(self, sock_path=LOGFLOW_IPC_SOCKET, max_clients=None):
+    """
+    Serves tail clients on sock_path. start() and stop() are synchronous and
+    broadcast() may be called from any thread; all socket I/O happens on the
+    server's own loop thread. Counters (lines_sent, lines_skipped, disconnects,
+    broadcast_seconds) are read by /metrics.
+    """
+    def __init__(self, sock_path=LOGFLOW_IPC_SOCKET, max_clients=None, buffer_bytes=None, slow_policy=None,
+                 replay_lines=None, replay_bytes=None):
         self.sock_path = sock_path
-        if max_clients is None:
-            self.max_clients = int(os.getenv("LOGFLOW_MAX_TAIL_CLIENTS", 5))
-        else:
-            self.max_clients = max_clients
-        print(f"[IPCServer] Initialized with max_clients={self.max_clients}")
-        sys.stdout.flush()
-        self.clients = []  # List of connected sockets
-        self.lock = threading.Lock()
-        self.server_sock = None
+        self.max_clients = max_clients or MAX_TAIL_CLIENTS
+        self.buffer_bytes = buffer_bytes or TAIL_BUFFER_BYTES
+        self.slow_policy = (slow_policy or TAIL_SLOW_POLICY).lower()
+        if self.slow_policy not in SLOW_POLICIES:
+            raise ValueError(f"Unknown tail slow policy: {self.slow_policy!r} (expected one of {SLOW_POLICIES})")
+        self.clients = []  # _TailClient, only mutated on the loop thread
+        self._joining = 0  # connections still sending their subscription
         self.running = False
-        self.accept_thread = None
+        self.loop = None
+        self.thread = None
+        self._server = None
+        self._start_error = None
+        self._filters = {}  # canonical subscription JSON -> shared TailFilter
+        self.replay = ReplayBuffer(replay_lines, replay_bytes)
+        self.lines_sent = 0
+        self.lines_skipped = 0
+        self.disconnects = 0
+        self.broadcast_seconds = Histogram()  # per broadcast, until queued for every client
+        log.info("IPC server initialized with max_clients=%d, buffer=%d bytes, slow clients: %s",
+                 self.max_clients, self.buffer_bytes, self.slow_policy)
 
     def start(self):
         if os.path.exists(self.sock_path):
@@ -33,113 +264,326 @@ class IPCServer:
                     raise RuntimeError(f"IPC socket already in use: {self.sock_path}")
             except (ConnectionRefusedError, FileNotFoundError):
                 os.unlink(self.sock_path)
-        self.server_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        self.server_sock.bind(self.sock_path)
-        self.server_sock.listen(self.max_clients)
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="logflow-ipc", daemon=True)
+        self.thread.start()
+        ready.wait()
+        if self._start_error is not None:
+            raise self._start_error
+
+    def _run(self, ready):
+        loop = self.loop
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(asyncio.start_unix_server(self._on_client, path=self.sock_path))
+        except Exception as e:
+            self._start_error = e
+            ready.set()
+            loop.close()
+            return
         self.running = True
-        self.accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
-        self.accept_thread.start()
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            for client in list(self.clients):
+                client.transport.abort()
+            self.clients.clear()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
 
-    def _accept_loop(self):
-        while self.running:
-            try:
-                client_sock, _ = self.server_sock.accept()
-                with self.lock:
-                    # ATOMIC: check before appending
-                    print(f"[IPCServer] Accepting connection. Current clients: {len(self.clients)} / {self.max_clients}")
-                    if len(self.clients) >= self.max_clients:
-                        print("[IPCServer] Too many clients, rejecting new connection.")
-                        client_sock.sendall(b"[logflow] Too many tail clients connected.\n")
-                        try:
-                            client_sock.shutdown(socket.SHUT_WR)
-                        except Exception as e:
-                            print(f"[IPCServer] Shutdown error: {e}")
-                        time.sleep(0.2)
-                        print("[IPCServer] Closing client socket after error...")
-                        client_sock.close()
-                        print("[IPCServer] Client socket closed after error.")
-                        sys.stdout.flush()
-                        continue
-                    self.clients.append(client_sock)
-                print(f"[logflow] Tail client connected. Total: {len(self.clients)}")
-                sys.stdout.flush()
-                threading.Thread(target=self._handle_client, args=(client_sock,), daemon=True).start()
-            except Exception as e:
-                if self.running:
-                    print(f"[logflow] IPC accept error: {e}")
-                    sys.stdout.flush()
-
-    def _handle_client(self, client_sock):
+    async def _on_client(self, reader, writer):
+        if len(self.clients) + self._joining >= self.max_clients:
+            log.warning("Too many tail clients (%d), rejecting new connection", self.max_clients)
+            writer.write(b"[logflow] Too many tail clients connected.\n")
+            writer.close()
+            return
+        self._joining += 1  # holds a slot while the subscription is read, so concurrent connects can't overshoot
+        try:
+            tail_filter, replay = await self._read_subscription(reader)
+        except ValueError as e:
+            log.warning("Rejecting tail client with invalid subscription: %s", e)
+            writer.write(f"[logflow] Invalid subscription: {e}\n".encode())
+            writer.close()
+            return
+        finally:
+            self._joining -= 1
+        client = _TailClient(writer, tail_filter)
+        if replay:
+            # No await between the snapshot and joining the clients: nothing is missed or sent twice.
+            # Capped at half the send buffer so live batches still fit behind it.
+            data, count = self.replay.snapshot(replay.get("lines"), replay.get("seconds"), tail_filter,
+                                               max_bytes=self.buffer_bytes // 2)
+            if count:
+                writer.write(data)
+        self.clients.append(client)
+        log.info("Tail client connected%s. Total: %d",
+                 f" (filter {tail_filter.subscription})" if tail_filter else "", len(self.clients))
         try:
-            while self.running:
-                data = client_sock.recv(1)
-                if not data:
-                    break  # Client disconnected
-        except Exception:
+            while await reader.read(4096):
+                pass  # nothing else is expected after the subscription; EOF means they went away
+        except (ConnectionError, OSError):
             pass
         finally:
-            with self.lock:
-                if client_sock in self.clients:
-                    self.clients.remove(client_sock)
-            client_sock.close()
-            print(f"[logflow] Tail client disconnected. Total: {len(self.clients)}")
+            self._drop(client)
+
+    async def _read_subscription(self, reader):
+        """
+        Read the optional {"subscribe": {...}, "replay": {...}} line; returns
+        (shared TailFilter or None, replay request or None).
+        """
+        try:
+            line = await asyncio.wait_for(reader.readline(), SUBSCRIBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None, None  # a client that never subscribes gets everything
+        except (ConnectionError, OSError):
+            return None, None
+        if not line.strip():
+            return None, None
+        try:
+            message = json.loads(line)
+        except ValueError:
+            raise ValueError("expected a JSON line")
+        if not isinstance(message, dict) or not isinstance(message.get("subscribe"), dict):
+            raise ValueError('expected {"subscribe": {...}}')
+        replay = message.get("replay") or None
+        if replay is not None:
+            if not isinstance(replay, dict) or set(replay) - {"lines", "seconds"}:
+                raise ValueError('replay must look like {"lines": K, "seconds": T}')
+            for key, value in replay.items():
+                if value is not None and (not isinstance(value, (int, float)) or value < 0):
+                    raise ValueError(f"replay {key} must be a non-negative number")
+        subscription = {k: v for k, v in message["subscribe"].items() if v not in (None, "", {})}
+        if not subscription:
+            return None, replay
+        key = json.dumps(subscription, sort_keys=True)
+        tail_filter = self._filters.get(key)
+        if tail_filter is None:
+            tail_filter = self._filters[key] = TailFilter(subscription)
+        tail_filter.clients += 1
+        return tail_filter, replay
+
+    def _drop(self, client, reason=None):
+        if client not in self.clients:
+            return
+        self.clients.remove(client)
+        if client.filter is not None:
+            client.filter.clients -= 1
+            if not client.filter.clients:
+                self._filters.pop(json.dumps(client.filter.subscription, sort_keys=True), None)
+        if reason is None:
+            client.writer.close()
+            log.info("Tail client disconnected. Total: %d", len(self.clients))
+        else:
+            client.transport.abort()  # don't wait to flush a backlog it isn't reading
+            self.disconnects += 1
+            log.warning("Tail client forcibly disconnected (%s). Total: %d", reason, len(self.clients))
+
+    def unsent_bytes(self):
+        """Per-client bytes queued but not yet written to the socket (read from any thread for /metrics)."""
+        return [client.transport.get_write_buffer_size() for client in list(self.clients)]
+
+    def _send(self, client, data, count):
+        limit = self.buffer_bytes
+        transport = client.transport
+        if transport.is_closing():
+            return
+        buffered = transport.get_write_buffer_size()
+        if client.skipped and buffered <= limit // 2:
+            # Caught up enough to resume; say what it missed
+            transport.write(b"[logflow] %d lines skipped: tail client too slow\n" % client.skipped)
+            client.skipped = 0
+        if client.skipped or buffered + len(data) > limit:
+            if self.slow_policy == "disconnect":
+                self._drop(client, f"{buffered} bytes unsent")
+                return
+            client.skipped += count
+            self.lines_skipped += count
+            return
+        transport.write(data)
+
+    def _fanout(self, data, lines, start):
+        filtered = {}  # TailFilter -> (data, count), shared by its subscribers
+        records = {}  # line index -> parsed JSON, shared by all filters
+        for client in list(self.clients):
+            if client.filter is None:
+                self._send(client, data, len(lines))
+                continue
+            result = filtered.get(client.filter)
+            if result is None:
+                result = filtered[client.filter] = client.filter.apply(lines, records)
+            if result[1]:
+                self._send(client, *result)
+        self.lines_sent += len(lines)
+        self.replay.append(data, len(lines), time.time())
+        self.broadcast_seconds.observe(time.perf_counter() - start)
 
     def broadcast(self, line: str):
-        with self.lock:
-            for client in list(self.clients):
-                try:
-                    client.sendall(line.encode(errors="replace") + b"\n")
-                except Exception:
-                    self.clients.remove(client)
-                    client.close()
-                    print(f"[logflow] Tail client forcibly disconnected. Total: {len(self.clients)}")
+        """Queue line for every connected client; never blocks on a client."""
+        self.broadcast_batch([line])
+
+    def broadcast_batch(self, lines: List[str]):
+        """
+        Queue a batch of lines for every connected client. The batch is encoded
+        once into one buffer that all clients share, and each client gets it in
+        a single write: one syscall per client per batch, not per line.
+        """
+        if not lines or not self.running or not (self.clients or self.replay.enabled):
+            return
+        data = ("\n".join(lines) + "\n").encode(errors="replace")
+        try:
+            self.loop.call_soon_threadsafe(self._fanout, data, list(lines), time.perf_counter())
+        except RuntimeError:
+            pass  # loop already stopped
 
     def stop(self):
-        self.running = False
-        if self.server_sock:
-            self.server_sock.close()
+        if self.running:
+            self.running = False
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
         if os.path.exists(self.sock_path):
             try:
                 os.unlink(self.sock_path)
             except Exception:
                 pass
-        with self.lock:
-            for client in self.clients:
-                try:
-                    client.close()
-                except Exception:
-                    pass
-            self.clients.clear()
+
+class LineBuffer:
+    """
+    Receive buffer for a line stream. fill() reads straight into the free tail
+    of a preallocated bytearray with recv_into; take() returns every complete
+    line received so far as one bytes object and keeps the trailing partial
+    line, which is moved to the front only when space runs low. The buffer
+    grows only for a single line longer than itself.
+    """
+    def __init__(self, size=None):
+        self.buf = bytearray(size or TAIL_READ_BYTES)
+        self.start = 0  # first byte not yet taken
+        self.end = 0  # end of received data
+
+    def _make_room(self):
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif len(self.buf) - self.end < len(self.buf) // 4:
+            if self.start:
+                n = self.end - self.start
+                self.buf[:n] = self.buf[self.start:self.end]
+                self.start, self.end = 0, n
+            if len(self.buf) - self.end < len(self.buf) // 4:
+                self.buf.extend(bytes(len(self.buf)))
+
+    def fill(self, recv_into):
+        """Receive once into the free space; returns the byte count (0 at EOF)."""
+        self._make_room()
+        with memoryview(self.buf) as view:
+            n = recv_into(view[self.end:])
+        self.end += n
+        return n
+
+    async def afill(self, recv_into):
+        self._make_room()
+        with memoryview(self.buf) as view:
+            n = await recv_into(view[self.end:])
+        self.end += n
+        return n
+
+    def take(self):
+        """Return all complete lines (with their newlines) as bytes, or b"" if there are none."""
+        last = self.buf.rfind(b"\n", self.start, self.end)
+        if last < 0:
+            return b""
+        chunk = bytes(self.buf[self.start:last + 1])
+        self.start = last + 1
+        return chunk
+
+    def rest(self):
+        """Return and clear the incomplete last line."""
+        chunk = bytes(self.buf[self.start:self.end])
+        self.start = self.end = 0
+        return chunk
+
+def _split_lines(chunk):
+    lines = chunk.decode(errors="replace").split("\n")
+    if not lines[-1]:
+        lines.pop()  # chunk ended with a newline
+    return lines
 
 class IPCClient:
-    def __init__(self, sock_path=LOGFLOW_IPC_SOCKET):
+    """
+    Tail client; subscription (see TailFilter) is sent on connect so the server
+    filters for us, along with an optional request to first replay the last
+    replay_lines lines and/or replay_seconds seconds of history. After connect(), either tail() to stdout or iterate over the
+    client (for / async for) to get lines.
+    """
+    def __init__(self, sock_path=LOGFLOW_IPC_SOCKET, subscription=None, replay_lines=None, replay_seconds=None):
         self.sock_path = sock_path
+        self.subscription = subscription or {}
+        self.replay = {k: v for k, v in (("lines", replay_lines), ("seconds", replay_seconds)) if v}
         self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
 
     def connect(self):
         print(f"[IPCClient] Connecting to {self.sock_path}")
         self.sock.connect(self.sock_path)
+        message = {"subscribe": self.subscription}
+        if self.replay:
+            message["replay"] = self.replay
+        self.sock.sendall(json.dumps(message).encode() + b"\n")
         print(f"[IPCClient] Connected!")
 
-    def tail(self):
+    def _chunks(self):
+        """Yield received data in runs of complete lines, as bytes; a trailing partial line comes last."""
+        buffer = LineBuffer()
+        recv_into = self.sock.recv_into
+        while buffer.fill(recv_into):
+            chunk = buffer.take()
+            if chunk:
+                yield chunk
+        rest = buffer.rest()
+        if rest:
+            yield rest
+
+    def __iter__(self):
+        """Iterate over received lines (str, without the newline) until the server closes."""
+        for chunk in self._chunks():
+            yield from _split_lines(chunk)
+
+    async def _achunks(self):
+        loop = asyncio.get_running_loop()
+        self.sock.setblocking(False)
+        buffer = LineBuffer()
+        recv_into = lambda view: loop.sock_recv_into(self.sock, view)
+        while await buffer.afill(recv_into):
+            chunk = buffer.take()
+            if chunk:
+                yield chunk
+        rest = buffer.rest()
+        if rest:
+            yield rest
+
+    async def __aiter__(self):
+        """Async counterpart of __iter__, reading with the running event loop."""
+        async for chunk in self._achunks():
+            for line in _split_lines(chunk):
+                yield line
+
+    def tail(self, out=None):
+        """
+        Copy everything received to out (default: stdout), without decoding and
+        one write per recv rather than per line, until the server closes.
+        """
+        if out is None:
+            sys.stdout.flush()
+            out = sys.stdout.buffer
         try:
-            while True:
-                line = b""
-                while not line.endswith(b"\n"):
-                    chunk = self.sock.recv(1024)
-                    if not chunk:
-                        break
-                    line += chunk
-                if not line:
-                    break
-                print(line.decode(errors="replace"), end="")
-            # After main loop, check if any partial data left
-            try:
-                leftover = self.sock.recv(1024)
-                if leftover:
-                    print("[IPCClient] Received data before close:", leftover.decode(errors="replace"))
-            except Exception as e:
-                print(f"[IPCClient] Exception on final recv: {e}")
+            for chunk in self._chunks():
+                out.write(chunk)
+                out.flush()
+        except OSError as e:
+            print(f"[IPCClient] Connection error: {e}")
         finally:
             try:
                 self.sock.close()
@@ -1,14 +1,20 @@
 import asyncio
 import os
 import json
-import time
+import signal
+import threading
 import uuid
+import warnings
 from datetime import datetime
 from typing import List
-from .sink import BaseSink, DiskSink, StdoutSink
+from .sink import DiskSink, StdoutSink, s3_client_kwargs
 import socket
-from .ipc import IPCServer, IPCClient, LOGFLOW_IPC_SOCKET
-import sys
+from .ipc import IPCServer, IPCClient, LOGFLOW_IPC_SOCKET, TAIL_FILTER, TAIL_REPLAY_LINES, TAIL_REPLAY_SECONDS
+from .ingest_queue import IngestQueue, _measure
+from .dispatch import SinkDispatcher
+from .spool import Spool, SpoolPipeline, SPOOL_DIR
+from .metrics import ServerMetrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .diagnostics import get_logger, hot_log, configure_logging
 
 try:
     import boto3
@@ -21,11 +27,20 @@ UDP_IP = os.getenv("UDP_LOG_LISTEN_IP", "0.0.0.0")
 UDP_PORT = int(os.getenv("UDP_LOG_LISTEN_PORT", 9999))
 BATCH_SIZE_BYTES = int(os.getenv("UDP_BATCH_SIZE_BYTES", 1024 * 1024))  # 1MB
 BATCH_INTERVAL = float(os.getenv("UDP_BATCH_INTERVAL", 60))  # 60 seconds, now supports sub-second intervals
+log = get_logger("listener")
+
 HEALTH_CHECK_PORT = int(os.getenv("LOGFLOW_HEALTH_PORT", 8080))  # Now configurable
+WORKERS = int(os.getenv("LOGFLOW_WORKERS", 1))  # >1 forks SO_REUSEPORT worker processes
+RECEIVE_ENGINE = os.getenv("LOGFLOW_RECEIVE_ENGINE", "protocol")  # "protocol" or "batch"
+RECV_BATCH = int(os.getenv("LOGFLOW_RECV_BATCH", 512))  # max datagrams drained per wakeup (batch engine)
+RECV_BUFFER_BYTES = int(os.getenv("LOGFLOW_RECV_BUFFER_BYTES", 4 * 1024 * 1024))  # batch engine ring size
+MAX_DATAGRAM = 65535
+STOP_POLL_INTERVAL = 0.1  # how often loops re-check a (threading) stop_event while idle
+SINK_DRAIN_TIMEOUT = float(os.getenv("LOGFLOW_SINK_DRAIN_TIMEOUT", 5))  # seconds to finish sink writes on shutdown
 
 def get_s3_config():
     endpoint = os.getenv("S3_ENDPOINT", "http://minio_logflow:9000")
-    print(f"[listener:get_s3_config] S3_ENDPOINT={endpoint}")
+    log.debug("S3 config", extra={"fields": {"endpoint": endpoint}})
     return {
         "endpoint_url": endpoint,
         "aws_access_key_id": os.getenv("S3_ACCESS_KEY", "minioadmin"),
@@ -34,8 +49,31 @@ def get_s3_config():
         "bucket": os.getenv("S3_BUCKET", "logflow-ingest"),
     }
 
+_s3_client = None
+_s3_client_cfg = None
+_s3_client_lock = threading.Lock()
+
+def get_s3_client():
+    """
+    Return (client, cfg) for the deprecated upload_batch. The boto3 client is built once per process
+    and reused, so every flush shares its connection pool (S3_MAX_POOL_CONNECTIONS)
+    and keep-alive connections instead of paying for a new client and TLS handshake.
+    """
+    global _s3_client, _s3_client_cfg
+    with _s3_client_lock:
+        if _s3_client is None:
+            _s3_client_cfg = get_s3_config()
+            _s3_client = boto3.client("s3", **s3_client_kwargs(_s3_client_cfg))
+        return _s3_client, _s3_client_cfg
+
+def reset_s3_client():
+    """Drop the cached upload_batch client, e.g. after changing the S3_* environment."""
+    global _s3_client, _s3_client_cfg
+    with _s3_client_lock:
+        _s3_client = _s3_client_cfg = None
+
 async def udp_server(batch_queue: asyncio.Queue, ready_event=None):
-    print(f"[listener] Preparing to listen for UDP logs on {UDP_IP}:{UDP_PORT}")
+    log.info("Preparing to listen for UDP logs on %s:%s", UDP_IP, UDP_PORT)
     loop = asyncio.get_running_loop()
     sock = asyncio.DatagramProtocol()
     transport, protocol = await loop.create_datagram_endpoint(
@@ -44,89 +82,206 @@ async def udp_server(batch_queue: asyncio.Queue, ready_event=None):
     )
     if ready_event:
         ready_event.set()
-        print(f"[listener] UDP server is READY on {UDP_IP}:{UDP_PORT}")
+        log.info("UDP server is READY on %s:%s", UDP_IP, UDP_PORT)
     try:
         await asyncio.Future()  # run forever
     finally:
         transport.close()
 
 class UDPHandler(asyncio.DatagramProtocol):
-    def __init__(self, batch_queue, received_callback=None):
+    def __init__(self, batch_queue, received_callback=None, metrics=None):
         self.batch_queue = batch_queue
         self.received_callback = received_callback
+        self.metrics = metrics or ServerMetrics()
     def datagram_received(self, data, addr):
-        print(f"[UDPHandler] datagram_received called from {addr}")
+        metrics = self.metrics
+        metrics.datagrams += 1
+        metrics.bytes += len(data)
         try:
             msg = data.decode()
-            print(f"[UDPHandler] Received datagram from {addr}: {msg}")
+            hot_log.debug("Received datagram from %s: %s", addr, msg)
+            if "\n" in msg:
+                # Several newline-delimited records packed by a batching client
+                msgs = [line for line in msg.split("\n") if line]
+                self.batch_queue.put_nowait(msgs)
+                if self.received_callback:
+                    for line in msgs:
+                        self.received_callback(line)
+                return
             self.batch_queue.put_nowait(msg)
             if self.received_callback:
-                print(f"[UDPHandler] Calling received_callback with: {msg}")
                 self.received_callback(msg)
+        except UnicodeDecodeError as e:
+            metrics.decode_failures += 1
+            hot_log.warning("Failed to decode UDP packet from %s: %s", addr, e)
         except Exception as e:
-            print(f"[listener] Failed to decode UDP packet: {e}")
+            hot_log.warning("Failed to handle UDP packet from %s: %s", addr, e)
+
+class BatchedUDPReceiver:
+    """
+    Alternative to UDPHandler that drains the socket in bulk on each readiness event.
+    Datagrams are received with recv_into() into one preallocated ring buffer, so a
+    wakeup costs a single queue put for the whole chunk instead of one per packet.
+    Python has no recvmmsg binding, so this is the tight non-blocking loop equivalent.
+    """
+    def __init__(self, sock, batch_queue, received_callback=None, max_batch=None, buffer_bytes=None, metrics=None):
+        self.sock = sock
+        self.batch_queue = batch_queue
+        self.received_callback = received_callback
+        self.metrics = metrics or ServerMetrics()
+        self.max_batch = max_batch or RECV_BATCH
+        self.buffer = bytearray(max(buffer_bytes or RECV_BUFFER_BYTES, MAX_DATAGRAM))
+        self.view = memoryview(self.buffer)
+
+    def on_readable(self):
+        recv_into = self.sock.recv_into
+        view = self.view
+        limit = len(self.buffer) - MAX_DATAGRAM
+        spans = []
+        offset = 0
+        while len(spans) < self.max_batch and offset <= limit:
+            try:
+                n = recv_into(view[offset:offset + MAX_DATAGRAM])
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                # e.g. ICMP errors surfaced on the socket; keep draining
+                hot_log.warning("UDP receive error: %s", e)
+                continue
+            spans.append((offset, n))
+            offset += n
+        if not spans:
+            return
+        metrics = self.metrics
+        metrics.datagrams += len(spans)
+        metrics.bytes += offset
+        msgs = []
+        for start, n in spans:
+            try:
+                msg = str(view[start:start + n], "utf-8")
+            except UnicodeDecodeError as e:
+                metrics.decode_failures += 1
+                hot_log.warning("Failed to decode UDP packet: %s", e)
+                continue
+            if "\n" in msg:
+                msgs.extend(line for line in msg.split("\n") if line)
+            else:
+                msgs.append(msg)
+        if not msgs:
+            return
+        hot_log.debug("Drained %d datagrams", len(msgs))
+        self.batch_queue.put_nowait(msgs)
+        if self.received_callback:
+            for msg in msgs:
+                self.received_callback(msg)
+
+def _bind_udp_socket(ip, port, reuse_port=False):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((ip, port))
+    sock.setblocking(False)
+    return sock
+
+async def _flush_batch(batch, batch_bytes, dispatcher, spool=None, metrics=None, batch_started=None):
+    hot_log.debug("Flushing batch", extra={"fields": {"messages": len(batch), "bytes": batch_bytes}})
+    if metrics is not None:
+        metrics.observe_flush(len(batch), batch_bytes, asyncio.get_running_loop().time() - batch_started)
+    if spool is not None:
+        await spool.append(batch)
+    else:
+        dispatcher.dispatch(batch)
 
-async def batch_and_upload(batch_queue: asyncio.Queue, sinks, batch_size_bytes, batch_interval, stop_event=None):
+async def batch_and_upload(batch_queue: asyncio.Queue, sinks, batch_size_bytes, batch_interval, stop_event=None, dispatcher=None, spool=None, metrics=None):
+    """
+    Collect queued messages into batches and flush them to the sinks as soon as
+    batch_size_bytes is reached or batch_interval has elapsed since the last flush.
+    The loop only suspends when the queue is empty, sleeping until the next message
+    or the flush deadline, and drains everything already queued in one pass.
+    Flushed batches are handed to a SinkDispatcher, so sink writes never block it,
+    or, when a SpoolPipeline is given, appended to the on-disk spool the sinks
+    consume from. Whatever is batched when stop_event is set is flushed too.
+    """
+    owns_dispatcher = dispatcher is None
+    if owns_dispatcher:
+        dispatcher = SinkDispatcher(sinks)
+    try:
+        await _batch_loop(batch_queue, dispatcher, batch_size_bytes, batch_interval, stop_event, spool, metrics)
+    finally:
+        await dispatcher.drain(timeout=SINK_DRAIN_TIMEOUT)
+        if owns_dispatcher:
+            dispatcher.close()
+
+async def _batch_loop(batch_queue, dispatcher, batch_size_bytes, batch_interval, stop_event, spool=None, metrics=None):
+    loop = asyncio.get_running_loop()
     batch: List[str] = []
     batch_bytes = 0
-    last_flush = time.time()
-    enable_s3 = os.getenv("ENABLE_S3_SINK", "").lower() in ("1", "true", "yes")
+    batch_started = 0.0  # when the oldest message in batch was taken off the queue
+    deadline = loop.time() + batch_interval
     while not (stop_event and stop_event.is_set()):
-        try:
-            msg = await asyncio.wait_for(batch_queue.get(), timeout=1)
-            print(f"[batch_and_upload] Got message from queue: {msg}")
-            batch.append(msg)
-            batch_bytes += len(msg.encode())
-        except asyncio.TimeoutError:
-            pass
-        now = time.time()
-        if batch and (batch_bytes >= batch_size_bytes or now - last_flush >= batch_interval):
-            print(f"[batch_and_upload] Flushing batch: {batch}")
-            for sink in sinks:
-                print(f"[batch_and_upload] Writing to sink: {sink}")
-                if batch:
-                    print(f"[batch_and_upload] About to call sink.write_batch with: {batch}")
-                    try:
-                        sink.write_batch(batch)
-                    except Exception as e:
-                        print(f"[batch_and_upload] Exception in sink.write_batch: {e}")
-                        # Do not raise; let health check reflect failure
-            if enable_s3:
+        msg = None
+        if batch_queue.empty():
+            # stop_event is a threading.Event, so never sleep longer than STOP_POLL_INTERVAL
+            timeout = min(deadline - loop.time(), STOP_POLL_INTERVAL) if batch else STOP_POLL_INTERVAL
+            if timeout > 0:
                 try:
-                    await upload_batch(batch)
-                except Exception as e:
-                    print(f"[batch_and_upload] upload_batch error: {e}")
-            batch.clear()
+                    msg = await asyncio.wait_for(batch_queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        else:
+            msg = batch_queue.get_nowait()
+        while msg is not None:
+            if not batch:
+                batch_started = loop.time()
+            if isinstance(msg, list):
+                batch.extend(msg)  # a whole chunk from BatchedUDPReceiver
+            else:
+                batch.append(msg)
+            batch_bytes += _measure(msg)[1]  # no encode for ASCII messages
+            if batch_bytes >= batch_size_bytes:
+                await _flush_batch(batch, batch_bytes, dispatcher, spool, metrics, batch_started)
+                batch = []  # the dispatcher keeps the flushed list
+                batch_bytes = 0
+                deadline = loop.time() + batch_interval
+            try:
+                msg = batch_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                msg = None
+        if batch and loop.time() >= deadline:
+            await _flush_batch(batch, batch_bytes, dispatcher, spool, metrics, batch_started)
+            batch = []
             batch_bytes = 0
-            last_flush = now
+            deadline = loop.time() + batch_interval
+    if batch:
+        await _flush_batch(batch, batch_bytes, dispatcher, spool, metrics, batch_started)
 
 async def upload_batch(batch: List[str]):
+    """
+    Deprecated: upload one batch to S3 with the shared get_s3_client() client.
+    The listener no longer calls this; ENABLE_S3_SINK runs a RetryingSink(S3Sink)
+    lane instead (see _build_s3_sink). Kept for callers of the old public helper.
+    """
+    warnings.warn("upload_batch is deprecated; use logflow.sink.S3Sink", DeprecationWarning, stacklevel=2)
     if not batch:
         return
     ts = datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%S")
     key = f"logs/{ts}-{uuid.uuid4().hex}.jsonl"
     data = "\n".join(batch)
-    print(f"[listener] Uploading batch: {key} ({len(batch)} logs, {len(data)} bytes)")
+    hot_log.debug("Uploading batch", extra={"fields": {"key": key, "messages": len(batch), "bytes": len(data)}})
     if boto3 is None:
-        print("[listener] boto3 not installed, skipping S3 upload.")
+        log.warning("boto3 not installed, skipping S3 upload.")
         return
-    cfg = get_s3_config()
-    print(f"[listener:upload_batch] boto3 endpoint_url={cfg['endpoint_url']}")
-    s3 = boto3.client(
-        "s3",
-        endpoint_url=cfg["endpoint_url"],
-        aws_access_key_id=cfg["aws_access_key_id"],
-        aws_secret_access_key=cfg["aws_secret_access_key"],
-        region_name=cfg["region_name"],
-    )
+    s3, cfg = get_s3_client()
+    loop = asyncio.get_running_loop()
     try:
-        s3.put_object(Bucket=cfg["bucket"], Key=key, Body=data.encode())
-        print(f"[listener] Uploaded batch to {cfg['bucket']}/{key}")
+        # boto3 is blocking; keep the event loop (and UDP reception) running meanwhile
+        await loop.run_in_executor(None, lambda: s3.put_object(Bucket=cfg["bucket"], Key=key, Body=data.encode()))
+        hot_log.debug("Uploaded batch to %s/%s", cfg["bucket"], key)
     except Exception as e:
-        print(f"[listener] S3 upload failed: {e}")
+        hot_log.warning("S3 upload failed: %s", e)
         raise
 
-async def health_check_server(port=None, sinks=None):
+async def health_check_server(port=None, sinks=None, host="0.0.0.0", ready_callback=None, batch_queue=None, dispatcher=None, spool=None, metrics=None, ipc_server=None):
     from aiohttp import web
     import json
     import inspect
@@ -153,32 +308,66 @@ async def health_check_server(port=None, sinks=None):
                         status = "unhealthy"
                         http_status = 503
                         break
-        return web.json_response({"status": status}, status=http_status)
+        body = {"status": status}
+        if hasattr(batch_queue, "stats"):
+            # Queue depth and per-policy drop counters; drops do not make us unhealthy
+            body["queue"] = batch_queue.stats()
+        if dispatcher is not None:
+            body["sinks"] = dispatcher.stats()
+        if spool is not None:
+            body["spool"] = spool.stats()
+        return web.json_response(body, status=http_status)
+    async def handle_metrics(request):
+        text = (metrics or ServerMetrics()).render(batch_queue, dispatcher, spool, ipc_server)
+        return web.Response(body=text.encode(), headers={"Content-Type": METRICS_CONTENT_TYPE})
     app = web.Application()
     app.router.add_get("/health", handle)
     app.router.add_get("/healthz", handle)  # legacy
+    app.router.add_get("/metrics", handle_metrics)
     runner = web.AppRunner(app)
     await runner.setup()
-    site = web.TCPSite(runner, "0.0.0.0", port or HEALTH_CHECK_PORT)
+    site = web.TCPSite(runner, host, HEALTH_CHECK_PORT if port is None else port)
     await site.start()
-    print(f"[listener] Health check endpoint running on :{port or HEALTH_CHECK_PORT}/health and /healthz")
+    bound_port = runner.addresses[0][1]
+    log.info("Health check endpoint running on :%s/health and /healthz, metrics on /metrics", bound_port)
+    if ready_callback:
+        ready_callback(bound_port)
+    return bound_port
 
-async def udp_server_with_callback(batch_queue, ip, port, received_callback, stop_event=None, ready_event=None):
+async def udp_server_with_callback(batch_queue, ip, port, received_callback, stop_event=None, ready_event=None, reuse_port=False, receive_engine=None, metrics=None):
     bind_ip = ip if ip else UDP_IP  # Use default UDP_IP if not provided
     bind_port = port if port is not None else UDP_PORT  # Use default UDP_PORT if not provided
-    print(f"[listener] Preparing to listen for UDP logs on {bind_ip}:{bind_port}")
+    receive_engine = receive_engine or RECEIVE_ENGINE
+    log.info("Preparing to listen for UDP logs on %s:%s (engine=%s)", bind_ip, bind_port, receive_engine)
     loop = asyncio.get_running_loop()
+    if receive_engine == "batch":
+        sock = _bind_udp_socket(bind_ip, bind_port, reuse_port)
+        receiver = BatchedUDPReceiver(sock, batch_queue, received_callback, metrics=metrics)
+        loop.add_reader(sock.fileno(), receiver.on_readable)
+        log.info("UDP socket info: sockname=%s, batched receive engine", sock.getsockname())
+        if ready_event:
+            ready_event.set()
+        try:
+            while not (stop_event and stop_event.is_set()):
+                await asyncio.sleep(0.1)
+        finally:
+            loop.remove_reader(sock.fileno())
+            sock.close()
+        return
+    if receive_engine != "protocol":
+        raise ValueError(f"Unknown receive engine: {receive_engine!r} (expected 'protocol' or 'batch')")
     transport, protocol = await loop.create_datagram_endpoint(
-        lambda: UDPHandler(batch_queue, received_callback),
+        lambda: UDPHandler(batch_queue, received_callback, metrics),
         local_addr=(bind_ip, bind_port),
-        family=socket.AF_INET
+        family=socket.AF_INET,
+        reuse_port=reuse_port
     )
     sockname = transport.get_extra_info('sockname')
     sock = transport.get_extra_info('socket')
     if sock:
-        print(f"[listener] UDP socket info: sockname={sockname}, family={sock.family}, type={sock.type}, proto={sock.proto}")
+        log.info("UDP socket info: sockname=%s, family=%s, type=%s, proto=%s", sockname, sock.family, sock.type, sock.proto)
     else:
-        print(f"[listener] UDP socket info: sockname={sockname}, NO RAW SOCKET")
+        log.info("UDP socket info: sockname=%s, NO RAW SOCKET", sockname)
     if ready_event:
         ready_event.set()
     try:
@@ -187,10 +376,15 @@ async def udp_server_with_callback(batch_queue, ip, port, received_callback, sto
     finally:
         transport.close()
 
-async def run_logflow_server(ip=None, port=None, sinks=None, received_callback=None, batch_size_bytes=None, batch_interval=None, stop_event=None, health_port=None, ready_event=None):
-    batch_queue = asyncio.Queue()
+async def run_logflow_server(ip=None, port=None, sinks=None, received_callback=None, batch_size_bytes=None, batch_interval=None, stop_event=None, health_port=None, ready_event=None, reuse_port=False, health_host="0.0.0.0", health_ready=None, receive_engine=None, queue_max_messages=None, queue_max_bytes=None, queue_policy=None, spool_dir=None, ipc_server=None):
+    batch_queue = IngestQueue(max_messages=queue_max_messages, max_bytes=queue_max_bytes, policy=queue_policy)
     if sinks is None:
         sinks = []
+    if _s3_enabled() and not any(_is_s3_sink(sink) for sink in sinks):
+        # ENABLE_S3_SINK with an explicit sink list: S3 gets its own dispatcher lane (and the spool)
+        s3_sink = _build_s3_sink()
+        if s3_sink is not None:
+            sinks = list(sinks) + [s3_sink]
     if batch_size_bytes is None:
         batch_size_bytes = BATCH_SIZE_BYTES
     if batch_interval is None:
@@ -198,33 +392,78 @@ async def run_logflow_server(ip=None, port=None, sinks=None, received_callback=N
     # Always use defaults if ip/port not provided
     ip = ip if ip is not None else UDP_IP
     port = port if port is not None else UDP_PORT
+    metrics = ServerMetrics()
     udp_task = asyncio.create_task(
-        udp_server_with_callback(batch_queue, ip, port, received_callback, stop_event, ready_event)
+        udp_server_with_callback(batch_queue, ip, port, received_callback, stop_event, ready_event, reuse_port, receive_engine, metrics)
     )
+    dispatcher = SinkDispatcher(sinks)
+    spool = None
+    spool_dir = spool_dir or SPOOL_DIR
+    if spool_dir:
+        spool = SpoolPipeline(Spool(spool_dir), dispatcher)
+        spool.start()
     batch_task = asyncio.create_task(
-        batch_and_upload(batch_queue, sinks, batch_size_bytes, batch_interval, stop_event)
+        batch_and_upload(batch_queue, sinks, batch_size_bytes, batch_interval, stop_event, dispatcher, spool, metrics)
     )
     tasks = [udp_task, batch_task]
     if health_port is not None:
-        tasks.append(asyncio.create_task(health_check_server(health_port, sinks)))
-    await asyncio.gather(*tasks)
+        tasks.append(asyncio.create_task(health_check_server(health_port, sinks, health_host, health_ready, batch_queue, dispatcher, spool, metrics, ipc_server)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        if spool is not None:
+            await spool.stop(timeout=SINK_DRAIN_TIMEOUT)
+        await dispatcher.close_sinks()
+        dispatcher.close()
 
-async def main():
+def _s3_enabled():
+    return os.getenv("ENABLE_S3_SINK", "").lower() in ("1", "true", "yes")
+
+def _is_s3_sink(sink):
+    from .retry import RetryingSink
+    from .sink import S3Sink, AsyncS3Sink
+    if isinstance(sink, RetryingSink):
+        sink = sink.sink
+    return isinstance(sink, (S3Sink, AsyncS3Sink))
+
+def _build_s3_sink(worker_id=None):
+    """RetryingSink(S3Sink) with the optional LOGFLOW_S3_FALLBACK_DIR fallback, or None without boto3."""
+    try:
+        from .sink import S3Sink
+        from .retry import RetryingSink
+        fallback_dir = os.getenv("LOGFLOW_S3_FALLBACK_DIR")
+        fallback = DiskSink(fallback_dir, worker_id=worker_id) if fallback_dir else None
+        return RetryingSink(S3Sink(worker_id=worker_id), fallback=fallback)
+    except ImportError:
+        log.warning("S3Sink not available (boto3 missing or not implemented)")
+        return None
+
+def build_sinks(ipc_server=None, worker_id=None):
+    """Build the sink list from DISK_SINK_DIR / ENABLE_S3_SINK, as used by the CLI entry points."""
     sinks = []
     disk_dir = os.getenv("DISK_SINK_DIR")
-    enable_s3 = os.getenv("ENABLE_S3_SINK", "").lower() in ("1", "true", "yes")
     if disk_dir:
-        sinks.append(DiskSink(disk_dir))
+        sinks.append(DiskSink(disk_dir, worker_id=worker_id))
+    elif ipc_server is not None:
+        sinks.append(MultiplexedStdoutSink(ipc_server=ipc_server))
     else:
         sinks.append(StdoutSink())
-    if enable_s3:
-        # S3Sink import and config, only if ENABLE_S3_SINK is set
-        try:
-            from .sink import S3Sink
-            sinks.append(S3Sink())
-        except ImportError:
-            print("[listener] S3Sink not available (boto3 missing or not implemented)")
-    await run_logflow_server(sinks=sinks)
+    if _s3_enabled():
+        s3_sink = _build_s3_sink(worker_id)
+        if s3_sink is not None:
+            sinks.append(s3_sink)
+    return sinks
+
+def stop_on_signals(stop_event):
+    """Set stop_event on SIGTERM/SIGINT so the pending batch is flushed (or spooled) before exit."""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_event.set)
+
+async def main():
+    stop_event = threading.Event()
+    stop_on_signals(stop_event)
+    await run_logflow_server(sinks=build_sinks(), stop_event=stop_event)
 
 # Patch StdoutSink to also broadcast to IPCServer if present
 class MultiplexedStdoutSink(StdoutSink):
@@ -232,12 +471,9 @@ class MultiplexedStdoutSink(StdoutSink):
         self.ipc_server = ipc_server
         super().__init__()
     def write_batch(self, batch: List[str]):
-        print("[StdoutSink] Log batch:")
-        for line in batch:
-            print(line)
-            sys.stdout.flush()
-            if self.ipc_server:
-                self.ipc_server.broadcast(line)
+        super().write_batch(batch)
+        if self.ipc_server:
+            self.ipc_server.broadcast_batch(batch)
 
 def main_entrypoint():
     try:
@@ -246,6 +482,7 @@ def main_entrypoint():
         print("[listener] Please install aiohttp for health check endpoint: pip install aiohttp")
         exit(1)
     import asyncio
+    configure_logging()
     # Try to bind UDP socket first
     try:
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -257,34 +494,30 @@ def main_entrypoint():
             is_primary = False
         else:
             raise
-    if is_primary:
+    if is_primary and WORKERS > 1:
+        # Multi-core: fork SO_REUSEPORT workers, each with its own batcher and sinks.
+        # Tail clients are not served in this mode; workers write to their own sinks.
+        from .workers import run_workers
+        run_workers(WORKERS)
+    elif is_primary:
         # Primary: start IPC server and normal listener
-        ipc_server = IPCServer(max_clients=5)
+        ipc_server = IPCServer()
         ipc_server.start()
         async def main_with_ipc():
-            sinks = []
-            disk_dir = os.getenv("DISK_SINK_DIR")
-            enable_s3 = os.getenv("ENABLE_S3_SINK", "").lower() in ("1", "true", "yes")
-            if disk_dir:
-                sinks.append(DiskSink(disk_dir))
-            else:
-                sinks.append(MultiplexedStdoutSink(ipc_server=ipc_server))
-            if enable_s3:
-                try:
-                    from .sink import S3Sink
-                    sinks.append(S3Sink())
-                except ImportError:
-                    print("[listener] S3Sink not available (boto3 missing or not implemented)")
+            sinks = build_sinks(ipc_server=ipc_server)
+            stop_event = threading.Event()
+            stop_on_signals(stop_event)
             try:
-                await run_logflow_server(sinks=sinks)
+                await run_logflow_server(sinks=sinks, stop_event=stop_event, ipc_server=ipc_server)
             finally:
                 ipc_server.stop()
         asyncio.run(main_with_ipc())
     else:
         # Tail mode: connect to IPC server and print logs
         print(f"[logflow] UDP port in use, connecting as tail to {LOGFLOW_IPC_SOCKET}")
-        client = IPCClient()
         try:
+            client = IPCClient(subscription=json.loads(TAIL_FILTER) if TAIL_FILTER else None,
+                               replay_lines=TAIL_REPLAY_LINES, replay_seconds=TAIL_REPLAY_SECONDS)
             client.connect()
             print(f"[logflow] Connected as tail client. Printing shared logs:")
             client.tail()
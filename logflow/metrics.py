@@ -0,0 +1,164 @@
+"""
+Prometheus-style metrics.
+
+Hot-path code only bumps plain integer attributes (ServerMetrics.datagrams,
+...) or calls Histogram.observe(); everything else, such as queue depth,
+per-sink counters, spool and IPC state, is read from the components' own
+counters when /metrics is scraped. All updates happen on the event loop thread,
+so no locking is needed. render() produces the text exposition format
+(version 0.0.4).
+"""
+from bisect import bisect_left
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+MESSAGE_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+BYTE_BUCKETS = (1024, 16 * 1024, 128 * 1024, 1024 * 1024, 8 * 1024 * 1024, 64 * 1024 * 1024)
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three additions."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+class MetricsWriter:
+    """Collects samples by family so each family's samples render contiguously."""
+    def __init__(self):
+        self._families = {}
+
+    def _family(self, name, kind, help_text):
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        return family
+
+    def counter(self, name, help_text, value, labels=None):
+        self._family(name, "counter", help_text).append(f"{name}{_format_labels(labels)} {value}")
+
+    def gauge(self, name, help_text, value, labels=None):
+        self._family(name, "gauge", help_text).append(f"{name}{_format_labels(labels)} {value}")
+
+    def histogram(self, name, help_text, hist, labels=None):
+        family = self._family(name, "histogram", help_text)
+        labels = dict(labels or {})
+        cumulative = 0
+        for bound, count in zip(self.buckets_with_inf(hist), hist.counts):
+            cumulative += count
+            family.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {cumulative}")
+        family.append(f"{name}_sum{_format_labels(labels)} {hist.sum}")
+        family.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+
+    @staticmethod
+    def buckets_with_inf(hist):
+        return [repr(float(b)) for b in hist.buckets] + ["+Inf"]
+
+    def render(self):
+        return "\n".join(line for family in self._families.values() for line in family) + "\n"
+
+    def add_exposition(self, text, labels):
+        """Merge another render()'s text into this writer, adding labels to each of its samples."""
+        extra = _format_labels(labels)[1:-1]
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# HELP ") or line.startswith("# TYPE "):
+                kind, name = line.split(" ", 3)[1:3]
+                if kind == "HELP":
+                    family = self._families.setdefault(name, [line])
+                elif len(family) == 1:
+                    family.append(line)
+                continue
+            if not line or line.startswith("#") or family is None:
+                continue
+            brace = line.find("{")
+            space = line.find(" ")
+            if brace != -1 and brace < space:
+                family.append(f"{line[:brace + 1]}{extra},{line[brace + 1:]}")
+            else:
+                family.append(f"{line[:space]}{{{extra}}}{line[space:]}")
+
+class ServerMetrics:
+    """Counters owned by one run_logflow_server instance."""
+    def __init__(self):
+        self.datagrams = 0
+        self.bytes = 0
+        self.decode_failures = 0
+        self.flushes = 0
+        self.batch_messages = Histogram(MESSAGE_BUCKETS)
+        self.batch_bytes = Histogram(BYTE_BUCKETS)
+        self.flush_latency = Histogram()  # oldest message's wait in the batcher
+
+    def observe_flush(self, messages, nbytes, latency):
+        self.flushes += 1
+        self.batch_messages.observe(messages)
+        self.batch_bytes.observe(nbytes)
+        self.flush_latency.observe(latency)
+
+    def render(self, batch_queue=None, dispatcher=None, spool=None, ipc_server=None):
+        w = MetricsWriter()
+        w.counter("logflow_datagrams_received_total", "UDP datagrams received.", self.datagrams)
+        w.counter("logflow_bytes_received_total", "UDP payload bytes received.", self.bytes)
+        w.counter("logflow_decode_failures_total", "Datagrams dropped because they were not valid UTF-8.",
+                  self.decode_failures)
+        if hasattr(batch_queue, "stats"):
+            stats = batch_queue.stats()
+            w.gauge("logflow_queue_depth_messages", "Messages waiting in the ingest queue.", stats["depth"])
+            w.gauge("logflow_queue_depth_bytes", "Bytes waiting in the ingest queue.", stats["bytes"])
+            for reason, count in stats["drops"].items():
+                w.counter("logflow_queue_dropped_total", "Messages dropped by the ingest queue overflow policy.",
+                          count, {"reason": reason})
+        w.counter("logflow_flushes_total", "Batches flushed by the batcher.", self.flushes)
+        w.histogram("logflow_batch_messages", "Messages per flushed batch.", self.batch_messages)
+        w.histogram("logflow_batch_bytes", "Bytes per flushed batch.", self.batch_bytes)
+        w.histogram("logflow_flush_latency_seconds", "Time the oldest message in a batch waited before the flush.",
+                    self.flush_latency)
+        if dispatcher is not None:
+            for lane in dispatcher.lanes:
+                labels = {"sink": lane.name}
+                w.counter("logflow_sink_batches_total", "Batches written by the sink.", lane.written, labels)
+                w.counter("logflow_sink_errors_total", "Failed sink writes.", lane.errors, labels)
+                w.counter("logflow_sink_dropped_total", "Batches dropped because the sink was backlogged.",
+                          lane.dropped, labels)
+                w.counter("logflow_sink_bytes_total", "Bytes handed to the sink.", lane.bytes, labels)
+                w.gauge("logflow_sink_pending_batches", "Batches dispatched to the sink but not yet written.",
+                        lane.pending, labels)
+                w.histogram("logflow_sink_write_seconds", "Sink write_batch latency.", lane.write_seconds, labels)
+        if spool is not None:
+            stats = spool.stats()
+            w.gauge("logflow_spool_bytes", "Bytes held in spool segments.", stats["bytes"])
+            w.gauge("logflow_spool_segments", "Spool segment files.", stats["segments"])
+            w.counter("logflow_spool_dropped_bytes_total", "Undelivered spool bytes dropped by the size limit.",
+                      stats["dropped_bytes"])
+            for consumer in stats["consumers"]:
+                w.gauge("logflow_spool_lag_bytes", "Spooled bytes not yet delivered to the sink.",
+                        consumer["lag_bytes"], {"sink": consumer["sink"]})
+        if ipc_server is not None:
+            w.gauge("logflow_ipc_tail_clients", "Connected tail clients.", len(ipc_server.clients))
+            w.counter("logflow_ipc_lines_total", "Lines broadcast to tail clients.", ipc_server.lines_sent)
+            w.counter("logflow_ipc_lines_skipped_total", "Lines not sent to tail clients that fell behind.",
+                      ipc_server.lines_skipped)
+            w.counter("logflow_ipc_disconnects_total", "Tail clients dropped for falling behind.",
+                      ipc_server.disconnects)
+            w.gauge("logflow_ipc_replay_lines", "Lines held for replay to new tail clients.", ipc_server.replay.lines)
+            w.gauge("logflow_ipc_replay_bytes", "Bytes held for replay to new tail clients.", ipc_server.replay.bytes)
+            unsent = ipc_server.unsent_bytes()
+            w.gauge("logflow_ipc_unsent_bytes", "Bytes queued for tail clients but not yet sent, summed over clients.",
+                    sum(unsent))
+            w.gauge("logflow_ipc_client_unsent_bytes_max", "Largest unsent backlog of any one tail client.",
+                    max(unsent, default=0))
+            w.histogram("logflow_ipc_broadcast_seconds", "Time to queue one broadcast batch for all tail clients.",
+                        ipc_server.broadcast_seconds)
+        return w.render()
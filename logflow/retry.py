@@ -0,0 +1,167 @@
+"""
+Retries and circuit breaking for sinks.
+
+RetryingSink wraps any blocking sink (BaseSink, not AsyncBaseSink): failed writes are retried with exponential
+backoff and full jitter up to max_attempts, and a CircuitBreaker stops calling
+a sink that keeps failing. While the circuit is open, writes fail immediately
+(or go to the fallback sink) instead of tying up a sink thread on a dead
+endpoint; after reset_timeout a single half-open probe decides whether to close
+it again. With the spool enabled, a rejected batch simply stays spooled until
+the sink recovers.
+"""
+import inspect
+import os
+import random
+import threading
+import time
+from typing import List
+
+from .diagnostics import get_logger, hot_log
+from .sink import BaseSink
+
+log = get_logger("retry")
+
+RETRY_MAX_ATTEMPTS = int(os.getenv("LOGFLOW_RETRY_MAX_ATTEMPTS", 3))  # attempts per batch, including the first
+RETRY_BASE_DELAY = float(os.getenv("LOGFLOW_RETRY_BASE_DELAY", 0.2))  # backoff before the first retry (seconds)
+RETRY_MAX_DELAY = float(os.getenv("LOGFLOW_RETRY_MAX_DELAY", 5))  # backoff cap (seconds)
+BREAKER_FAILURES = int(os.getenv("LOGFLOW_BREAKER_FAILURES", 5))  # consecutive failures that open the circuit
+BREAKER_RESET_TIMEOUT = float(os.getenv("LOGFLOW_BREAKER_RESET_TIMEOUT", 30))  # seconds open before a probe
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a sink whose circuit is open."""
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. allow() says whether a call may go
+    ahead: always when closed, never while open, and for exactly one probe once
+    reset_timeout has passed (half-open). The probe's outcome closes the
+    circuit or re-opens it for another reset_timeout. Thread-safe.
+    """
+    def __init__(self, failure_threshold=None, reset_timeout=None, clock=time.monotonic):
+        self.failure_threshold = failure_threshold or BREAKER_FAILURES
+        self.reset_timeout = BREAKER_RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0  # consecutive
+        self.opened_at = 0.0
+        self.opened = 0  # times the circuit has opened
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                log.info("Circuit closed after a successful probe")
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                if self.state == CLOSED:
+                    log.warning("Circuit opened after %d consecutive failures", self.failures)
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self.opened += 1
+                self._probing = False
+
+    @property
+    def is_open(self):
+        return self.state == OPEN
+
+class RetryingSink(BaseSink):
+    """
+    Wraps sink with jittered exponential-backoff retries and a circuit breaker.
+    A batch that still fails after max_attempts, or arrives while the circuit
+    is open, is written to fallback when one is given; otherwise the last error
+    (or CircuitOpenError) is raised so the dispatcher counts it and the spool,
+    if enabled, keeps the batch. is_healthy() is False while the circuit is open.
+    Async sinks are rejected with TypeError: their write_batch would return an
+    un-awaited coroutine that looks like a success.
+    """
+    def __init__(self, sink, fallback=None, max_attempts=None, base_delay=None, max_delay=None, breaker=None):
+        for wrapped in (sink, fallback):
+            if inspect.iscoroutinefunction(getattr(wrapped, "write_batch", None)):
+                raise TypeError(f"RetryingSink needs a blocking sink, got async {type(wrapped).__name__}")
+        self.sink = sink
+        self.fallback = fallback
+        self.max_attempts = max_attempts or RETRY_MAX_ATTEMPTS
+        self.base_delay = RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.sink_name = getattr(sink, "sink_name", type(sink).__name__)
+        self.retries = 0
+        self.rejected = 0
+        self.fallback_batches = 0
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def write_batch(self, batch: List[str]):
+        if not batch:
+            return
+        error = None
+        for attempt in range(self.max_attempts):
+            if not self.breaker.allow():
+                self.rejected += 1
+                error = error or CircuitOpenError(f"{self.sink_name} circuit is open")
+                break
+            try:
+                self.sink.write_batch(batch)
+            except Exception as e:
+                error = e
+                self.breaker.record_failure()
+                if attempt + 1 < self.max_attempts and not self.breaker.is_open:
+                    self.retries += 1
+                    delay = self._backoff(attempt)
+                    hot_log.warning("%s write failed (attempt %d/%d), retrying in %.2fs: %s",
+                                    self.sink_name, attempt + 1, self.max_attempts, delay, e)
+                    time.sleep(delay)
+                    continue
+                break
+            else:
+                self.breaker.record_success()
+                return
+        if self.fallback is None:
+            raise error
+        hot_log.warning("%s unavailable, writing batch of %d to fallback: %s", self.sink_name, len(batch), error)
+        self.fallback.write_batch(batch)
+        self.fallback_batches += 1
+
+    def is_healthy(self):
+        if self.breaker.is_open:
+            return False
+        is_healthy = getattr(self.sink, "is_healthy", None)
+        return is_healthy() if callable(is_healthy) else True
+
+    def stats(self):
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "opened": self.breaker.opened,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "fallback_batches": self.fallback_batches,
+        }
+
+    def close(self):
+        for sink in (self.sink, self.fallback):
+            close = getattr(sink, "close", None)
+            if callable(close):
+                close()
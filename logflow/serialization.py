@@ -0,0 +1,102 @@
+"""
+Pluggable JSON serialization for the logging handler.
+
+get_serializer(name) returns a Serializer for "json" (stdlib), "ujson" (needs
+the ujson package) or "orjson" (needs orjson); "auto" picks the fastest one
+installed. Every serializer's dumps() returns compact UTF-8 bytes ready to put
+on the wire. Like json.dumps, none of them emit raw newlines, so the output can
+be packed newline-delimited.
+
+TimestampCache formats record timestamps the way datetime.isoformat() does,
+reusing the formatted date and time for every record within the same second.
+"""
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+SERIALIZER = os.getenv("UDP_LOG_SERIALIZER", "auto")  # auto, orjson, ujson or json
+
+class Serializer(ABC):
+    """Base serializer; subclasses implement dumps()."""
+    name = None
+
+    @abstractmethod
+    def dumps(self, obj) -> bytes:
+        pass
+
+class JsonSerializer(Serializer):
+    """Stdlib json with a prebuilt compact encoder."""
+    name = "json"
+
+    def __init__(self):
+        self._encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def dumps(self, obj):
+        return self._encode(obj).encode()
+
+class UJsonSerializer(Serializer):
+    name = "ujson"
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, escape_forward_slashes=False).encode()
+
+class OrjsonSerializer(Serializer):
+    name = "orjson"
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)  # already bytes
+
+SERIALIZERS = {
+    "orjson": (OrjsonSerializer, orjson is not None),
+    "ujson": (UJsonSerializer, ujson is not None),
+    "json": (JsonSerializer, True),
+}
+
+def available_serializers():
+    """Installed serializers, fastest first."""
+    return [name for name, (_, available) in SERIALIZERS.items() if available]
+
+def get_serializer(name=None):
+    """Return a Serializer instance; name defaults to UDP_LOG_SERIALIZER."""
+    if isinstance(name, Serializer):
+        return name
+    name = (name or SERIALIZER or "auto").lower()
+    if name == "auto":
+        name = available_serializers()[0]
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer: {name!r} (expected auto or one of {list(SERIALIZERS)})")
+    cls, available = SERIALIZERS[name]
+    if not available:
+        raise ImportError(f"Serializer {name!r} requires the {name} package")
+    return cls()
+
+class TimestampCache:
+    """
+    UTC ISO-8601 timestamps with microseconds, as datetime.utcnow().isoformat()
+    would give for the same instant, formatting the seconds part only once per
+    second. Not locked: concurrent callers at worst format the same second twice.
+    """
+    def __init__(self):
+        self._cached = (None, "")  # (second, formatted prefix), swapped as one object
+
+    def format(self, created):
+        second = int(created)
+        micros = round((created - second) * 1e6)  # rounded like datetime.utcfromtimestamp()
+        if micros == 1000000:
+            second, micros = second + 1, 0
+        cached_second, prefix = self._cached
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._cached = (second, prefix)
+        return "%s.%06d" % (prefix, micros)
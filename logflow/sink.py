@@ -1,54 +1,300 @@
 from abc import ABC, abstractmethod
 from typing import List
+import asyncio
 import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from .diagnostics import get_logger, hot_log
+from .compression import get_codec
+from .health import CachedHealthCheck
+
+log = get_logger("sink")
 
 try:
     import boto3
+    from botocore.config import Config as BotoConfig
     from botocore.exceptions import BotoCoreError, NoCredentialsError
 except ImportError:
     boto3 = None
 
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 10))
+S3_TCP_KEEPALIVE = os.getenv("S3_TCP_KEEPALIVE", "1").lower() in ("1", "true", "yes")
+S3_MIN_PART_SIZE = 5 * 1024 * 1024  # S3 rejects smaller parts (all but the last) at complete_multipart_upload
+S3_MULTIPART_PART_SIZE = int(os.getenv("S3_MULTIPART_PART_SIZE", 8 * 1024 * 1024))
+S3_MULTIPART_CONCURRENCY = int(os.getenv("S3_MULTIPART_CONCURRENCY", 4))  # parts uploaded in parallel
+S3_HEALTH_TIMEOUT = float(os.getenv("S3_HEALTH_TIMEOUT", 2))  # connect/read timeout of the health probe
+COMPRESS_CHUNK_BYTES = 256 * 1024  # raw bytes handed to a streaming compressor at a time
+DISK_ROTATE_BYTES = int(os.getenv("LOGFLOW_DISK_ROTATE_BYTES", 64 * 1024 * 1024))  # start a new file past this size
+DISK_ROTATE_SECONDS = float(os.getenv("LOGFLOW_DISK_ROTATE_SECONDS", 300))  # or once the open file is this old
+DISK_BUFFER_BYTES = int(os.getenv("LOGFLOW_DISK_BUFFER_BYTES", 1024 * 1024))  # write buffer of the open file
+DURABILITY_MODES = ("none", "batch", "group")
+DISK_DURABILITY = os.getenv("LOGFLOW_DISK_DURABILITY", "none")  # none | batch (fsync each batch) | group
+DISK_FSYNC_INTERVAL_MS = float(os.getenv("LOGFLOW_DISK_FSYNC_INTERVAL_MS", 50))  # group commit: max unsynced age
+DISK_FSYNC_BYTES = int(os.getenv("LOGFLOW_DISK_FSYNC_BYTES", 4 * 1024 * 1024))  # group commit: or unsynced bytes
+
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
+try:
+    from aiobotocore.session import get_session as get_aiobotocore_session
+except ImportError:
+    get_aiobotocore_session = None
+
+def _worker_suffix(worker_id):
+    """Name suffix that keeps output from different listener workers apart."""
+    return "" if worker_id is None else f"-w{worker_id}"
+
+def _batch_timestamp():
+    return datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%S")
+
+def _disk_batch_path(output_dir, worker_id, codec, seq):
+    return os.path.join(
+        output_dir, f"logflow-{_batch_timestamp()}{_worker_suffix(worker_id)}-{seq:04d}.jsonl{codec.extension}")
+
+def _open_new_file(output_dir, worker_id, codec, seq, buffering=-1):
+    """Create a file that did not exist before (never overwriting); returns (file, path, next_seq)."""
+    while True:
+        path = _disk_batch_path(output_dir, worker_id, codec, seq)
+        seq += 1
+        try:
+            return open(path, "xb", buffering=buffering), path, seq
+        except FileExistsError:
+            continue
+
+def _s3_batch_key(worker_id, codec):
+    # The uuid keeps flushes within the same second (sub-second UDP_BATCH_INTERVAL) from overwriting each other
+    return f"logs/{_batch_timestamp()}{_worker_suffix(worker_id)}-{uuid.uuid4().hex}.jsonl{codec.extension}"
+
+def _s3_encoding_args(codec):
+    return {"ContentEncoding": codec.content_encoding} if codec.content_encoding else {}
+
+def _encode_line(line: str) -> bytes:
+    return (line.rstrip() + "\n").encode("utf-8")
+
+def _encode_lines(batch: List[str]) -> bytes:
+    # Same bytes as joining _encode_line() over the batch, in one encode call
+    return "".join(line.rstrip() + "\n" for line in batch).encode("utf-8")
+
+def _s3_config():
+    return {
+        "endpoint_url": os.getenv("S3_ENDPOINT", "http://minio_logflow:9000"),
+        "aws_access_key_id": os.getenv("S3_ACCESS_KEY", "minioadmin"),
+        "aws_secret_access_key": os.getenv("S3_SECRET_KEY", "minioadmin"),
+        "region_name": os.getenv("S3_REGION", "us-east-1"),
+        "bucket": os.getenv("S3_BUCKET", "logflow-ingest"),
+    }
+
+def s3_client_kwargs(cfg):
+    """boto3.client("s3", ...) keyword arguments for cfg, with the shared connection-pool settings."""
+    return {
+        "endpoint_url": cfg["endpoint_url"],
+        "aws_access_key_id": cfg["aws_access_key_id"],
+        "aws_secret_access_key": cfg["aws_secret_access_key"],
+        "region_name": cfg["region_name"],
+        "config": BotoConfig(max_pool_connections=S3_MAX_POOL_CONNECTIONS, tcp_keepalive=S3_TCP_KEEPALIVE),
+    }
+
+def _s3_probe_kwargs(cfg):
+    """Client kwargs for health probes: short timeouts and no retries, scoped to that client only."""
+    kwargs = s3_client_kwargs(cfg)
+    kwargs["config"] = kwargs["config"].merge(BotoConfig(
+        connect_timeout=S3_HEALTH_TIMEOUT, read_timeout=S3_HEALTH_TIMEOUT, retries={"total_max_attempts": 1}))
+    return kwargs
+
 class BaseSink(ABC):
     """
     Abstract base class for all log sinks.
     Implementations must provide write_batch(batch: List[str]).
+    The listener runs write_batch on a worker thread, so it may block.
     """
     @abstractmethod
     def write_batch(self, batch: List[str]):
         pass
 
+class AsyncBaseSink(ABC):
+    """
+    Abstract base class for asyncio-native sinks (aiofiles, aiobotocore, ...).
+    The listener awaits write_batch on the event loop instead of handing it to an
+    executor thread, so implementations must not block. flush() should push out
+    anything buffered; aclose() is awaited once when the listener shuts down.
+    """
+    @abstractmethod
+    async def write_batch(self, batch: List[str]):
+        pass
+
+    async def flush(self):
+        pass
+
+    async def aclose(self):
+        await self.flush()
+
+class _GroupCommitter:
+    """
+    Background thread that fsyncs a DiskSink's open file every interval seconds,
+    or sooner once max_bytes are unsynced, so many batches share one fsync.
+    """
+    def __init__(self, sink, interval, max_bytes):
+        self.sink = sink
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.fsyncs = 0
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="logflow-disk-fsync", daemon=True)
+        self._thread.start()
+
+    def notify(self, unsynced):
+        if unsynced >= self.max_bytes:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.sync()
+
+    def sync(self):
+        # fsync a duplicate descriptor outside the sink lock so writers are never blocked
+        with self.sink._lock:
+            if self.sink._file is None or not self.sink._unsynced:
+                return
+            file = self.sink._file
+            fd = os.dup(file.fileno())
+            # Taken now so bytes written during the fsync stay counted; given back if it fails
+            pending, self.sink._unsynced = self.sink._unsynced, 0
+        try:
+            os.fsync(fd)
+            self.fsyncs += 1
+        except OSError as e:
+            log.warning("DiskSink group fsync failed: %s", e)
+            with self.sink._lock:
+                if self.sink._file is file:  # a rotation already fsynced (or lost) the old file
+                    self.sink._unsynced += pending
+        finally:
+            os.close(fd)
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join()
+
 class DiskSink(BaseSink):
     """
-    Writes batches of logs to disk as JSONL files in a specified directory.
-    Each batch is written to a new file with a timestamp and unique identifier.
+    Appends batches of logs to rotating JSONL files in a specified directory.
+    One file stays open and each batch is appended to it; a new file is started
+    once the current one reaches max_bytes or is older than max_age seconds.
+    File names carry a timestamp and a sequence number and are created
+    exclusively, so a file is never overwritten. When running as one of several
+    listener workers, pass worker_id so names never collide with those written
+    by sibling workers. compression ("gzip", "zstd", "lz4"; default
+    LOGFLOW_COMPRESSION) writes each batch as its own compressed frame, so a
+    file is readable at any point; it runs on the sink's worker thread.
+    on_write(path) is called after each batch, once it has reached the file.
+
+    durability (default LOGFLOW_DISK_DURABILITY) selects when data is fsynced:
+    "none" leaves it to the OS, "batch" fsyncs before write_batch returns, and
+    "group" fsyncs on a background thread every fsync_interval_ms or once
+    fsync_bytes are unsynced, bounding what a crash can lose to that window.
+    Files are always fsynced when rotated or closed unless durability is "none".
     """
-    def __init__(self, output_dir: str, on_write=None):
+    def __init__(self, output_dir: str, on_write=None, worker_id=None, compression=None,
+                 max_bytes=None, max_age=None, buffer_size=None,
+                 durability=None, fsync_interval_ms=None, fsync_bytes=None):
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
         self.on_write = on_write  # Optional callback for test synchronization
+        self.worker_id = worker_id
+        self.codec = get_codec(compression)
+        self.max_bytes = max_bytes or DISK_ROTATE_BYTES
+        self.max_age = max_age or DISK_ROTATE_SECONDS
+        self.buffer_size = buffer_size or DISK_BUFFER_BYTES
+        self.path = None
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._seq = 0
+        self._unsynced = 0
+        self._lock = threading.Lock()
+        self.durability = (durability or DISK_DURABILITY).lower()
+        if self.durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {self.durability!r} (expected one of {DURABILITY_MODES})")
+        self.fsyncs = 0
+        self._committer = None
+        if self.durability == "group":
+            interval = (fsync_interval_ms or DISK_FSYNC_INTERVAL_MS) / 1000
+            self._committer = _GroupCommitter(self, interval, fsync_bytes or DISK_FSYNC_BYTES)
+
+    def _should_rotate(self, incoming):
+        if self._file is None:
+            return True
+        if self._size and self._size + incoming > self.max_bytes:
+            return True
+        return time.monotonic() - self._opened_at >= self.max_age
+
+    def _rotate(self):
+        self._close_file()
+        self._file, self.path, self._seq = _open_new_file(
+            self.output_dir, self.worker_id, self.codec, self._seq, self.buffer_size)
+        self._size = 0
+        self._opened_at = time.monotonic()
+        log.debug("DiskSink opened %s", self.path)
+
+    def _fsync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self.fsyncs += 1
+
+    def _close_file(self):
+        if self._file is not None:
+            if self.durability != "none" and self._unsynced:
+                self._fsync()
+            self._file.close()
+            self._file = None
 
     def write_batch(self, batch: List[str]):
         if not batch:
             return
-        ts = datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%S")
-        filename = f"logflow-{ts}.jsonl"
-        path = os.path.join(self.output_dir, filename)
-        print(f"[DiskSink] Writing batch to {path}")
-        with open(path, "w", encoding="utf-8") as f:
-            for line in batch:
-                f.write(line.rstrip() + "\n")
+        data = self.codec.compress(_encode_lines(batch))
+        with self._lock:
+            if self._should_rotate(len(data)):
+                self._rotate()
+            hot_log.debug("DiskSink appending batch to %s", self.path)
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+            self._unsynced += len(data)
+            if self.durability == "batch":
+                self._fsync()
+            elif self._committer is not None:
+                self._committer.notify(self._unsynced)
+            path = self.path
         if self.on_write:
             self.on_write(path)
 
+    def stats(self):
+        """fsyncs performed so far (group commits included) and bytes not yet fsynced."""
+        fsyncs = self.fsyncs + (self._committer.fsyncs if self._committer else 0)
+        return {"durability": self.durability, "fsyncs": fsyncs, "unsynced_bytes": self._unsynced}
+
+    def close(self):
+        if self._committer is not None:
+            self._committer.stop()
+        with self._lock:
+            self._close_file()
+
 class StdoutSink(BaseSink):
-    """Echoes each log batch to standard output."""
+    """Echoes each log batch to standard output, one buffered write per batch."""
     def write_batch(self, batch: List[str]):
         if not batch:
             return
-        print("[StdoutSink] Log batch:")
-        for line in batch:
-            print(line)
+        sys.stdout.write("\n".join(batch) + "\n")
+        sys.stdout.flush()
 
 class TestSink(BaseSink):
     """Test-only sink that appends each batch to a shared list for assertion."""
@@ -60,60 +306,359 @@ class TestSink(BaseSink):
             return
         self.received_batches.append(list(batch))
 
+class S3StreamWriter:
+    """
+    Streams lines into one S3 object with a multipart upload. Lines are encoded
+    straight into a part-sized buffer; every full part is handed to a thread pool
+    while the next one fills, with at most `concurrency` parts in flight, so peak
+    memory stays around (concurrency + 1) * part_size however large the object is.
+    If the data never fills a part, close() falls back to a single put_object.
+    With a compression codec, lines are staged in small chunks and fed through
+    the codec's streaming compressor, and the object gets its Content-Encoding.
+    Use as a context manager: the upload is completed on success, aborted on error.
+    """
+    def __init__(self, s3, bucket, key, part_size=None, concurrency=None, executor=None, codec=None):
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size or S3_MULTIPART_PART_SIZE
+        concurrency = concurrency or S3_MULTIPART_CONCURRENCY
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="logflow-s3-part")
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts = []  # (part_number, future)
+        self.bytes_written = 0
+        codec = get_codec(codec or "none")
+        self.extra_args = _s3_encoding_args(codec)
+        self._compressor = codec.compressor() if codec.name != "none" else None
+        self._raw = bytearray()
+
+    def write_lines(self, lines):
+        if self._compressor is not None:
+            raw = self._raw
+            for line in lines:
+                raw += _encode_line(line)
+                if len(raw) >= COMPRESS_CHUNK_BYTES:
+                    self._compress_raw()
+                    raw = self._raw
+            return
+        buffer = self.buffer
+        for line in lines:
+            buffer += _encode_line(line)
+            if len(buffer) >= self.part_size:
+                self._submit_part()
+                buffer = self.buffer
+
+    def _compress_raw(self, final=False):
+        self.buffer += self._compressor.compress(bytes(self._raw))
+        self._raw = bytearray()
+        if final:
+            self.buffer += self._compressor.flush()
+        elif len(self.buffer) >= self.part_size:
+            self._submit_part()
+
+    def _upload_part(self, part_number, body):
+        try:
+            resp = self.s3.upload_part(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                                       PartNumber=part_number, Body=body)
+            return resp["ETag"]
+        finally:
+            self._slots.release()
+
+    def _submit_part(self):
+        if self.upload_id is None:
+            self.upload_id = self.s3.create_multipart_upload(Bucket=self.bucket, Key=self.key, **self.extra_args)["UploadId"]
+        body = bytes(self.buffer)
+        self.buffer = bytearray()
+        self.bytes_written += len(body)
+        self._slots.acquire()  # blocks the producer while `concurrency` parts are in flight
+        part_number = len(self.parts) + 1
+        self.parts.append((part_number, self.executor.submit(self._upload_part, part_number, body)))
+
+    def close(self):
+        """Upload whatever is buffered and complete the object."""
+        try:
+            if self._compressor is not None:
+                self._compress_raw(final=True)
+            if self.upload_id is None:
+                body = bytes(self.buffer)
+                self.buffer = bytearray()
+                self.bytes_written += len(body)
+                self.s3.put_object(Bucket=self.bucket, Key=self.key, Body=body, **self.extra_args)
+                return
+            if self.buffer:
+                self._submit_part()
+            parts = [{"PartNumber": n, "ETag": future.result()} for n, future in self.parts]
+            self.s3.complete_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                                              MultipartUpload={"Parts": parts})
+        finally:
+            if self._own_executor:
+                self.executor.shutdown(wait=False)
+
+    def abort(self):
+        for _, future in self.parts:
+            future.cancel()
+        if self.upload_id is not None:
+            try:
+                self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            except Exception as e:
+                log.warning("Failed to abort multipart upload %s/%s: %s", self.bucket, self.key, e)
+        if self._own_executor:
+            self.executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                self.close()
+            except BaseException:
+                self.abort()
+                raise
+        else:
+            self.abort()
+        return False
+
 class S3Sink(BaseSink):
-    """S3/MinIO sink for uploading log batches."""
-    def __init__(self):
+    """
+    S3/MinIO sink for uploading log batches. Batches larger than one multipart
+    part (S3_MULTIPART_PART_SIZE) are streamed with S3StreamWriter instead of being
+    joined and encoded in memory as a whole. With compression, objects get the
+    codec's extension and Content-Encoding. is_healthy() answers from memory:
+    write outcomes and a background head_bucket probe (on its own short-timeout
+    client) refresh a CachedHealthCheck.
+    """
+    def __init__(self, worker_id=None, part_size=None, concurrency=None, compression=None):
         if boto3 is None:
             raise ImportError("boto3 is required for S3Sink")
-        self.cfg = self._get_s3_config()
-        self.s3 = boto3.client(
-            "s3",
-            endpoint_url=self.cfg["endpoint_url"],
-            aws_access_key_id=self.cfg["aws_access_key_id"],
-            aws_secret_access_key=self.cfg["aws_secret_access_key"],
-            region_name=self.cfg["region_name"],
-        )
-        self.last_health = True  # Assume healthy at start
+        self.worker_id = worker_id
+        self.cfg = _s3_config()
+        self.s3 = boto3.client("s3", **s3_client_kwargs(self.cfg))
+        self._probe_s3 = boto3.client("s3", **_s3_probe_kwargs(self.cfg))
+        self.health = CachedHealthCheck(self._probe, name="S3Sink")
+        self.health.refresh()
+        self.part_size = part_size or S3_MULTIPART_PART_SIZE
+        if self.part_size < S3_MIN_PART_SIZE:
+            log.warning("S3 multipart part size %d is below the S3 minimum of %d bytes; "
+                        "large batches will fail to upload to AWS S3", self.part_size, S3_MIN_PART_SIZE)
+        self.concurrency = concurrency or S3_MULTIPART_CONCURRENCY
+        self.codec = get_codec(compression)
+        self._part_executor = None
 
     def _get_s3_config(self):
-        return {
-            "endpoint_url": os.getenv("S3_ENDPOINT", "http://minio_logflow:9000"),
-            "aws_access_key_id": os.getenv("S3_ACCESS_KEY", "minioadmin"),
-            "aws_secret_access_key": os.getenv("S3_SECRET_KEY", "minioadmin"),
-            "region_name": os.getenv("S3_REGION", "us-east-1"),
-            "bucket": os.getenv("S3_BUCKET", "logflow-ingest"),
-        }
+        return _s3_config()
+
+    @property
+    def last_health(self):
+        return self.health.healthy
+
+    def _probe(self):
+        self._probe_s3.head_bucket(Bucket=self.cfg["bucket"])
 
     def write_batch(self, batch: List[str]):
         if not batch:
             return
-        ts = datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%S")
-        key = f"logs/{ts}.jsonl"
-        data = "\n".join(batch)
-        print(f"[S3Sink] Uploading batch to {self.cfg['bucket']}/{key}")
+        key = _s3_batch_key(self.worker_id, self.codec)
+        hot_log.debug("S3Sink uploading batch to %s/%s", self.cfg["bucket"], key)
         try:
-            self.s3.put_object(Bucket=self.cfg["bucket"], Key=key, Body=data.encode())
-            self.last_health = True
+            if sum(len(line) for line in batch) >= self.part_size:
+                self._stream_batch(key, batch)
+            else:
+                body = self.codec.compress(_encode_lines(batch))
+                self.s3.put_object(Bucket=self.cfg["bucket"], Key=key, Body=body, **_s3_encoding_args(self.codec))
+            self.health.record(True)
         except Exception as e:
-            print(f"[S3Sink] Upload failed: {e}")
-            self.last_health = False
+            log.warning("S3Sink upload failed: %s", e)
+            self.health.record(False, e)
             raise
 
+    def _stream_batch(self, key, batch):
+        if self._part_executor is None:
+            self._part_executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="logflow-s3-part")
+        with S3StreamWriter(self.s3, self.cfg["bucket"], key, self.part_size, self.concurrency,
+                            executor=self._part_executor, codec=self.codec) as writer:
+            writer.write_lines(batch)
+
+    def close(self):
+        if self._part_executor is not None:
+            self._part_executor.shutdown(wait=True)
+            self._part_executor = None
+
     def is_healthy(self):
-        # If last upload failed, report unhealthy immediately
-        if not self.last_health:
-            return False
-        try:
-            # Try a lightweight S3 op (head_bucket) with a short timeout
-            import socket
-            import botocore
-            old_timeout = socket.getdefaulttimeout()
-            socket.setdefaulttimeout(2)
-            try:
-                self.s3.head_bucket(Bucket=self.cfg["bucket"])
-            finally:
-                socket.setdefaulttimeout(old_timeout)
+        return self.health.status()
+
+
+class AsyncStdoutSink(AsyncBaseSink):
+    """Async StdoutSink: the write runs on the default executor so a blocked stdout pipe never stalls the loop."""
+    async def write_batch(self, batch: List[str]):
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, StdoutSink().write_batch, batch)
+
+class AsyncDiskSink(AsyncBaseSink):
+    """
+    Async disk sink with DiskSink's file layout: batches are appended to one
+    open file, and a new, never-overwritten file is started once it reaches
+    max_bytes or is older than max_age seconds. Uses aiofiles when installed,
+    otherwise performs file I/O on the default executor. It has no fsync
+    durability modes; use DiskSink when those are needed.
+    """
+    def __init__(self, output_dir: str, on_write=None, worker_id=None, compression=None,
+                 max_bytes=None, max_age=None):
+        self.output_dir = output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.on_write = on_write
+        self.worker_id = worker_id
+        self.codec = get_codec(compression)
+        self.max_bytes = max_bytes or DISK_ROTATE_BYTES
+        self.max_age = max_age or DISK_ROTATE_SECONDS
+        self.path = None
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._seq = 0
+        self._lock = None  # created on first use, inside the running loop
+
+    def _should_rotate(self, incoming):
+        if self._file is None:
+            return True
+        if self._size and self._size + incoming > self.max_bytes:
             return True
+        return time.monotonic() - self._opened_at >= self.max_age
+
+    async def _rotate(self):
+        await self._close_file()
+        if aiofiles is not None:
+            while True:
+                path = _disk_batch_path(self.output_dir, self.worker_id, self.codec, self._seq)
+                self._seq += 1
+                try:
+                    self._file = await aiofiles.open(path, "xb")
+                    break
+                except FileExistsError:
+                    continue
+        else:
+            loop = asyncio.get_running_loop()
+            self._file, path, self._seq = await loop.run_in_executor(
+                None, _open_new_file, self.output_dir, self.worker_id, self.codec, self._seq)
+        self.path = path
+        self._size = 0
+        self._opened_at = time.monotonic()
+        log.debug("AsyncDiskSink opened %s", self.path)
+
+    def _append(self, data):
+        self._file.write(data)
+        self._file.flush()
+
+    async def _close_file(self):
+        if self._file is not None:
+            if aiofiles is not None:
+                await self._file.close()
+            else:
+                await asyncio.get_running_loop().run_in_executor(None, self._file.close)
+            self._file = None
+
+    async def write_batch(self, batch: List[str]):
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        data = _encode_lines(batch)
+        if self.codec.name != "none":
+            data = await loop.run_in_executor(None, self.codec.compress, data)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._should_rotate(len(data)):
+                await self._rotate()
+            hot_log.debug("AsyncDiskSink appending batch to %s", self.path)
+            if aiofiles is not None:
+                await self._file.write(data)
+                await self._file.flush()
+            else:
+                await loop.run_in_executor(None, self._append, data)
+            self._size += len(data)
+            path = self.path
+        if self.on_write:
+            self.on_write(path)
+
+    async def aclose(self):
+        await self.flush()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            await self._close_file()
+
+class AsyncS3Sink(AsyncBaseSink):
+    """
+    Async S3/MinIO sink. Uses a long-lived aiobotocore client when aiobotocore is
+    installed, otherwise runs boto3 calls on the default executor. Health is
+    cached like S3Sink's, with the probe running as a task on the loop.
+    """
+    def __init__(self, worker_id=None, compression=None):
+        if get_aiobotocore_session is None and boto3 is None:
+            raise ImportError("aiobotocore or boto3 is required for AsyncS3Sink")
+        self.worker_id = worker_id
+        self.codec = get_codec(compression)
+        self.cfg = _s3_config()
+        self.health = CachedHealthCheck(self._probe, name="AsyncS3Sink")
+        self._client = None
+        self._client_cm = None
+        self._lock = None  # created on first use, inside the running loop
+
+    def _client_kwargs(self):
+        return {k: self.cfg[k] for k in ("endpoint_url", "aws_access_key_id", "aws_secret_access_key", "region_name")}
+
+    async def _get_client(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._client is None:
+                if get_aiobotocore_session is not None:
+                    self._client_cm = get_aiobotocore_session().create_client("s3", **self._client_kwargs())
+                    self._client = await self._client_cm.__aenter__()
+                else:
+                    self._client = boto3.client("s3", **self._client_kwargs())
+            return self._client
+
+    async def _call(self, method, **kwargs):
+        client = await self._get_client()
+        if self._client_cm is not None:
+            return await getattr(client, method)(**kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: getattr(client, method)(**kwargs))
+
+    async def write_batch(self, batch: List[str]):
+        if not batch:
+            return
+        key = _s3_batch_key(self.worker_id, self.codec)
+        hot_log.debug("AsyncS3Sink uploading batch to %s/%s", self.cfg["bucket"], key)
+        body = _encode_lines(batch)
+        if self.codec.name != "none":
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(None, self.codec.compress, body)
+        try:
+            await self._call("put_object", Bucket=self.cfg["bucket"], Key=key, Body=body, **_s3_encoding_args(self.codec))
+            self.health.record(True)
         except Exception as e:
-            print(f"[S3Sink] Health check failed: {e}")
-            return False
+            log.warning("AsyncS3Sink upload failed: %s", e)
+            self.health.record(False, e)
+            raise
+
+    @property
+    def last_health(self):
+        return self.health.healthy
+
+    async def _probe(self):
+        await asyncio.wait_for(self._call("head_bucket", Bucket=self.cfg["bucket"]), timeout=S3_HEALTH_TIMEOUT)
+
+    async def is_healthy(self):
+        return self.health.status()
+
+    async def aclose(self):
+        if self._client_cm is not None:
+            await self._client_cm.__aexit__(None, None, None)
+        self._client = self._client_cm = None
@@ -0,0 +1,386 @@
+"""
+Write-ahead spool between the batcher and the sinks.
+
+Every flushed batch is appended to a segmented, append-only log on local disk
+before any sink sees it. Each sink then consumes the log at its own pace and
+checkpoints the offset it has delivered up to; segments every sink has moved
+past are deleted. On startup each sink resumes from its checkpoint, so batches
+that were spooled but not delivered before a crash, restart or sink outage are
+replayed. Delivery is at-least-once: up to one checkpoint interval of batches
+may be delivered again after a crash.
+
+Record format: 4-byte little-endian payload length, 4-byte CRC32, payload
+(the batch's lines joined with "\\n", UTF-8). Offsets are byte positions in the
+logical log; segment files are named after the offset they start at.
+"""
+import asyncio
+import bisect
+import os
+import struct
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .diagnostics import get_logger, hot_log
+
+log = get_logger("spool")
+
+SPOOL_DIR = os.getenv("LOGFLOW_SPOOL_DIR")  # unset disables the spool
+SPOOL_SEGMENT_BYTES = int(os.getenv("LOGFLOW_SPOOL_SEGMENT_BYTES", 64 * 1024 * 1024))  # roll segments past this size
+SPOOL_MAX_BYTES = int(os.getenv("LOGFLOW_SPOOL_MAX_BYTES", 0))  # 0 = unlimited; oldest segments dropped beyond
+SPOOL_FSYNC = os.getenv("LOGFLOW_SPOOL_FSYNC", "0").lower() in ("1", "true", "yes")  # fsync every append
+SPOOL_READ_BYTES = int(os.getenv("LOGFLOW_SPOOL_READ_BYTES", 4 * 1024 * 1024))  # catch-up read size per delivery
+SPOOL_CHECKPOINT_INTERVAL = float(os.getenv("LOGFLOW_SPOOL_CHECKPOINT_INTERVAL", 1))  # seconds between checkpoints
+SPOOL_RETRY_MIN = float(os.getenv("LOGFLOW_SPOOL_RETRY_MIN", 0.5))  # first redelivery delay after a sink error
+SPOOL_RETRY_MAX = float(os.getenv("LOGFLOW_SPOOL_RETRY_MAX", 30))  # cap for the doubling redelivery delay
+
+_HEADER = struct.Struct("<II")
+_SEGMENT_SUFFIX = ".seg"
+_CHECKPOINT_SUFFIX = ".checkpoint"
+
+def _encode_record(batch):
+    payload = "\n".join(batch).encode("utf-8")
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+class Spool:
+    """
+    Segmented append-only log of batches in directory. Thread-safe: append()
+    is called from one writer, read()/commit() from any number of consumers.
+    """
+    def __init__(self, directory, segment_bytes=None, max_bytes=None, fsync=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.segment_bytes = segment_bytes or SPOOL_SEGMENT_BYTES
+        self.max_bytes = SPOOL_MAX_BYTES if max_bytes is None else max_bytes
+        self.fsync = SPOOL_FSYNC if fsync is None else fsync
+        self._lock = threading.Lock()
+        self._bases = []  # sorted start offsets of the segment files
+        self._sizes = {}  # base -> bytes
+        self._committed = {}  # consumer name -> offset
+        self.dropped_bytes = 0
+        self._recover()
+        self._file = open(self._segment_path(self._bases[-1]), "ab")
+
+    def _segment_path(self, base):
+        return os.path.join(self.directory, f"{base:020d}{_SEGMENT_SUFFIX}")
+
+    def _recover(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(_SEGMENT_SUFFIX):
+                base = int(name[:-len(_SEGMENT_SUFFIX)])
+                self._bases.append(base)
+                self._sizes[base] = os.path.getsize(os.path.join(self.directory, name))
+        self._bases.sort()
+        if not self._bases:
+            self._bases.append(0)
+            self._sizes[0] = 0
+            return
+        # A crash can leave a torn record at the tail of the newest segment
+        base = self._bases[-1]
+        path = self._segment_path(base)
+        valid = 0
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                length, crc = _HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                valid += _HEADER.size + length
+        if valid < self._sizes[base]:
+            log.warning("Spool segment %s has a torn tail, truncating %d bytes", path, self._sizes[base] - valid)
+            with open(path, "r+b") as f:
+                f.truncate(valid)
+            self._sizes[base] = valid
+        log.info("Spool recovered %d segments (%d bytes) in %s", len(self._bases), self.size_bytes, self.directory)
+
+    @property
+    def start_offset(self):
+        return self._bases[0]
+
+    @property
+    def end_offset(self):
+        base = self._bases[-1]
+        return base + self._sizes[base]
+
+    @property
+    def size_bytes(self):
+        return sum(self._sizes.values())
+
+    def append(self, batch):
+        """Append batch as one record; returns (start, end) offsets. Visible to readers on return."""
+        record = _encode_record(batch)
+        with self._lock:
+            base = self._bases[-1]
+            if self._sizes[base] and self._sizes[base] + len(record) > self.segment_bytes:
+                self._roll()
+                base = self._bases[-1]
+            start = base + self._sizes[base]
+            self._file.write(record)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._sizes[base] += len(record)
+            end = start + len(record)
+        if self.max_bytes and self.size_bytes > self.max_bytes:
+            self.gc()
+        return start, end
+
+    def _roll(self):
+        end = self.end_offset
+        self._file.close()
+        self._bases.append(end)
+        self._sizes[end] = 0
+        self._file = open(self._segment_path(end), "ab")
+
+    def read(self, offset, max_bytes=None):
+        """
+        Read whole records from offset on, up to about max_bytes of payload.
+        Returns (start, [(end_offset, batch), ...]); start is later than offset
+        when the data at offset was dropped by the size limit.
+        """
+        max_bytes = max_bytes or SPOOL_READ_BYTES
+        with self._lock:
+            bases = list(self._bases)
+            end = self.end_offset
+        offset = max(offset, bases[0])
+        start = offset
+        records = []
+        total = 0
+        while offset < end and total < max_bytes:
+            idx = bisect.bisect_right(bases, offset) - 1
+            base = bases[idx]
+            segment_end = bases[idx + 1] if idx + 1 < len(bases) else end
+            try:
+                f = open(self._segment_path(base), "rb")
+            except FileNotFoundError:
+                break  # deleted by gc() meanwhile; the caller retries from the new start
+            with f:
+                f.seek(offset - base)
+                while offset < segment_end and total < max_bytes:
+                    length, _ = _HEADER.unpack(f.read(_HEADER.size))
+                    payload = f.read(length)
+                    offset += _HEADER.size + length
+                    total += length
+                    records.append((offset, payload.decode("utf-8").split("\n")))
+        return start, records
+
+    def register(self, name):
+        """Return the offset consumer name should resume from (its checkpoint, else the oldest data)."""
+        path = os.path.join(self.directory, name + _CHECKPOINT_SUFFIX)
+        try:
+            with open(path) as f:
+                offset = int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            offset = self.start_offset
+        with self._lock:
+            offset = max(offset, self._bases[0])
+            self._committed[name] = offset
+        return offset
+
+    def commit(self, name, offset):
+        """Persist consumer name's delivered offset (atomically replaced)."""
+        path = os.path.join(self.directory, name + _CHECKPOINT_SUFFIX)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+        with self._lock:
+            self._committed[name] = offset
+
+    def gc(self):
+        """Delete segments every consumer has moved past, then the oldest ones beyond max_bytes."""
+        with self._lock:
+            floor = min(self._committed.values()) if self._committed else self.start_offset
+            while len(self._bases) > 1:
+                base, next_base = self._bases[0], self._bases[1]
+                if next_base <= floor:
+                    pass
+                elif self.max_bytes and self.size_bytes > self.max_bytes:
+                    self.dropped_bytes += next_base - max(floor, base)
+                    hot_log.warning("Spool over %d bytes, dropping segment %d undelivered", self.max_bytes, base)
+                else:
+                    break
+                os.remove(self._segment_path(base))
+                del self._sizes[base]
+                self._bases.pop(0)
+
+    def lag(self, name):
+        return self.end_offset - self._committed.get(name, self.start_offset)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class _SpoolConsumer:
+    """Delivers the spool to one sink: from memory while caught up, from disk when behind."""
+    def __init__(self, pipeline, sink, name, offset, max_buffered):
+        self.pipeline = pipeline
+        self.sink = sink
+        self.name = name
+        self.offset = offset  # delivered up to here
+        self.committed = offset  # persisted checkpoint
+        self.known_end = pipeline.spool.end_offset
+        self.from_disk = offset < self.known_end
+        self.memory = deque()  # (end_offset, batch) appended while caught up
+        self.max_buffered = max_buffered
+        self.wakeup = asyncio.Event()
+        self.stopping = False
+        self.failures = 0
+        self.task = None
+
+    def notify(self, end, batch):
+        self.known_end = max(self.known_end, end)
+        if end <= self.offset:
+            return  # already read back from disk and delivered while catching up
+        if not self.from_disk:
+            if len(self.memory) < self.max_buffered:
+                self.memory.append((end, batch))
+            else:
+                self.from_disk = True  # too far behind: read the rest back from disk
+        self.wakeup.set()
+
+    async def _next(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            while self.memory and self.memory[0][0] <= self.offset:
+                self.memory.popleft()  # notified late, after the disk read delivered it
+            if self.memory:
+                return self.memory.popleft()
+            if self.from_disk:
+                start, records = await loop.run_in_executor(
+                    self.pipeline.dispatcher.executor, self.pipeline.spool.read, self.offset, self.pipeline.read_bytes)
+                if start > self.offset:
+                    hot_log.warning("%s lost %d spooled bytes to the spool size limit", self.name, start - self.offset)
+                    self.offset = start
+                if records:
+                    batch = [line for _, lines in records for line in lines]
+                    return records[-1][0], batch
+                if self.offset >= self.known_end:
+                    self.from_disk = False
+                    continue
+                await asyncio.sleep(self.pipeline.retry_min)  # segment removed under us; retry from the new start
+                continue
+            if self.stopping:
+                return None
+            self.wakeup.clear()
+            await self.wakeup.wait()
+
+    async def _deliver(self, batch):
+        delay = self.pipeline.retry_min
+        while True:
+            try:
+                await self.pipeline.dispatcher.write(self.sink, batch)
+                return
+            except Exception as e:
+                self.failures += 1
+                hot_log.warning("%s failed, batch kept in spool, retrying in %.1fs: %s", self.name, delay, e)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.pipeline.retry_max)
+
+    async def run(self):
+        while True:
+            item = await self._next()
+            if item is None:
+                return
+            end, batch = item
+            await self._deliver(batch)
+            self.offset = end
+
+    def stats(self):
+        return {
+            "sink": self.name,
+            "offset": self.offset,
+            "lag_bytes": max(0, self.known_end - self.offset),
+            "replaying": self.from_disk,
+            "failures": self.failures,
+        }
+
+class SpoolPipeline:
+    """
+    Routes flushed batches through a Spool to the dispatcher's sinks. append()
+    returns once the batch is on disk; each sink has a consumer task that
+    delivers with SinkDispatcher.write(), retrying failed batches with a
+    doubling delay instead of dropping them. Must be created inside the running
+    event loop; call start() before append() and stop() on shutdown.
+    """
+    def __init__(self, spool, dispatcher, checkpoint_interval=None, read_bytes=None, retry_min=None, retry_max=None):
+        self.spool = spool
+        self.dispatcher = dispatcher
+        self.checkpoint_interval = checkpoint_interval or SPOOL_CHECKPOINT_INTERVAL
+        self.read_bytes = read_bytes or SPOOL_READ_BYTES
+        self.retry_min = retry_min or SPOOL_RETRY_MIN
+        self.retry_max = retry_max or SPOOL_RETRY_MAX
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="logflow-spool")
+        self.consumers = []
+        seen = {}
+        for lane in dispatcher.lanes:
+            count = seen[lane.name] = seen.get(lane.name, 0) + 1
+            name = lane.name if count == 1 else f"{lane.name}-{count}"
+            offset = spool.register(name)
+            self.consumers.append(_SpoolConsumer(self, lane.sink, name, offset, lane.max_pending))
+        self._checkpoint_task = None
+
+    def start(self):
+        for consumer in self.consumers:
+            if consumer.from_disk:
+                log.info("Replaying %d spooled bytes to %s", consumer.known_end - consumer.offset, consumer.name)
+            consumer.task = asyncio.ensure_future(consumer.run())
+        self._checkpoint_task = asyncio.ensure_future(self._checkpoint_loop())
+
+    async def append(self, batch):
+        """Write batch to the spool (off the event loop) and hand it to every consumer."""
+        loop = asyncio.get_running_loop()
+        _, end = await loop.run_in_executor(self._writer, self.spool.append, batch)
+        for consumer in self.consumers:
+            consumer.notify(end, batch)
+
+    async def checkpoint(self):
+        loop = asyncio.get_running_loop()
+        for consumer in self.consumers:
+            if consumer.offset != consumer.committed:
+                offset = consumer.offset
+                await loop.run_in_executor(self._writer, self.spool.commit, consumer.name, offset)
+                consumer.committed = offset
+        await loop.run_in_executor(self._writer, self.spool.gc)
+
+    async def _checkpoint_loop(self):
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                log.warning("Spool checkpoint failed: %s", e)
+
+    async def stop(self, timeout=None):
+        """Let consumers catch up for up to timeout seconds; whatever is left stays spooled for next start."""
+        for consumer in self.consumers:
+            consumer.stopping = True
+            consumer.wakeup.set()
+        tasks = [c.task for c in self.consumers if c.task is not None]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                log.warning("%d sinks still behind at shutdown; their batches stay in the spool", len(pending))
+                await asyncio.wait(pending)
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+        await self.checkpoint()
+        self.spool.close()
+        self._writer.shutdown(wait=True)
+
+    def stats(self):
+        return {
+            "segments": len(self.spool._bases),
+            "bytes": self.spool.size_bytes,
+            "dropped_bytes": self.spool.dropped_bytes,
+            "consumers": [c.stats() for c in self.consumers],
+        }
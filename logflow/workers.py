@@ -0,0 +1,182 @@
+"""
+Multi-process listener mode.
+
+The supervisor forks LOGFLOW_WORKERS processes that all bind the same UDP port
+with SO_REUSEPORT, so the kernel spreads datagrams across cores. Every worker
+runs its own batcher and sinks (output names carry the worker id) and a private
+health endpoint on localhost; the supervisor serves the public health port and
+reports all workers together.
+"""
+import asyncio
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import threading
+
+from . import listener
+from .diagnostics import get_logger
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsWriter
+
+log = get_logger("workers")
+
+
+def _worker_main(worker_id, ip, port, health_queue):
+    sinks = listener.build_sinks(worker_id=worker_id)
+
+    def on_health_ready(bound_port):
+        health_queue.put((worker_id, bound_port))
+
+    async def serve():
+        stop_event = threading.Event()
+        listener.stop_on_signals(stop_event)
+        await listener.run_logflow_server(
+            ip=ip, port=port, sinks=sinks, reuse_port=True, stop_event=stop_event,
+            health_port=0, health_host="127.0.0.1", health_ready=on_health_ready,
+            spool_dir=_worker_spool_dir(worker_id),
+        )
+
+    asyncio.run(serve())
+
+
+def _worker_spool_dir(worker_id):
+    """Each worker needs its own spool; they live side by side under LOGFLOW_SPOOL_DIR."""
+    if not listener.SPOOL_DIR:
+        return None
+    return os.path.join(listener.SPOOL_DIR, f"w{worker_id}")
+
+
+async def _worker_status(session, worker_id, proc, health_port):
+    import aiohttp
+    status = {"worker": worker_id, "pid": proc.pid}
+    if not proc.is_alive():
+        status["status"] = "dead"
+        return status
+    if health_port is None:
+        status["status"] = "starting"
+        return status
+    try:
+        async with session.get(f"http://127.0.0.1:{health_port}/health") as resp:
+            status.update(await resp.json())
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        status["status"] = "unreachable"
+        status["error"] = str(e)
+    return status
+
+
+async def _worker_metrics(session, worker_id, proc, health_port):
+    import aiohttp
+    if health_port is None or not proc.is_alive():
+        return None
+    try:
+        async with session.get(f"http://127.0.0.1:{health_port}/metrics") as resp:
+            return await resp.text()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        log.warning("Could not scrape metrics from worker %s: %s", worker_id, e)
+        return None
+
+
+async def aggregate_health_server(workers, worker_ports, port=None, host="0.0.0.0"):
+    """
+    Serve /health and /metrics for the supervisor, combining every worker's own
+    report. Metrics samples get a worker label; logflow_worker_up shows which
+    workers could be scraped.
+    """
+    import aiohttp
+    from aiohttp import web
+    session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2))
+
+    async def handle(request):
+        results = await asyncio.gather(*(
+            _worker_status(session, worker_id, proc, worker_ports.get(worker_id))
+            for worker_id, proc in sorted(workers.items())
+        ))
+        healthy = all(r["status"] == "healthy" for r in results)
+        return web.json_response(
+            {"status": "healthy" if healthy else "unhealthy", "workers": results},
+            status=200 if healthy else 503,
+        )
+
+    async def handle_metrics(request):
+        items = sorted(workers.items())
+        texts = await asyncio.gather(*(
+            _worker_metrics(session, worker_id, proc, worker_ports.get(worker_id))
+            for worker_id, proc in items
+        ))
+        writer = MetricsWriter()
+        for (worker_id, _), text in zip(items, texts):
+            writer.gauge("logflow_worker_up", "1 if the worker's metrics could be scraped.",
+                         int(text is not None), {"worker": worker_id})
+        for (worker_id, _), text in zip(items, texts):
+            if text is not None:
+                writer.add_exposition(text, {"worker": worker_id})
+        return web.Response(body=writer.render().encode(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
+    async def close_session(app):
+        await session.close()
+
+    app = web.Application()
+    app.router.add_get("/health", handle)
+    app.router.add_get("/healthz", handle)  # legacy
+    app.router.add_get("/metrics", handle_metrics)
+    app.on_cleanup.append(close_session)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, listener.HEALTH_CHECK_PORT if port is None else port)
+    await site.start()
+    log.info("Aggregated health endpoint running on :%s/health", runner.addresses[0][1])
+    return runner
+
+
+async def _supervise(workers, health_queue, health_port):
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    worker_ports = {}
+    runner = await aggregate_health_server(workers, worker_ports, health_port)
+    try:
+        while not stop.is_set():
+            try:
+                while True:
+                    worker_id, bound_port = health_queue.get_nowait()
+                    worker_ports[worker_id] = bound_port
+            except queue.Empty:
+                pass
+            if not any(proc.is_alive() for proc in workers.values()):
+                log.warning("All workers exited, shutting down.")
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=0.2)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await runner.cleanup()
+
+
+def run_workers(num_workers, ip=None, port=None, health_port=None):
+    """Fork num_workers listener processes sharing one UDP port and supervise them until stopped."""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("LOGFLOW_WORKERS > 1 requires SO_REUSEPORT support")
+    ip = ip if ip is not None else listener.UDP_IP
+    port = port if port is not None else listener.UDP_PORT
+    ctx = multiprocessing.get_context("fork")
+    health_queue = ctx.Queue()
+    workers = {}
+    for worker_id in range(num_workers):
+        proc = ctx.Process(
+            target=_worker_main, args=(worker_id, ip, port, health_queue),
+            name=f"logflow-worker-{worker_id}", daemon=True,
+        )
+        proc.start()
+        workers[worker_id] = proc
+    log.info("Started %d workers on %s:%s (SO_REUSEPORT)", num_workers, ip, port)
+    try:
+        asyncio.run(_supervise(workers, health_queue, health_port))
+    finally:
+        for proc in workers.values():
+            if proc.is_alive():
+                proc.terminate()
+        for proc in workers.values():
+            proc.join(timeout=5)
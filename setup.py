@@ -10,6 +10,7 @@ setup(
         "console_scripts": [
             "logflow=logflow.cli:main",
             "logflow-listener=logflow.listener:main_entrypoint",
+            "logflow-bench=logflow.bench:main",
         ],
     },
     python_requires=">=3.7",
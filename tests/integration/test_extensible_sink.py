@@ -186,3 +186,44 @@ class TestExtensibleSink:
         found_dummy = any("multi-sink-test" in str(batch) for batch in non_empty_batches)
         assert found_disk, f"Disk sink did not receive log batch. Content: {content}"
         assert found_dummy, f"Dummy sink did not receive log batch. Received: {dummy_sink.received}"
+
+    def test_async_sink_plugin(self, tmp_path):
+        from logflow.sink import AsyncBaseSink
+        class DummyAsyncSink(AsyncBaseSink):
+            def __init__(self):
+                self.received = []
+                self.closed = False
+            async def write_batch(self, batch):
+                await asyncio.sleep(0)
+                self.received.append(list(batch))
+            async def aclose(self):
+                self.closed = True
+        server_addr = ('127.0.0.1', 18063)
+        stop_event = threading.Event()
+        ready_event = threading.Event()
+        sink = DummyAsyncSink()
+        error = []
+        def server():
+            async def run():
+                try:
+                    await run_logflow_server(
+                        ip=server_addr[0], port=server_addr[1],
+                        sinks=[sink],
+                        batch_size_bytes=1, batch_interval=0.1, stop_event=stop_event,
+                        ready_event=ready_event
+                    )
+                except Exception as e:
+                    error.append(e)
+            asyncio.run(run())
+        thread = threading.Thread(target=server, daemon=True)
+        thread.start()
+        ready_event.wait(timeout=5)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.sendto(b'{"msg": "async-sink-test"}', server_addr)
+        time.sleep(0.5)
+        stop_event.set()
+        thread.join(timeout=2)
+        if error:
+            raise error[0]
+        assert any("async-sink-test" in str(batch) for batch in sink.received), sink.received
+        assert sink.closed, "aclose() was not awaited on shutdown"
@@ -76,3 +76,73 @@ class TestHealthCheck:
         thread.join(timeout=2)
         # Assert
         assert resp.status_code == 503 or resp.json().get("status") == "unhealthy", "Health endpoint did not reflect unhealthy state."
+
+    def test_health_reports_queue_drops(self, tmp_path):
+        """A bounded ingest queue exposes its depth and per-policy drop counters on /health."""
+        import socket
+        server_addr = ('127.0.0.1', 10205)
+        stop_event = threading.Event()
+        ready_event = threading.Event()
+        class StalledSink:
+            def write_batch(self, batch):
+                time.sleep(0.5)
+        def server():
+            import asyncio
+            async def run():
+                await run_logflow_server(
+                    ip=server_addr[0], port=server_addr[1],
+                    sinks=[StalledSink()],
+                    batch_size_bytes=1, batch_interval=0.1, stop_event=stop_event,
+                    health_port=10206, ready_event=ready_event,
+                    queue_max_messages=5, queue_policy="drop-newest",
+                    receive_engine="batch"
+                )
+            asyncio.run(run())
+        thread = threading.Thread(target=server, daemon=True)
+        thread.start()
+        ready_event.wait(timeout=5)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for i in range(20):
+            sock.sendto(f'{{"msg": "drop-{i}"}}'.encode(), server_addr)
+        time.sleep(1.5)
+        resp = wait_for_health("http://127.0.0.1:10206/health", timeout=10)
+        stop_event.set()
+        thread.join(timeout=3)
+        queue = resp.json()["queue"]
+        assert queue["policy"] == "drop-newest"
+        assert queue["max_messages"] == 5
+        assert queue["drops"]["drop-newest"] > 0
+
+@pytest.mark.integration
+def test_metrics_endpoint_reports_ingest_and_sink_counters(tmp_path):
+    import socket
+    server_addr = ('127.0.0.1', 10207)
+    stop_event = threading.Event()
+    ready_event = threading.Event()
+    def server():
+        import asyncio
+        async def run():
+            await run_logflow_server(
+                ip=server_addr[0], port=server_addr[1],
+                sinks=[DiskSink(str(tmp_path))],
+                batch_size_bytes=1, batch_interval=0.1, stop_event=stop_event,
+                health_port=10208, ready_event=ready_event,
+            )
+        asyncio.run(run())
+    thread = threading.Thread(target=server, daemon=True)
+    thread.start()
+    ready_event.wait(timeout=5)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for i in range(3):
+        sock.sendto(f'{{"msg": "metrics-{i}"}}'.encode(), server_addr)
+    time.sleep(0.5)
+    resp = wait_for_health("http://127.0.0.1:10208/metrics", timeout=10)
+    stop_event.set()
+    thread.join(timeout=3)
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    samples = dict(line.rsplit(" ", 1) for line in resp.text.splitlines() if not line.startswith("#"))
+    assert samples["logflow_datagrams_received_total"] == "3"
+    assert samples['logflow_sink_batches_total{sink="DiskSink"}'] == "3"
+    assert samples['logflow_sink_write_seconds_count{sink="DiskSink"}'] == "3"
+    assert samples["logflow_batch_messages_count"] == "3"
@@ -0,0 +1,78 @@
+import asyncio
+import socket
+import threading
+import time
+import pytest
+from logflow.listener import run_logflow_server
+
+class OutageSink:
+    """Fails until `up` is set, like an unreachable S3 endpoint."""
+    def __init__(self):
+        self.up = threading.Event()
+        self.lines = []
+    def write_batch(self, batch):
+        if not self.up.is_set():
+            raise RuntimeError("endpoint down")
+        self.lines.extend(batch)
+
+def _serve(port, sink, spool_dir, stop_event):
+    def server():
+        asyncio.run(run_logflow_server(
+            ip="127.0.0.1", port=port, sinks=[sink],
+            batch_size_bytes=1, batch_interval=0.1, stop_event=stop_event, spool_dir=spool_dir,
+        ))
+    thread = threading.Thread(target=server, daemon=True)
+    thread.start()
+    time.sleep(0.5)
+    return thread
+
+@pytest.mark.integration
+def test_spool_survives_sink_outage_and_restart(tmp_path):
+    spool_dir = str(tmp_path / "spool")
+    port = 10501
+    sink = OutageSink()
+    stop_event = threading.Event()
+    thread = _serve(port, sink, spool_dir, stop_event)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for i in range(5):
+            sock.sendto(f'{{"msg": "spooled-{i}"}}'.encode(), ("127.0.0.1", port))
+    time.sleep(0.5)
+    stop_event.set()
+    thread.join(timeout=10)
+    assert sink.lines == []
+
+    # Restart with the endpoint back up: the spooled batches are replayed
+    sink = OutageSink()
+    sink.up.set()
+    stop_event = threading.Event()
+    thread = _serve(port, sink, spool_dir, stop_event)
+    for _ in range(50):
+        if len(sink.lines) >= 5:
+            break
+        time.sleep(0.1)
+    stop_event.set()
+    thread.join(timeout=10)
+    assert sorted(sink.lines) == [f'{{"msg": "spooled-{i}"}}' for i in range(5)]
+
+@pytest.mark.integration
+def test_enable_s3_sink_batches_are_spooled_through_an_outage(tmp_path, monkeypatch):
+    from unittest.mock import patch
+    from logflow import listener
+    monkeypatch.setenv("ENABLE_S3_SINK", "1")
+    s3_lane = OutageSink()
+    port = 10502
+    stop_event = threading.Event()
+    with patch.object(listener, "_build_s3_sink", return_value=s3_lane):
+        thread = _serve(port, OutageSink(), str(tmp_path / "spool"), stop_event)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b'{"msg": "during-s3-outage"}', ("127.0.0.1", port))
+        time.sleep(0.5)
+        assert s3_lane.lines == []
+        s3_lane.up.set()  # the spool retries the S3 lane until it recovers
+        for _ in range(100):
+            if s3_lane.lines:
+                break
+            time.sleep(0.1)
+        stop_event.set()
+        thread.join(timeout=10)
+    assert s3_lane.lines == ['{"msg": "during-s3-outage"}']
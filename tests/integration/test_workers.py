@@ -0,0 +1,70 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import pytest
+import requests
+from contextlib import closing
+
+def get_free_udp_port():
+    with closing(socket.socket(socket.AF_INET, socket.SOCK_DGRAM)) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def get_free_tcp_port():
+    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.mark.integration
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="SO_REUSEPORT not supported")
+def test_multi_worker_listener(tmp_path):
+    udp_port = get_free_udp_port()
+    health_port = get_free_tcp_port()
+    output_dir = tmp_path / "logs"
+    env = os.environ.copy()
+    env["LOGFLOW_WORKERS"] = "2"
+    env["UDP_LOG_LISTEN_IP"] = "127.0.0.1"
+    env["UDP_LOG_LISTEN_PORT"] = str(udp_port)
+    env["UDP_BATCH_INTERVAL"] = "0.1"
+    env["LOGFLOW_HEALTH_PORT"] = str(health_port)
+    env["DISK_SINK_DIR"] = str(output_dir)
+    env.pop("ENABLE_S3_SINK", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "logflow.listener"],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        body = None
+        for _ in range(50):
+            try:
+                resp = requests.get(f"http://127.0.0.1:{health_port}/health", timeout=2)
+                body = resp.json()
+                if resp.status_code == 200:
+                    break
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        assert body is not None, "Aggregated health endpoint never came up"
+        assert body["status"] == "healthy", body
+        assert sorted(w["worker"] for w in body["workers"]) == [0, 1]
+        metrics = requests.get(f"http://127.0.0.1:{health_port}/metrics", timeout=2).text
+        assert 'logflow_worker_up{worker="0"} 1' in metrics and 'logflow_worker_up{worker="1"} 1' in metrics
+        assert metrics.count("# TYPE logflow_datagrams_received_total counter") == 1
+        assert 'logflow_datagrams_received_total{worker="1"}' in metrics
+        # Many source ports so SO_REUSEPORT hashing spreads datagrams across workers
+        for i in range(40):
+            with closing(socket.socket(socket.AF_INET, socket.SOCK_DGRAM)) as s:
+                s.sendto(f'{{"msg": "worker-test-{i}"}}'.encode(), ("127.0.0.1", udp_port))
+        time.sleep(1.0)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    files = sorted(p.name for p in output_dir.iterdir())
+    assert files and all("-w0" in name or "-w1" in name for name in files), files
+    content = "".join(p.read_text() for p in output_dir.iterdir())
+    assert all(f"worker-test-{i}\"" in content for i in range(40)), content
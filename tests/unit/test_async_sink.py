@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from logflow.dispatch import SinkDispatcher
+from logflow.sink import AsyncBaseSink, AsyncDiskSink
+
+class RecordingAsyncSink(AsyncBaseSink):
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+    async def write_batch(self, batch):
+        self.batches.append(list(batch))
+    async def aclose(self):
+        self.closed = True
+
+class ClosableSink:
+    def __init__(self):
+        self.closed = False
+    def write_batch(self, batch):
+        pass
+    def close(self):
+        self.closed = True
+
+@pytest.mark.unit
+def test_async_base_sink_requires_write_batch():
+    with pytest.raises(TypeError):
+        AsyncBaseSink()
+
+@pytest.mark.unit
+def test_dispatcher_awaits_async_sinks_and_closes_all():
+    async_sink, sync_sink = RecordingAsyncSink(), ClosableSink()
+    async def run():
+        dispatcher = SinkDispatcher([async_sink, sync_sink])
+        assert dispatcher.lanes[0].is_async and not dispatcher.lanes[1].is_async
+        dispatcher.dispatch(["a", "b"])
+        await dispatcher.drain()
+        await dispatcher.close_sinks()
+        dispatcher.close()
+    asyncio.run(run())
+    assert async_sink.batches == [["a", "b"]]
+    assert async_sink.closed and sync_sink.closed
+
+@pytest.mark.unit
+def test_async_disk_sink_writes_jsonl(tmp_path):
+    written = []
+    sink = AsyncDiskSink(str(tmp_path / "logs"), on_write=written.append)
+    async def run():
+        await sink.write_batch(['{"msg": "foo"}', '{"msg": "bar"}'])
+        await sink.write_batch([])
+        await sink.aclose()
+    asyncio.run(run())
+    assert len(written) == 1
+    assert open(written[0]).read().splitlines() == ['{"msg": "foo"}', '{"msg": "bar"}']
+
+@pytest.mark.unit
+def test_async_disk_sink_appends_and_rotates_on_size(tmp_path):
+    output_dir = tmp_path / "logs"
+    written = []
+    sink = AsyncDiskSink(str(output_dir), on_write=written.append, max_bytes=20)
+    async def run():
+        for i in range(5):
+            await sink.write_batch([f"line-{i}"])  # 7 bytes each, so two batches per file
+        await sink.aclose()
+    asyncio.run(run())
+    files = sorted(output_dir.iterdir())
+    assert len(files) == 3
+    assert [f.read_text() for f in files] == ["line-0\nline-1\n", "line-2\nline-3\n", "line-4\n"]
+    assert written[0] == written[1] != written[2]
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+import pytest
+from logflow.listener import batch_and_upload
+
+class RecordingSink:
+    def __init__(self):
+        self.flushes = []
+    def write_batch(self, batch):
+        self.flushes.append((time.monotonic(), list(batch)))
+
+async def _run_batcher(feed, batch_size_bytes, batch_interval, run_for):
+    queue = asyncio.Queue()
+    sink = RecordingSink()
+    stop_event = threading.Event()
+    task = asyncio.create_task(batch_and_upload(queue, [sink], batch_size_bytes, batch_interval, stop_event))
+    start = time.monotonic()
+    await feed(queue)
+    await asyncio.sleep(run_for)
+    stop_event.set()
+    await task
+    return start, sink.flushes
+
+@pytest.mark.unit
+def test_size_threshold_flushes_immediately_and_in_bulk():
+    async def feed(queue):
+        for i in range(10):
+            queue.put_nowait("x" * 10)
+        queue.put_nowait(["y" * 10, "z" * 10])
+    start, flushes = asyncio.run(_run_batcher(feed, batch_size_bytes=40, batch_interval=60, run_for=0.05))
+    assert [len(batch) for _, batch in flushes] == [4, 4, 4]
+    assert flushes[-1][0] - start < 0.05
+
+@pytest.mark.unit
+def test_sub_second_interval_flushes_on_deadline():
+    async def feed(queue):
+        queue.put_nowait("first")
+        await asyncio.sleep(0.06)
+        queue.put_nowait("second")
+    start, flushes = asyncio.run(_run_batcher(feed, batch_size_bytes=1 << 20, batch_interval=0.15, run_for=0.3))
+    assert [batch for _, batch in flushes] == [["first", "second"]]
+    # Deadline is 150ms after the batcher started; allow scheduling slack
+    assert 0.14 <= flushes[0][0] - start < 0.2
+
+@pytest.mark.unit
+def test_enable_s3_sink_adds_an_s3_lane_instead_of_inline_uploads(monkeypatch):
+    import socket
+    from unittest.mock import MagicMock, patch
+    from logflow import listener
+    from logflow.retry import RetryingSink
+    from logflow.sink import S3Sink
+    monkeypatch.setenv("ENABLE_S3_SINK", "1")
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    stdout_sink, s3_lane = RecordingSink(), RecordingSink()
+    async def run():
+        stop_event = threading.Event()
+        ready = threading.Event()
+        server = asyncio.create_task(listener.run_logflow_server(
+            ip="127.0.0.1", port=port, sinks=[stdout_sink], batch_size_bytes=1, batch_interval=0.05,
+            stop_event=stop_event, ready_event=ready))
+        while not ready.is_set():
+            await asyncio.sleep(0.01)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender.sendto(b'{"msg": "to-s3"}', ("127.0.0.1", port))
+        sender.close()
+        for _ in range(100):
+            if s3_lane.flushes:
+                break
+            await asyncio.sleep(0.01)
+        stop_event.set()
+        await server
+    with patch.object(listener, "_build_s3_sink", return_value=s3_lane), \
+         patch.object(listener, "upload_batch") as upload:
+        asyncio.run(run())
+    upload.assert_not_called()
+    assert [batch for _, batch in s3_lane.flushes] == [batch for _, batch in stdout_sink.flushes] == [['{"msg": "to-s3"}']]
+    # An S3 sink already in the list (as build_sinks adds it) is not added twice
+    assert listener._is_s3_sink(RetryingSink(MagicMock(spec=S3Sink)))
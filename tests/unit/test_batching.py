@@ -1,3 +1,5 @@
+import threading
+import time
 import pytest
 from logflow.handler import LogBatcher
 
@@ -14,3 +16,33 @@ def test_batcher_add_and_flush():
     assert len(flushed) == 3
     assert flushed[0]["msg"] == "test1"
 
+
+@pytest.mark.unit
+def test_batcher_flushes_on_byte_budget_and_age():
+    batcher = LogBatcher(batch_size=100, batch_time=0.05, max_bytes=10)
+    batcher.add_log("12345")
+    assert batcher.flush() == []
+    batcher.add_log("67890")
+    assert batcher.flush() == ["12345", "67890"]
+    batcher.add_log("late")
+    assert batcher.flush() == []
+    time.sleep(0.06)
+    assert batcher.flush() == ["late"]
+    assert batcher.flush(force=True) == []
+
+@pytest.mark.unit
+def test_batcher_delivers_from_adders_and_timer():
+    batches = []
+    batcher = LogBatcher(batch_size=3, batch_time=0.05, max_bytes=8, on_flush=batches.append).start()
+    threads = [threading.Thread(target=lambda n=n: [batcher.add_log(f"{n}", 1) for _ in range(30)]) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(len(b) == 3 for b in batches) and len(batches) == 40
+    batcher.add_log("abcde")
+    batcher.add_log("fghij")  # over the byte budget: the first goes out on its own
+    assert batches[-1] == ["abcde"]
+    time.sleep(0.15)
+    assert batches[-1] == ["fghij"]
+    assert batcher.close() == []
@@ -0,0 +1,26 @@
+import time
+import pytest
+from logflow.bench import MeasuredSink, _percentiles
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+    def write_batch(self, batch):
+        self.batches.append(batch)
+
+@pytest.mark.unit
+def test_measured_sink_counts_and_samples_latency():
+    inner = ListSink()
+    sink = MeasuredSink(inner, sample_every=2)
+    sent = time.time() - 0.05
+    batch = ['{"t":%.6f,"s":%d,"p":"xx"}' % (sent, i) for i in range(4)]
+    sink.write_batch(batch)
+    assert inner.batches == [batch]
+    assert sink.received == 4 and sink.bytes == sum(map(len, batch))
+    assert len(sink.latencies) == 2
+    assert all(0.04 < latency < 1 for latency in sink.latencies)
+
+@pytest.mark.unit
+def test_percentiles_in_milliseconds():
+    result = _percentiles([i / 1000 for i in range(1, 101)])
+    assert result == {"p50": 51.0, "p99": 100.0, "max": 100.0}
@@ -0,0 +1,62 @@
+import gzip
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+from logflow.compression import get_codec, available_codecs
+from logflow.sink import DiskSink, S3StreamWriter, S3Sink
+
+def _fake_s3():
+    s3 = MagicMock()
+    s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+    s3.upload_part.side_effect = lambda **kw: {"ETag": f"etag-{kw['PartNumber']}"}
+    return s3
+
+@pytest.mark.unit
+@pytest.mark.parametrize("name", available_codecs())
+def test_codec_streaming_matches_one_shot(name):
+    codec = get_codec(name)
+    data = b"".join(b'{"n": %d}\n' % i for i in range(1000))
+    compressor = codec.compressor()
+    streamed = compressor.compress(data[:5000]) + compressor.compress(data[5000:]) + compressor.flush()
+    if name == "gzip":
+        assert gzip.decompress(streamed) == data
+        assert gzip.decompress(codec.compress(data)) == data
+    assert len(codec.compress(data)) <= len(data)
+
+@pytest.mark.unit
+def test_get_codec_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        get_codec("brotli")
+
+@pytest.mark.unit
+def test_disk_sink_gzip(tmp_path):
+    sink = DiskSink(str(tmp_path), compression="gzip")
+    sink.write_batch(['{"a": 1}', '{"a": 2}'])
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].endswith(".jsonl.gz")
+    with gzip.open(tmp_path / files[0], "rt") as f:
+        assert f.read() == '{"a": 1}\n{"a": 2}\n'
+
+@pytest.mark.unit
+def test_stream_writer_compresses_parts():
+    s3 = _fake_s3()
+    lines = [f'{{"n": {i}, "pad": "{os.urandom(8).hex()}"}}' for i in range(20000)]
+    with S3StreamWriter(s3, "bucket", "key", part_size=64 * 1024, codec=get_codec("gzip")) as writer:
+        writer.write_lines(lines)
+    assert s3.create_multipart_upload.call_args.kwargs["ContentEncoding"] == "gzip"
+    bodies = {c.kwargs["PartNumber"]: c.kwargs["Body"] for c in s3.upload_part.call_args_list}
+    assert len(bodies) >= 2
+    assert gzip.decompress(b"".join(bodies[n] for n in sorted(bodies))) == "".join(l + "\n" for l in lines).encode()
+
+@pytest.mark.unit
+def test_s3_sink_sets_extension_and_content_encoding():
+    with patch("logflow.sink.boto3") as mock_boto3:
+        s3 = _fake_s3()
+        mock_boto3.client.return_value = s3
+        sink = S3Sink(compression="gzip")
+        sink.write_batch(['{"a": 1}'])
+        kwargs = s3.put_object.call_args.kwargs
+        assert kwargs["Key"].endswith(".jsonl.gz")
+        assert kwargs["ContentEncoding"] == "gzip"
+        assert gzip.decompress(kwargs["Body"]) == b'{"a": 1}\n'
+        sink.close()
@@ -0,0 +1,24 @@
+import logging
+import pytest
+from logflow.diagnostics import RateLimitFilter, KeyValueFormatter
+
+def _record(msg="hello", **extra):
+    record = logging.LogRecord("logflow.test", logging.WARNING, __file__, 1, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+@pytest.mark.unit
+def test_rate_limit_filter_suppresses_and_reports():
+    f = RateLimitFilter(rate=2)
+    results = [f.filter(_record()) for _ in range(5)]
+    assert results == [True, True, False, False, False]
+    # Refill and check the suppressed count is reported on the next record
+    f.updated -= 1.0
+    record = _record()
+    assert f.filter(record)
+    assert "3 similar messages suppressed" in record.msg
+
+@pytest.mark.unit
+def test_key_value_formatter_appends_fields():
+    line = KeyValueFormatter().format(_record("Flushing batch", fields={"messages": 3, "bytes": 42}))
+    assert line.endswith("WARNING logflow.test Flushing batch messages=3 bytes=42")
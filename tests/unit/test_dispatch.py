@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+import pytest
+from logflow.dispatch import SinkDispatcher
+
+class SlowSink:
+    def __init__(self, delay):
+        self.delay = delay
+        self.batches = []
+        self.threads = set()
+    def write_batch(self, batch):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        self.batches.append(batch)
+
+class AsyncSink:
+    def __init__(self):
+        self.batches = []
+    async def write_batch(self, batch):
+        await asyncio.sleep(0)
+        self.batches.append(batch)
+
+class FailingSink:
+    def write_batch(self, batch):
+        raise RuntimeError("boom")
+
+@pytest.mark.unit
+def test_dispatch_does_not_block_and_runs_sinks_in_parallel():
+    slow, other, coro = SlowSink(0.2), SlowSink(0.2), AsyncSink()
+    async def run():
+        dispatcher = SinkDispatcher([slow, other, coro])
+        start = time.monotonic()
+        dispatcher.dispatch(["a"])
+        assert time.monotonic() - start < 0.05
+        await dispatcher.drain(timeout=2)
+        elapsed = time.monotonic() - start
+        dispatcher.close()
+        return elapsed
+    elapsed = asyncio.run(run())
+    assert slow.batches == other.batches == coro.batches == [["a"]]
+    assert elapsed < 0.35, "blocking sinks should run concurrently"
+    assert all(name.startswith("logflow-sink") for name in slow.threads)
+
+@pytest.mark.unit
+def test_slow_sink_backlog_is_bounded_per_sink():
+    slow, fast = SlowSink(0.1), SlowSink(0)
+    async def run():
+        dispatcher = SinkDispatcher([slow, fast], max_inflight=1, max_pending=2)
+        for i in range(5):
+            dispatcher.dispatch([str(i)])
+            await asyncio.sleep(0.01)
+        await dispatcher.drain(timeout=2)
+        dispatcher.close()
+        return dispatcher.stats()
+    stats = asyncio.run(run())
+    assert [b[0] for b in fast.batches] == ["0", "1", "2", "3", "4"]
+    assert [b[0] for b in slow.batches] == ["0", "1"]
+    assert stats[0]["dropped"] == 3 and stats[1]["dropped"] == 0
+
+@pytest.mark.unit
+def test_write_raises_and_counts_errors():
+    sink = FailingSink()
+    async def run():
+        dispatcher = SinkDispatcher([sink])
+        with pytest.raises(RuntimeError):
+            await dispatcher.write(sink, ["x"])
+        dispatcher.dispatch(["y"])  # swallowed and counted
+        await dispatcher.drain()
+        dispatcher.close()
+        return dispatcher.stats()[0]
+    assert asyncio.run(run())["errors"] == 2
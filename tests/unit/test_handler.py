@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+import socket
+import time
+import pytest
+from logflow.handler import UDPJsonLogHandler
+from logflow.serialization import Serializer
+from logflow.listener import BatchedUDPReceiver, UDPHandler, _bind_udp_socket
+
+def _recv_all(sock):
+    datagrams = []
+    sock.settimeout(0.5)
+    try:
+        while True:
+            datagrams.append(sock.recv(65535))
+    except socket.timeout:
+        pass
+    return datagrams
+
+@pytest.mark.unit
+def test_queued_handler_packs_records_into_datagrams():
+    receiver = _bind_udp_socket("127.0.0.1", 0)
+    host, port = receiver.getsockname()
+    handler = UDPJsonLogHandler(ip=host, port=port, queued=True, max_payload=1000)
+    logger = logging.getLogger("test_queued_handler")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(50):
+            logger.warning("record %d", i)
+        handler.flush()
+        datagrams = _recv_all(receiver)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+        receiver.close()
+    assert all(len(d) <= 1000 for d in datagrams)
+    assert len(datagrams) < 50
+    records = [json.loads(line) for d in datagrams for line in d.split(b"\n")]
+    assert [r["message"] for r in records] == [f"record {i}" for i in range(50)]
+    assert handler.dropped == 0
+
+@pytest.mark.unit
+def test_queued_handler_drops_when_queue_full():
+    handler = UDPJsonLogHandler(ip="127.0.0.1", port=9, queued=True, queue_size=1)
+    handler._queue.put(None)  # stop the sender so the queue stays full
+    handler._thread.join(timeout=1)
+    handler._queue.put_nowait({"message": "queued"})
+    handler.emit(logging.makeLogRecord({"msg": "dropped"}))
+    assert handler.dropped == 1
+    handler.sock.close()
+
+@pytest.mark.unit
+def test_listeners_split_packed_datagrams():
+    packed = b'{"n": 0}\n{"n": 1}\n{"n": 2}'
+    queue = asyncio.Queue()
+    seen = []
+    UDPHandler(queue, received_callback=seen.append).datagram_received(packed, ("127.0.0.1", 1))
+    assert queue.get_nowait() == ['{"n": 0}', '{"n": 1}', '{"n": 2}']
+    assert seen == ['{"n": 0}', '{"n": 1}', '{"n": 2}']
+
+    sock = _bind_udp_socket("127.0.0.1", 0)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sender.sendto(packed, sock.getsockname())
+        sender.sendto(b'{"n": 3}', sock.getsockname())
+        time.sleep(0.1)
+        BatchedUDPReceiver(sock, queue).on_readable()
+        assert queue.get_nowait() == ['{"n": 0}', '{"n": 1}', '{"n": 2}', '{"n": 3}']
+    finally:
+        sender.close()
+        sock.close()
+
+@pytest.mark.unit
+@pytest.mark.parametrize("queued", [False, True])
+def test_batching_handler_sends_partial_batch_after_batch_time(queued):
+    receiver = _bind_udp_socket("127.0.0.1", 0)
+    host, port = receiver.getsockname()
+    handler = UDPJsonLogHandler(ip=host, port=port, queued=queued, batch_time=0.1, batch_size=4)
+    try:
+        for i in range(6):
+            handler.emit(logging.makeLogRecord({"msg": f"m{i}"}))
+        datagrams = _recv_all(receiver)  # waits long enough for the timer
+    finally:
+        handler.close()
+        receiver.close()
+    assert [[json.loads(line)["message"] for line in d.split(b"\n")] for d in datagrams] == [
+        ["m0", "m1", "m2", "m3"], ["m4", "m5"]]
+
+class _PickySerializer(Serializer):
+    name = "picky"
+    def dumps(self, obj):
+        if obj["message"] == "bad":
+            raise ValueError("cannot serialize")
+        return json.dumps(obj).encode()
+
+@pytest.mark.unit
+def test_queued_handler_survives_unserializable_record():
+    receiver = _bind_udp_socket("127.0.0.1", 0)
+    host, port = receiver.getsockname()
+    handler = UDPJsonLogHandler(ip=host, port=port, queued=True, serializer=_PickySerializer())
+    try:
+        for msg in ("before", "bad", "after"):
+            handler.emit(logging.makeLogRecord({"msg": msg}))
+        handler.flush()  # returns: every item was marked done
+        datagrams = _recv_all(receiver)
+        assert handler._thread.is_alive()
+    finally:
+        handler.close()
+        receiver.close()
+    assert [json.loads(line)["message"] for d in datagrams for line in d.split(b"\n")] == ["before", "after"]
+    assert handler.dropped == 1
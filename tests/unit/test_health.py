@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from logflow.health import CachedHealthCheck
+from logflow.sink import S3Sink
+
+@pytest.mark.unit
+def test_status_never_waits_for_the_probe():
+    release = threading.Event()
+    calls = []
+    def probe():
+        calls.append(1)
+        release.wait(2)
+        raise RuntimeError("unreachable")
+    check = CachedHealthCheck(probe, ttl=60)
+    start = time.perf_counter()
+    assert check.status() is True  # optimistic until the probe answers
+    assert check.status() is True
+    assert time.perf_counter() - start < 0.05
+    release.set()
+    for _ in range(100):
+        if check.probes:
+            break
+        time.sleep(0.01)
+    assert calls == [1]  # one probe in flight at a time
+    assert check.status() is False
+
+@pytest.mark.unit
+def test_write_outcomes_are_fresh_evidence():
+    probe = MagicMock()
+    check = CachedHealthCheck(probe, ttl=60)
+    check.record(False, "boom")
+    assert check.status() is False and check.error == "boom"
+    check.record(True)
+    assert check.status() is True
+    probe.assert_not_called()
+
+@pytest.mark.unit
+def test_async_probe_runs_as_a_task():
+    async def probe():
+        await asyncio.sleep(0)
+    async def run():
+        check = CachedHealthCheck(probe, ttl=60)
+        check.record(False)
+        check.checked_at -= 120  # stale
+        assert check.status() is False
+        await asyncio.sleep(0.01)
+        return check.status()
+    assert asyncio.run(run()) is True
+
+@pytest.mark.unit
+def test_s3_sink_health_does_not_block_or_touch_socket_defaults():
+    import socket
+    with patch("logflow.sink.boto3") as mock_boto3:
+        client = MagicMock()
+        client.head_bucket.side_effect = lambda **kw: time.sleep(0.5)
+        mock_boto3.client.return_value = client
+        sink = S3Sink()
+        start = time.perf_counter()
+        for _ in range(100):
+            sink.is_healthy()
+        assert time.perf_counter() - start < 0.05
+        assert socket.getdefaulttimeout() is None
+        client.put_object.side_effect = RuntimeError("denied")
+        with pytest.raises(RuntimeError):
+            sink.write_batch(["x"])
+        assert sink.is_healthy() is False
@@ -0,0 +1,77 @@
+import pytest
+from logflow.ingest_queue import IngestQueue
+
+@pytest.mark.unit
+def test_unbounded_by_default():
+    q = IngestQueue(max_messages=0, max_bytes=0)
+    for i in range(1000):
+        assert q.put_nowait(str(i))
+    assert q.stats()["depth"] == 1000
+
+@pytest.mark.unit
+def test_drop_newest_counts_messages():
+    q = IngestQueue(max_messages=2, policy="drop-newest")
+    assert q.put_nowait("a") and q.put_nowait("b")
+    assert not q.put_nowait("c")
+    assert not q.put_nowait(["d", "e"])
+    assert [q.get_nowait(), q.get_nowait()] == ["a", "b"]
+    assert q.drops["drop-newest"] == 3
+
+@pytest.mark.unit
+def test_drop_oldest_evicts_by_bytes():
+    q = IngestQueue(max_bytes=10, policy="drop-oldest")
+    q.put_nowait("aaaa")
+    q.put_nowait("bbbb")
+    assert q.put_nowait("cccc")
+    assert q.stats()["bytes"] == 8
+    assert [q.get_nowait(), q.get_nowait()] == ["bbbb", "cccc"]
+    assert q.drops["drop-oldest"] == 1
+    # An item that can never fit is dropped rather than emptying the queue
+    assert not q.put_nowait("x" * 11)
+
+@pytest.mark.unit
+def test_sample_keeps_one_in_n_while_full():
+    q = IngestQueue(max_messages=1, policy="sample", sample_rate=3)
+    q.put_nowait("first")
+    kept = [q.put_nowait(f"m{i}") for i in range(6)]
+    assert kept == [False, False, True, False, False, True]
+    assert q.get_nowait() == "m5"
+    assert q.drops["sample"] == 6
+
+@pytest.mark.unit
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        IngestQueue(policy="block")
+
+@pytest.mark.unit
+@pytest.mark.parametrize("policy, expected", [
+    ("drop-newest", [f"m{i}" for i in range(100)]),
+    ("drop-oldest", [f"m{i}" for i in range(412, 512)]),
+])
+def test_chunk_larger_than_limit_is_partially_kept(policy, expected):
+    q = IngestQueue(max_messages=100, policy=policy)
+    assert q.put_nowait([f"m{i}" for i in range(512)])
+    assert q.get_nowait() == expected
+    assert q.drops[policy] == 412
+
+@pytest.mark.unit
+def test_drop_oldest_trims_queued_chunk_and_sample_is_per_message():
+    q = IngestQueue(max_messages=5, policy="drop-oldest")
+    q.put_nowait(["a", "b", "c", "d"])
+    assert q.put_nowait(["e", "f", "g"])
+    assert [q.get_nowait(), q.get_nowait()] == [["c", "d"], ["e", "f", "g"]]
+    assert q.drops["drop-oldest"] == 2
+    sampled = IngestQueue(max_messages=2, policy="sample", sample_rate=4)
+    assert sampled.put_nowait([f"m{i}" for i in range(10)])
+    # m0, m1 fit; of the 8 overflow arrivals every 4th (m5, m9) replaces the oldest
+    assert sampled.get_nowait() == ["m5", "m9"]
+    assert sampled.drops["sample"] == 8
+
+@pytest.mark.unit
+def test_max_bytes_counts_utf8_bytes():
+    q = IngestQueue(max_bytes=6, policy="drop-newest")
+    assert q.put_nowait("é")  # 2 bytes
+    assert q.stats()["bytes"] == 2
+    assert not q.put_nowait("éé" + "x")  # 5 more bytes would exceed 6
+    assert q.put_nowait(["ab", "cd", "é"]) and q.get_nowait() == "é"
+    assert q.get_nowait() == ["ab", "cd"]
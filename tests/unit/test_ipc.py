@@ -0,0 +1,286 @@
+import asyncio
+import io
+import json
+import socket
+import threading
+import time
+import pytest
+from logflow.ipc import IPCClient, IPCServer, LineBuffer, ReplayBuffer, TailFilter
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(path)
+    return sock
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+def _read_until(sock, marker, timeout=5.0):
+    sock.settimeout(timeout)
+    data = b""
+    while marker not in data:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+@pytest.mark.unit
+@pytest.mark.parametrize("policy", ["lag", "disconnect"])
+def test_slow_tail_client_does_not_block_producer_or_others(tmp_path, policy):
+    server = IPCServer(sock_path=str(tmp_path / "tail.sock"), buffer_bytes=64 * 1024, slow_policy=policy)
+    server.start()
+    fast, slow = _connect(server.sock_path), _connect(server.sock_path)
+    slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)  # never read: its buffers fill up
+    try:
+        assert _wait_for(lambda: len(server.clients) == 2)
+        received = []
+        reader = threading.Thread(target=lambda: received.append(_read_until(fast, b"line-3999\n")))
+        reader.start()
+        line = "x" * 500
+        blocked = 0.0
+        for burst in range(40):  # 2MB in 50KB bursts: fine for a reader, far too much for one that never reads
+            start = time.perf_counter()
+            for i in range(burst * 100, burst * 100 + 100):
+                server.broadcast(f"{line} line-{i}")
+            blocked += time.perf_counter() - start
+            time.sleep(0.01)
+        assert blocked < 1
+        reader.join(timeout=10)
+        assert received and received[0].count(b"\n") == 4000
+        if policy == "disconnect":
+            assert _wait_for(lambda: server.disconnects == 1 and len(server.clients) == 1)
+        else:
+            assert _wait_for(lambda: server.lines_skipped > 0)
+            assert len(server.clients) == 2
+            # Once the slow client drains its backlog it is told what it missed
+            data = b""
+            slow.settimeout(0.05)
+            deadline = time.time() + 5
+            while b"lines skipped: tail client too slow" not in data and time.time() < deadline:
+                server.broadcast("after")
+                try:
+                    while True:
+                        data += slow.recv(65536)
+                except socket.timeout:
+                    pass
+            assert b"lines skipped: tail client too slow" in data
+    finally:
+        fast.close()
+        slow.close()
+        server.stop()
+
+@pytest.mark.unit
+def test_rejects_clients_over_limit_and_tracks_disconnects(tmp_path):
+    server = IPCServer(sock_path=str(tmp_path / "tail.sock"), max_clients=1)
+    server.start()
+    first = _connect(server.sock_path)
+    try:
+        assert _wait_for(lambda: len(server.clients) == 1)
+        second = _connect(server.sock_path)
+        assert b"Too many tail clients" in _read_until(second, b"\n")
+        second.close()
+        first.close()
+        assert _wait_for(lambda: not server.clients)
+        assert server.disconnects == 0
+    finally:
+        server.stop()
+    assert not (tmp_path / "tail.sock").exists()
+
+@pytest.mark.unit
+def test_broadcast_batch_is_one_write_per_client(tmp_path):
+    server = IPCServer(sock_path=str(tmp_path / "tail.sock"))
+    server.start()
+    tails = [_connect(server.sock_path) for _ in range(3)]
+    try:
+        assert _wait_for(lambda: len(server.clients) == 3)
+        writes = []
+        for client in server.clients:
+            client.transport.write = (lambda write: lambda data: (writes.append(data), write(data)))(client.transport.write)
+        lines = [f"line-{i}" for i in range(1000)]
+        server.broadcast_batch(lines)
+        expected = ("\n".join(lines) + "\n").encode()
+        for tail in tails:
+            assert _read_until(tail, b"line-999\n") == expected
+        assert len(writes) == 3 and writes[0] is writes[1] is writes[2]
+        assert server.lines_sent == 1000
+        assert server.broadcast_seconds.count == 1
+    finally:
+        for tail in tails:
+            tail.close()
+        server.stop()
+
+def _subscribe(path, subscription):
+    sock = _connect(path)
+    sock.sendall(json.dumps({"subscribe": subscription}).encode() + b"\n")
+    return sock
+
+@pytest.mark.unit
+def test_tail_filter_conditions():
+    records = [
+        {"level": "INFO", "name": "app.db", "message": "connected", "host": "web-1"},
+        {"level": "ERROR", "name": "app.db.pool", "message": "timeout", "host": "web-1"},
+        {"level": "WARNING", "name": "app.dbx", "message": "timeout", "host": "web-2"},
+    ]
+    lines = [json.dumps(r) for r in records] + ["plain timeout text"]
+    def matches(subscription):
+        data, count = TailFilter(subscription).apply(lines, {})
+        return [lines.index(line) for line in data.decode().splitlines()]
+    assert matches({"level": "warning"}) == [1, 2]
+    assert matches({"logger": "app.db"}) == [0, 1]
+    assert matches({"contains": "timeout"}) == [1, 2, 3]
+    assert matches({"regex": r"web-\d\"\}$", "level": "ERROR"}) == [1]
+    assert matches({"fields": {"host": "web-2"}}) == [2]
+    with pytest.raises(ValueError):
+        TailFilter({"regex": "("})
+    with pytest.raises(ValueError):
+        TailFilter({"grep": "x"})
+
+@pytest.mark.unit
+def test_server_applies_shared_subscription_filters(tmp_path):
+    server = IPCServer(sock_path=str(tmp_path / "tail.sock"))
+    server.start()
+    errors_a = _subscribe(server.sock_path, {"level": "ERROR"})
+    errors_b = _subscribe(server.sock_path, {"level": "ERROR"})
+    everything = _subscribe(server.sock_path, {})
+    bad = _subscribe(server.sock_path, {"regex": "("})
+    try:
+        assert b"Invalid subscription" in _read_until(bad, b"\n")
+        assert _wait_for(lambda: len(server.clients) == 3)
+        assert len(server._filters) == 1
+        assert server.clients[0].filter is server.clients[1].filter
+        batch = [json.dumps({"level": level, "n": i}) for i, level in enumerate(["INFO", "ERROR", "DEBUG", "ERROR"])]
+        server.broadcast_batch(batch)
+        expected_errors = (batch[1] + "\n" + batch[3] + "\n").encode()
+        assert _read_until(errors_a, b'"n": 3}\n') == expected_errors
+        assert _read_until(errors_b, b'"n": 3}\n') == expected_errors
+        assert _read_until(everything, b'"n": 3}\n') == ("\n".join(batch) + "\n").encode()
+        errors_a.close()
+        errors_b.close()
+        assert _wait_for(lambda: len(server.clients) == 1)
+        assert server._filters == {}
+    finally:
+        for sock in (errors_a, errors_b, everything, bad):
+            sock.close()
+        server.stop()
+
+@pytest.mark.unit
+def test_line_buffer_splits_across_reads_and_grows_for_long_lines():
+    stream = b"first\nsec" + b"ond\n" + b"x" * 100 + b"\nthird\npartial"
+    pieces = [stream[i:i + 7] for i in range(0, len(stream), 7)]
+    def recv_into(view):
+        if not pieces:
+            return 0
+        piece = pieces.pop(0)
+        view[:len(piece)] = piece
+        return len(piece)
+    buffer = LineBuffer(size=16)
+    chunks = []
+    while buffer.fill(recv_into):
+        chunks.append(buffer.take())
+    assert b"".join(chunks) == b"first\nsecond\n" + b"x" * 100 + b"\nthird\n"
+    assert buffer.rest() == b"partial"
+
+@pytest.mark.unit
+def test_ipc_client_tail_and_iterators(tmp_path):
+    server = IPCServer(sock_path=str(tmp_path / "tail.sock"))
+    server.start()
+    clients = [IPCClient(sock_path=server.sock_path, subscription={"contains": "keep"}) for _ in range(3)]
+    try:
+        for client in clients:
+            client.connect()
+        assert _wait_for(lambda: len(server.clients) == 3)
+        lines = [f"keep-{i}" if i % 2 == 0 else f"drop-{i}" for i in range(20000)]
+        server.broadcast_batch(lines)
+        time.sleep(0.2)
+        server.stop()  # closes the connections: every reader ends
+        out = io.BytesIO()
+        clients[0].tail(out)
+        expected = [line for line in lines if line.startswith("keep")]
+        assert out.getvalue() == ("\n".join(expected) + "\n").encode()
+        assert list(clients[1]) == expected
+        async def collect():
+            return [line async for line in clients[2]]
+        assert asyncio.run(collect()) == expected
+    finally:
+        server.stop()
+
+@pytest.mark.unit
+def test_replay_buffer_limits_and_snapshots():
+    replay = ReplayBuffer(max_lines=5, max_bytes=0)
+    for batch, timestamp in (([b"a", b"b", b"c"], 100.0), ([b"d", b"e"], 200.0), ([b"f", b"g"], 300.0)):
+        replay.append(b"".join(line + b"\n" for line in batch), len(batch), timestamp)
+    assert (replay.lines, replay.bytes) == (5, 10)
+    assert replay.snapshot() == (b"c\nd\ne\nf\ng\n", 5)
+    assert replay.snapshot(lines=2) == (b"f\ng\n", 2)
+    assert replay.snapshot(seconds=150, now=340.0) == (b"d\ne\nf\ng\n", 4)
+    assert replay.snapshot(lines=1, tail_filter=TailFilter({"regex": "[de]"})) == (b"e\n", 1)
+    by_bytes = ReplayBuffer(max_lines=0, max_bytes=7)
+    by_bytes.append(b"one\ntwo\n", 2, 1.0)
+    by_bytes.append(b"three\n", 1, 2.0)
+    assert by_bytes.snapshot() == (b"three\n", 1)
+    assert not ReplayBuffer(max_lines=0, max_bytes=0).enabled
+    assert replay.snapshot(max_bytes=5) == (b"f\ng\n", 2)
+    assert replay.snapshot(max_bytes=6) == (b"e\nf\ng\n", 3)
+    assert replay.snapshot(max_bytes=1) == (b"", 0)
+
+@pytest.mark.unit
+def test_new_tail_gets_replay_then_live_lines(tmp_path):
+    server = IPCServer(sock_path=str(tmp_path / "tail.sock"), replay_lines=100)
+    server.start()
+    client = IPCClient(sock_path=server.sock_path, subscription={"contains": "even"}, replay_lines=2)
+    try:
+        server.broadcast_batch([f"{'even' if i % 2 == 0 else 'odd'}-{i}" for i in range(10)])
+        assert _wait_for(lambda: server.replay.lines == 10)  # kept with no clients connected
+        client.connect()
+        assert _wait_for(lambda: len(server.clients) == 1)
+        server.broadcast("even-live")
+        server.broadcast("odd-live")
+        time.sleep(0.1)
+        server.stop()
+        assert list(client) == ["even-6", "even-8", "even-live"]
+    finally:
+        server.stop()
+
+@pytest.mark.unit
+def test_client_limit_holds_for_clients_connecting_at_once(tmp_path):
+    server = IPCServer(sock_path=str(tmp_path / "tail.sock"), max_clients=2)
+    server.start()
+    socks = [_connect(server.sock_path) for _ in range(5)]  # none subscribe yet: all still joining
+    try:
+        rejected = sum(b"Too many tail clients" in _read_until(sock, b"\n", timeout=0.2)
+                       for sock in socks[2:])
+        for sock in socks:
+            sock.sendall(b"\n")
+        time.sleep(0.2)
+        assert len(server.clients) == 2
+        assert rejected == 3
+    finally:
+        for sock in socks:
+            sock.close()
+        server.stop()
+
+@pytest.mark.unit
+def test_full_replay_does_not_get_a_disconnect_policy_client_dropped(tmp_path):
+    server = IPCServer(sock_path=str(tmp_path / "tail.sock"), buffer_bytes=64 * 1024, slow_policy="disconnect",
+                       replay_lines=0, replay_bytes=4 * 1024 * 1024)
+    server.start()
+    line = "x" * 100
+    for i in range(10):
+        server.broadcast_batch([f"{line} old-{i}-{j}" for j in range(1000)])  # ~1MB of history
+    assert _wait_for(lambda: server.replay.bytes > 1000 * 1000)
+    tail = _connect(server.sock_path)
+    try:
+        tail.sendall(json.dumps({"subscribe": {}, "replay": {"lines": 100000}}).encode() + b"\n")
+        assert _wait_for(lambda: len(server.clients) == 1)
+        server.broadcast("live")
+        data = _read_until(tail, b"live\n")
+        assert data.endswith(f"{line} old-9-999\nlive\n".encode())
+        assert len(data) <= 32 * 1024 + len(b"live\n")
+        assert server.disconnects == 0
+    finally:
+        tail.close()
+        server.stop()
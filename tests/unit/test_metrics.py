@@ -0,0 +1,83 @@
+import pytest
+from logflow.metrics import Histogram, MetricsWriter, ServerMetrics
+from logflow.listener import UDPHandler
+from logflow.ingest_queue import IngestQueue
+
+@pytest.mark.unit
+def test_histogram_buckets_are_cumulative_in_exposition():
+    hist = Histogram(buckets=(1, 5))
+    for value in (0.5, 1, 3, 10):
+        hist.observe(value)
+    w = MetricsWriter()
+    w.histogram("h", "help", hist, {"sink": "S"})
+    lines = w.render().splitlines()
+    assert 'h_bucket{sink="S",le="1.0"} 2' in lines
+    assert 'h_bucket{sink="S",le="5.0"} 3' in lines
+    assert 'h_bucket{sink="S",le="+Inf"} 4' in lines
+    assert 'h_sum{sink="S"} 14.5' in lines and 'h_count{sink="S"} 4' in lines
+
+@pytest.mark.unit
+def test_families_render_contiguously_with_one_header():
+    w = MetricsWriter()
+    w.counter("a_total", "A.", 1, {"sink": "x"})
+    w.gauge("b", "B.", 2)
+    w.counter("a_total", "A.", 3, {"sink": "y"})
+    lines = w.render().splitlines()
+    assert lines == [
+        "# HELP a_total A.", "# TYPE a_total counter", 'a_total{sink="x"} 1', 'a_total{sink="y"} 3',
+        "# HELP b B.", "# TYPE b gauge", "b 2",
+    ]
+
+@pytest.mark.unit
+def test_udp_handler_counts_datagrams_bytes_and_decode_failures():
+    metrics = ServerMetrics()
+    queue = IngestQueue()
+    handler = UDPHandler(queue, metrics=metrics)
+    handler.datagram_received(b'{"a": 1}', ("127.0.0.1", 1))
+    handler.datagram_received(b"\xff\xfe", ("127.0.0.1", 1))
+    assert (metrics.datagrams, metrics.bytes, metrics.decode_failures) == (2, 10, 1)
+    text = metrics.render(batch_queue=queue)
+    assert "logflow_datagrams_received_total 2" in text
+    assert "logflow_decode_failures_total 1" in text
+    assert "logflow_queue_depth_messages 1" in text
+
+@pytest.mark.unit
+def test_add_exposition_labels_samples_and_merges_families():
+    def worker_text(n):
+        w = MetricsWriter()
+        w.counter("logflow_datagrams_total", "Datagrams received.", n)
+        w.counter("logflow_sink_batches_total", "Batches per sink.", n, {"sink": "disk"})
+        return w.render()
+
+    merged = MetricsWriter()
+    merged.add_exposition(worker_text(3), {"worker": 0})
+    merged.add_exposition(worker_text(5), {"worker": 1})
+    lines = merged.render().splitlines()
+    assert lines == [
+        "# HELP logflow_datagrams_total Datagrams received.",
+        "# TYPE logflow_datagrams_total counter",
+        'logflow_datagrams_total{worker="0"} 3',
+        'logflow_datagrams_total{worker="1"} 5',
+        "# HELP logflow_sink_batches_total Batches per sink.",
+        "# TYPE logflow_sink_batches_total counter",
+        'logflow_sink_batches_total{worker="0",sink="disk"} 3',
+        'logflow_sink_batches_total{worker="1",sink="disk"} 5',
+    ]
+
+@pytest.mark.unit
+def test_ipc_unsent_bytes_gauges():
+    class FakeReplay:
+        lines = bytes = 0
+
+    class FakeIPC:
+        clients = [object(), object()]
+        lines_sent = lines_skipped = disconnects = 0
+        replay = FakeReplay()
+        broadcast_seconds = Histogram()
+
+        def unsent_bytes(self):
+            return [100, 4000]
+
+    text = ServerMetrics().render(ipc_server=FakeIPC())
+    assert "logflow_ipc_unsent_bytes 4100" in text
+    assert "logflow_ipc_client_unsent_bytes_max 4000" in text
@@ -0,0 +1,45 @@
+import asyncio
+import socket
+import time
+import pytest
+from logflow.listener import BatchedUDPReceiver, _bind_udp_socket
+
+@pytest.mark.unit
+def test_batched_receiver_drains_socket_into_one_chunk():
+    sock = _bind_udp_socket("127.0.0.1", 0)
+    queue = asyncio.Queue()
+    seen = []
+    receiver = BatchedUDPReceiver(sock, queue, received_callback=seen.append)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for i in range(5):
+            sender.sendto(f'{{"n": {i}}}'.encode(), sock.getsockname())
+        time.sleep(0.1)
+        receiver.on_readable()
+        assert queue.qsize() == 1
+        chunk = queue.get_nowait()
+        assert chunk == [f'{{"n": {i}}}' for i in range(5)]
+        assert seen == chunk
+        # Nothing left to read: no empty chunk is queued
+        receiver.on_readable()
+        assert queue.empty()
+    finally:
+        sender.close()
+        sock.close()
+
+@pytest.mark.unit
+def test_batched_receiver_respects_max_batch():
+    sock = _bind_udp_socket("127.0.0.1", 0)
+    queue = asyncio.Queue()
+    receiver = BatchedUDPReceiver(sock, queue, max_batch=2)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for i in range(3):
+            sender.sendto(b"x", sock.getsockname())
+        time.sleep(0.1)
+        receiver.on_readable()
+        receiver.on_readable()
+        assert [len(queue.get_nowait()) for _ in range(queue.qsize())] == [2, 1]
+    finally:
+        sender.close()
+        sock.close()
@@ -0,0 +1,79 @@
+import pytest
+from logflow.retry import CircuitBreaker, CircuitOpenError, RetryingSink, CLOSED, OPEN, HALF_OPEN
+
+class ScriptedSink:
+    """Fails the first `failures` writes, then succeeds."""
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.batches = []
+    def write_batch(self, batch):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("endpoint down")
+        self.batches.append(batch)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+@pytest.mark.unit
+def test_retries_until_success():
+    inner = ScriptedSink(failures=2)
+    sink = RetryingSink(inner, max_attempts=3, base_delay=0)
+    sink.write_batch(["a"])
+    assert inner.batches == [["a"]] and inner.calls == 3
+    assert sink.stats()["retries"] == 2
+    assert sink.breaker.state == CLOSED
+
+@pytest.mark.unit
+def test_exhausted_batches_go_to_fallback_or_raise():
+    fallback = ScriptedSink()
+    sink = RetryingSink(ScriptedSink(failures=10), fallback=fallback, max_attempts=2, base_delay=0)
+    sink.write_batch(["a"])
+    assert fallback.batches == [["a"]]
+    with pytest.raises(RuntimeError):
+        RetryingSink(ScriptedSink(failures=10), max_attempts=2, base_delay=0).write_batch(["b"])
+
+@pytest.mark.unit
+def test_circuit_opens_rejects_fast_and_probes_half_open():
+    clock = FakeClock()
+    inner = ScriptedSink(failures=4)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+    sink = RetryingSink(inner, max_attempts=5, base_delay=0, breaker=breaker)
+    with pytest.raises(RuntimeError):
+        sink.write_batch(["a"])
+    assert breaker.state == OPEN and inner.calls == 3
+    assert not sink.is_healthy()
+    with pytest.raises(CircuitOpenError):
+        sink.write_batch(["b"])
+    assert inner.calls == 3  # rejected without touching the sink
+    clock.now = 10
+    with pytest.raises(RuntimeError):
+        sink.write_batch(["c"])  # the half-open probe fails and re-opens
+    assert breaker.state == OPEN and inner.calls == 4
+    clock.now = 20
+    sink.write_batch(["d"])
+    assert breaker.state == CLOSED and inner.batches == [["d"]]
+    assert sink.is_healthy()
+
+@pytest.mark.unit
+def test_half_open_allows_a_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=1, clock=clock)
+    breaker.record_failure()
+    clock.now = 1
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False
+
+@pytest.mark.unit
+def test_retrying_sink_rejects_async_sinks(tmp_path):
+    from logflow.sink import AsyncDiskSink
+    with pytest.raises(TypeError):
+        RetryingSink(AsyncDiskSink(str(tmp_path)))
+    with pytest.raises(TypeError):
+        RetryingSink(ScriptedSink(), fallback=AsyncDiskSink(str(tmp_path)))
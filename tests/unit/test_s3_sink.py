@@ -2,7 +2,13 @@ import os
 import pytest
 import asyncio
 from unittest.mock import patch, MagicMock
-from logflow.listener import upload_batch
+from logflow.listener import upload_batch, reset_s3_client
+
+@pytest.fixture(autouse=True)
+def fresh_s3_client():
+    reset_s3_client()
+    yield
+    reset_s3_client()
 
 @pytest.mark.unit
 def test_upload_batch_calls_s3(monkeypatch):
@@ -52,3 +58,35 @@ def test_upload_batch_handles_error(monkeypatch):
             loop.run_until_complete(upload_batch(batch))
         except Exception:
             pass
+
+@pytest.mark.unit
+def test_upload_batch_reuses_client(monkeypatch):
+    monkeypatch.setenv("S3_ENDPOINT", "http://fake-endpoint:9000")
+    monkeypatch.setenv("S3_BUCKET", "test-bucket")
+    with patch("logflow.listener.boto3") as mock_boto3:
+        fake_client = MagicMock()
+        mock_boto3.client.return_value = fake_client
+        async def run():
+            for i in range(3):
+                await upload_batch([f'{{"msg": "reuse-{i}"}}'])
+        asyncio.run(run())
+        assert mock_boto3.client.call_count == 1
+        assert fake_client.put_object.call_count == 3
+        config = mock_boto3.client.call_args.kwargs["config"]
+        assert config.max_pool_connections >= 1
+
+@pytest.mark.unit
+def test_s3_sink_flushes_in_the_same_second_get_distinct_objects(monkeypatch):
+    moto = pytest.importorskip("moto")
+    import boto3
+    from logflow.sink import S3Sink
+    monkeypatch.setenv("S3_ENDPOINT", "https://s3.us-east-1.amazonaws.com")
+    monkeypatch.setenv("S3_BUCKET", "same-second")
+    with moto.mock_aws(), patch("logflow.sink._batch_timestamp", return_value="2026-01-01T00-00-00"):
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="same-second")
+        sink = S3Sink()
+        for i in range(5):
+            sink.write_batch([f'{{"n": {i}}}'])
+        objects = sink.s3.list_objects_v2(Bucket="same-second", Prefix="logs/")["Contents"]
+        assert len(objects) == 5
+        assert all(obj["Key"].startswith("logs/2026-01-01T00-00-00-") for obj in objects)
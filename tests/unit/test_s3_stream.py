@@ -0,0 +1,99 @@
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+import asyncio
+from logflow.sink import AsyncS3Sink, S3StreamWriter, S3Sink
+
+def _fake_s3():
+    s3 = MagicMock()
+    s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+    s3.upload_part.side_effect = lambda **kw: {"ETag": f"etag-{kw['PartNumber']}"}
+    return s3
+
+@pytest.mark.unit
+def test_stream_writer_uploads_parts_and_completes():
+    s3 = _fake_s3()
+    lines = [f"line-{i:04d}" for i in range(100)]  # 10 bytes + newline each
+    with S3StreamWriter(s3, "bucket", "key", part_size=200, concurrency=2) as writer:
+        writer.write_lines(lines)
+    bodies = {c.kwargs["PartNumber"]: c.kwargs["Body"] for c in s3.upload_part.call_args_list}
+    assert b"".join(bodies[n] for n in sorted(bodies)) == "".join(l + "\n" for l in lines).encode()
+    assert all(len(body) <= 200 + 11 for body in bodies.values())
+    parts = s3.complete_multipart_upload.call_args.kwargs["MultipartUpload"]["Parts"]
+    assert parts == [{"PartNumber": n, "ETag": f"etag-{n}"} for n in range(1, len(bodies) + 1)]
+    s3.put_object.assert_not_called()
+
+@pytest.mark.unit
+def test_stream_writer_small_data_uses_put_object():
+    s3 = _fake_s3()
+    with S3StreamWriter(s3, "bucket", "key", part_size=1024) as writer:
+        writer.write_lines(["a", "b"])
+    s3.put_object.assert_called_once_with(Bucket="bucket", Key="key", Body=b"a\nb\n")
+    s3.create_multipart_upload.assert_not_called()
+
+@pytest.mark.unit
+def test_stream_writer_bounds_parts_in_flight_and_aborts_on_failure():
+    s3 = _fake_s3()
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+    def upload_part(**kw):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        import time; time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        if kw["PartNumber"] == 3:
+            raise RuntimeError("part failed")
+        return {"ETag": "x"}
+    s3.upload_part.side_effect = upload_part
+    with pytest.raises(RuntimeError):
+        with S3StreamWriter(s3, "bucket", "key", part_size=10, concurrency=2) as writer:
+            writer.write_lines(["0123456789"] * 10)
+    assert peak[0] <= 2
+    s3.abort_multipart_upload.assert_called_once_with(Bucket="bucket", Key="key", UploadId="upload-1")
+    s3.complete_multipart_upload.assert_not_called()
+
+@pytest.mark.unit
+def test_s3_sink_streams_large_batches():
+    with patch("logflow.sink.boto3") as mock_boto3:
+        s3 = _fake_s3()
+        mock_boto3.client.return_value = s3
+        sink = S3Sink(part_size=50, concurrency=2)
+        sink.write_batch(["small"])
+        assert s3.put_object.call_args.kwargs["Body"] == b"small\n"  # same line endings as a streamed object
+        sink.write_batch(["x" * 30] * 4)
+        assert s3.upload_part.call_count >= 2
+        s3.complete_multipart_upload.assert_called_once()
+        sink.close()
+
+@pytest.mark.unit
+def test_s3_sink_warns_about_part_size_below_s3_minimum():
+    with patch("logflow.sink.boto3") as mock_boto3, patch("logflow.sink.log") as mock_log:
+        mock_boto3.client.return_value = _fake_s3()
+        S3Sink(part_size=8 * 1024 * 1024).close()
+        mock_log.warning.assert_not_called()
+        S3Sink(part_size=1024 * 1024).close()
+        mock_log.warning.assert_called_once()
+
+@pytest.mark.unit
+def test_async_s3_sink_objects_end_with_newline():
+    with patch("logflow.sink.boto3") as mock_boto3, patch("logflow.sink.get_aiobotocore_session", None):
+        s3 = _fake_s3()
+        mock_boto3.client.return_value = s3
+        asyncio.run(AsyncS3Sink().write_batch(["a", "b"]))
+    assert s3.put_object.call_args.kwargs["Body"] == b"a\nb\n"
+
+@pytest.mark.unit
+def test_streamed_and_put_object_bodies_are_identical():
+    lines = ["trailing space  ", "crlf\r", "tab\t", "plain"]
+    with patch("logflow.sink.boto3") as mock_boto3:
+        s3 = _fake_s3()
+        mock_boto3.client.return_value = s3
+        S3Sink(part_size=1024).write_batch(lines)
+        small = s3.put_object.call_args.kwargs["Body"]
+    streamed = _fake_s3()
+    with S3StreamWriter(streamed, "bucket", "key", part_size=8) as writer:
+        writer.write_lines(lines)
+    parts = sorted(streamed.upload_part.call_args_list, key=lambda c: c.kwargs["PartNumber"])
+    assert b"".join(c.kwargs["Body"] for c in parts) == small == b"trailing space\ncrlf\ntab\nplain\n"
@@ -0,0 +1,39 @@
+import json
+import logging
+from datetime import datetime
+import pytest
+from logflow.handler import UDPJsonLogHandler
+from logflow.serialization import TimestampCache, available_serializers, get_serializer
+
+@pytest.mark.unit
+@pytest.mark.parametrize("name", available_serializers())
+def test_serializers_emit_compact_single_line_json(name):
+    obj = {"message": "multi\nline é / \"quoted\"", "lineno": 3, "level": "INFO"}
+    data = get_serializer(name).dumps(obj)
+    assert isinstance(data, bytes)
+    assert b"\n" not in data
+    assert json.loads(data) == obj
+
+@pytest.mark.unit
+def test_get_serializer_auto_and_unknown():
+    assert get_serializer("auto").name == available_serializers()[0]
+    with pytest.raises(ValueError):
+        get_serializer("msgpack")
+
+@pytest.mark.unit
+def test_timestamp_cache_matches_isoformat():
+    cache = TimestampCache()
+    for created in (1700000000.25, 1700000000.999999, 1700000001.000123, 1700000000.5):
+        assert cache.format(created) == datetime.utcfromtimestamp(created).strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+@pytest.mark.unit
+def test_handler_log_obj_uses_record_time():
+    handler = UDPJsonLogHandler(serializer="json")
+    record = logging.LogRecord("app", logging.INFO, "/srv/app.py", 7, "hello %s", ("world",), None, func="main")
+    record.created = 1700000000.5
+    try:
+        obj = json.loads(handler.serializer.dumps(handler._log_obj(record)))
+    finally:
+        handler.close()
+    assert obj == {"timestamp": "2023-11-14T22:13:20.500000", "level": "INFO", "name": "app",
+                   "message": "hello world", "pathname": "/srv/app.py", "lineno": 7, "funcName": "main"}
@@ -20,3 +20,82 @@ def test_disk_sink_empty_batch_does_nothing(tmp_path):
     sink = DiskSink(str(output_dir))
     sink.write_batch([])
     assert not any(output_dir.iterdir()), "DiskSink should not create a file for empty batch."
+
+def test_disk_sink_appends_batches_to_one_file(tmp_path):
+    output_dir = tmp_path / "logs"
+    written = []
+    sink = DiskSink(str(output_dir), on_write=written.append)
+    sink.write_batch(["{\"n\": 1}"])
+    sink.write_batch(["{\"n\": 2}"])
+    files = list(output_dir.iterdir())
+    assert len(files) == 1 and written == [str(files[0])] * 2
+    assert files[0].read_text().splitlines() == ["{\"n\": 1}", "{\"n\": 2}"]
+    sink.close()
+
+def test_disk_sink_rotates_on_size_without_overwriting(tmp_path):
+    output_dir = tmp_path / "logs"
+    sink = DiskSink(str(output_dir), max_bytes=20)
+    for i in range(5):
+        sink.write_batch([f"{{\"n\": {i:04d}}}"])  # 13 bytes per batch
+    sink.close()
+    files = sorted(output_dir.iterdir())
+    assert len(files) == 5
+    lines = [line for f in files for line in f.read_text().splitlines()]
+    assert lines == [f"{{\"n\": {i:04d}}}" for i in range(5)]
+
+def test_disk_sink_rotates_on_age(tmp_path, monkeypatch):
+    import logflow.sink as sink_module
+    now = [1000.0]
+    monkeypatch.setattr(sink_module.time, "monotonic", lambda: now[0])
+    sink = DiskSink(str(tmp_path), max_age=10)
+    sink.write_batch(["a"])
+    now[0] += 5
+    sink.write_batch(["b"])
+    now[0] += 10
+    sink.write_batch(["c"])
+    sink.close()
+    assert sorted(f.read_text() for f in tmp_path.iterdir()) == ["a\nb\n", "c\n"]
+
+def test_disk_sink_batch_durability_fsyncs_every_batch(tmp_path, monkeypatch):
+    import logflow.sink as sink_module
+    synced = []
+    monkeypatch.setattr(sink_module.os, "fsync", synced.append)
+    sink = DiskSink(str(tmp_path), durability="batch")
+    sink.write_batch(["a"])
+    sink.write_batch(["b"])
+    assert len(synced) == 2
+    sink.close()
+    assert len(synced) == 2  # nothing left unsynced at close
+
+def test_disk_sink_group_commit_shares_fsyncs(tmp_path):
+    import time
+    sink = DiskSink(str(tmp_path), durability="group", fsync_interval_ms=20)
+    for i in range(200):
+        sink.write_batch([f"line-{i}"])
+    time.sleep(0.1)
+    stats = sink.stats()
+    assert 1 <= stats["fsyncs"] < 200
+    assert stats["unsynced_bytes"] == 0
+    sink.close()
+
+def test_disk_sink_group_commit_keeps_bytes_unsynced_when_fsync_fails(tmp_path, monkeypatch):
+    import logflow.sink as sink_module
+    sink = DiskSink(str(tmp_path), durability="group", fsync_interval_ms=60000)
+    sink.write_batch(["line"])
+
+    def failing_fsync(fd):
+        raise OSError("EIO")
+    monkeypatch.setattr(sink_module.os, "fsync", failing_fsync)
+    sink._committer.sync()
+    stats = sink.stats()
+    assert stats["fsyncs"] == 0
+    assert stats["unsynced_bytes"] == len("line\n")
+    monkeypatch.undo()
+    sink._committer.sync()
+    assert sink.stats()["unsynced_bytes"] == 0
+    sink.close()
+
+def test_disk_sink_rejects_unknown_durability(tmp_path):
+    import pytest
+    with pytest.raises(ValueError):
+        DiskSink(str(tmp_path), durability="sometimes")
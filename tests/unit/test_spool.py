@@ -0,0 +1,123 @@
+import asyncio
+import os
+import pytest
+from logflow.dispatch import SinkDispatcher
+from logflow.spool import Spool, SpoolPipeline
+
+class FlakySink:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+    def write_batch(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("endpoint down")
+        self.batches.append(batch)
+
+def _lines(sink):
+    return [line for batch in sink.batches for line in batch]
+
+@pytest.mark.unit
+def test_spool_append_read_across_segments(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=64)
+    ends = [spool.append([f"line-{i}", "x" * 20])[1] for i in range(10)]
+    assert len([n for n in os.listdir(tmp_path) if n.endswith(".seg")]) > 1
+    start, records = spool.read(0)
+    assert start == 0
+    assert [end for end, _ in records] == ends
+    assert [batch[0] for _, batch in records] == [f"line-{i}" for i in range(10)]
+    _, tail = spool.read(ends[6])
+    assert [batch[0] for _, batch in tail] == ["line-7", "line-8", "line-9"]
+    spool.close()
+
+@pytest.mark.unit
+def test_spool_truncates_torn_tail_on_recovery(tmp_path):
+    spool = Spool(str(tmp_path))
+    _, end = spool.append(["complete"])
+    spool.close()
+    segment = tmp_path / sorted(n for n in os.listdir(tmp_path) if n.endswith(".seg"))[-1]
+    with open(segment, "ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")
+    spool = Spool(str(tmp_path))
+    assert spool.end_offset == end
+    assert [batch for _, batch in spool.read(0)[1]] == [["complete"]]
+    spool.close()
+
+@pytest.mark.unit
+def test_spool_gc_keeps_segments_until_every_consumer_commits(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=32)
+    spool.register("a")
+    spool.register("b")
+    ends = [spool.append(["y" * 30])[1] for _ in range(4)]
+    spool.commit("a", ends[-1])
+    spool.gc()
+    assert spool.start_offset == 0
+    spool.commit("b", ends[2])
+    spool.gc()
+    assert spool.start_offset == ends[2]
+    spool.close()
+    assert Spool(str(tmp_path)).register("b") == ends[2]
+
+@pytest.mark.unit
+def test_pipeline_retries_failed_batches_and_replays_after_restart(tmp_path):
+    flaky, healthy = FlakySink(failures=2), FlakySink()
+    async def first_run():
+        dispatcher = SinkDispatcher([flaky, healthy])
+        pipeline = SpoolPipeline(Spool(str(tmp_path)), dispatcher, retry_min=0.01, retry_max=0.02)
+        pipeline.start()
+        for i in range(3):
+            await pipeline.append([f"msg-{i}"])
+        for _ in range(100):
+            if len(flaky.batches) == 3:
+                break
+            await asyncio.sleep(0.01)
+        await pipeline.stop(timeout=1)
+        dispatcher.close()
+    asyncio.run(first_run())
+    assert _lines(flaky) == _lines(healthy) == ["msg-0", "msg-1", "msg-2"]
+
+    # A sink that was down at shutdown gets the backlog replayed on the next start
+    down = FlakySink(failures=10 ** 6)
+    async def outage():
+        dispatcher = SinkDispatcher([down])
+        pipeline = SpoolPipeline(Spool(str(tmp_path)), dispatcher, retry_min=0.01, retry_max=0.02)
+        pipeline.start()
+        await pipeline.append(["during-outage"])
+        await pipeline.stop(timeout=0.1)
+        dispatcher.close()
+    asyncio.run(outage())
+    recovered = FlakySink()
+    async def restart():
+        dispatcher = SinkDispatcher([recovered])
+        pipeline = SpoolPipeline(Spool(str(tmp_path)), dispatcher)
+        pipeline.start()
+        await pipeline.stop(timeout=1)
+        dispatcher.close()
+    asyncio.run(restart())
+    assert "during-outage" in _lines(recovered)
+
+@pytest.mark.unit
+def test_pipeline_does_not_redeliver_batches_read_from_disk_before_notify(tmp_path):
+    spool = Spool(str(tmp_path))
+    for i in range(5):
+        spool.append([f"old{i}"])
+    sink = FlakySink()
+    async def run():
+        dispatcher = SinkDispatcher([sink])
+        pipeline = SpoolPipeline(spool, dispatcher, read_bytes=1)
+        consumer = pipeline.consumers[0]
+        assert consumer.from_disk
+        # The record lands on disk while the consumer is replaying, but its notify() is late
+        _, end = spool.append(["new"])
+        pipeline.start()
+        for _ in range(100):
+            if consumer.offset == end:
+                break
+            await asyncio.sleep(0.01)
+        assert not consumer.from_disk
+        consumer.notify(end, ["new"])
+        await pipeline.append(["after"])
+        await pipeline.stop(timeout=1)
+        dispatcher.close()
+    asyncio.run(run())
+    assert _lines(sink) == [f"old{i}" for i in range(5)] + ["new", "after"]